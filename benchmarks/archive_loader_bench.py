@@ -0,0 +1,123 @@
+"""
+Binance 덤프 bulk 적재 벤치마크 (loaders/binance_archive_loader.py, 인터넷/ClickHouse 불필요).
+
+- 합성 aggTrades 일별 zip을 임시 디렉토리에 생성 (헤더 포함, 재전송 중복 일부 섞음)
+- 첫 파일은 순수 Python 기준 구현(체결 하나씩 dict 갱신)과 1분봉 비교 → 작은 청크로 돌려서 청크 경계 이어 집계까지 확인
+- 전체 파일 적재(출력 없음 또는 --sink) 처리량: rows/s, zip MB/s, 워커 최대 RSS, 1년치 환산 시간
+
+실행:
+  python3 -m benchmarks.archive_loader_bench --days 8 --rows-per-day 2000000 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from loaders.binance_archive_loader import DEFAULT_INTERVALS, agg_trades_to_1m, load_files
+
+DAY_MS = 86_400_000
+HEADER = "agg_trade_id,price,quantity,first_trade_id,last_trade_id,transact_time,is_buyer_maker\n"
+
+
+def generate_day(directory: str, symbol: str, day_index: int, rows: int, seed: int) -> str:
+    rng = np.random.default_rng(seed)
+    day_start = 1_704_067_200_000 + day_index * DAY_MS  # 2024-01-01 UTC
+    times = day_start + np.sort(rng.integers(0, DAY_MS, rows))
+    ids = 3_000_000_000 + day_index * rows + np.arange(rows)
+    price = np.round(42000 + np.cumsum(rng.normal(0, 2.0, rows)), 1)
+    qty = np.round(rng.exponential(0.05, rows) + 0.001, 3)
+    maker = rng.random(rows) < 0.5
+    # 재전송 중복: 0.1% 행을 바로 뒤에 한 번 더
+    dup = np.sort(rng.choice(rows, rows // 1000, replace=False))
+    order = np.sort(np.concatenate((np.arange(rows), dup)), kind="stable")
+    lines = [
+        f"{i},{p},{q},{i * 3},{i * 3 + 2},{t},{'true' if m else 'false'}\n"
+        for i, p, q, t, m in zip(ids[order].tolist(), price[order].tolist(), qty[order].tolist(),
+                                 times[order].tolist(), maker[order].tolist())
+    ]
+    date = time.strftime("%Y-%m-%d", time.gmtime(day_start / 1000))
+    name = f"{symbol}-aggTrades-{date}"
+    path = os.path.join(directory, f"{name}.zip")
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        zf.writestr(f"{name}.csv", HEADER + "".join(lines))
+    return path
+
+
+def reference_1m(path: str) -> dict:
+    """체결 하나씩: (symbol, id) 중복 제거 + 1분 window별 (T, id) 최소/최대 체결가 = open/close"""
+    bars, seen = {}, set()
+    with zipfile.ZipFile(path) as zf:
+        text = zf.read(zf.namelist()[0]).decode()
+    for line in text.splitlines()[1:]:
+        cols = line.split(",")
+        trade_id, price, qty, t = int(cols[0]), float(cols[1]), float(cols[2]), int(cols[5])
+        if trade_id in seen:
+            continue
+        seen.add(trade_id)
+        key = (t, trade_id)
+        window = t - t % 60_000
+        bar = bars.get(window)
+        if bar is None:
+            bars[window] = [key, price, price, price, key, price, qty, 1]
+            continue
+        if key < bar[0]:
+            bar[0], bar[1] = key, price
+        if key > bar[4]:
+            bar[4], bar[5] = key, price
+        bar[2] = max(bar[2], price)
+        bar[3] = min(bar[3], price)
+        bar[6] += qty
+        bar[7] += 1
+    return {w: (b[1], b[2], b[3], b[5], b[6], b[7]) for w, b in bars.items()}
+
+
+def verify(path: str, chunk_rows: int) -> bool:
+    bars, _, _ = agg_trades_to_1m(path, chunk_rows)
+    expected = reference_1m(path)
+    if len(bars) != len(expected) or not np.all(np.diff(bars["window_start"]) > 0):
+        print(f"❌ 봉 개수/순서 불일치: {len(bars)} vs {len(expected)}")
+        return False
+    ref = np.array([expected[w] for w in bars["window_start"].tolist()])
+    ours = np.column_stack([bars[name] for name in ("open", "high", "low", "close", "volume", "trades_count")])
+    if not np.allclose(ours, ref, rtol=1e-9, atol=1e-9):
+        print("❌ OHLCV 값 불일치")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binance 덤프 bulk 적재 처리량")
+    parser.add_argument("--days", type=int, default=8)
+    parser.add_argument("--rows-per-day", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--intervals", default=DEFAULT_INTERVALS)
+    parser.add_argument("--sink", default="none", help="none / clickhouse / parquet (실제 출력 포함 측정)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="binance-dump-") as directory:
+        print(f"🧪 합성 aggTrades {args.days}일 x {args.rows_per_day:,}행 생성...")
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            paths = list(pool.map(generate_day, [directory] * args.days, ["BTCUSDT"] * args.days,
+                                  range(args.days), [args.rows_per_day] * args.days, range(args.days)))
+
+        ok = verify(paths[0], chunk_rows=max(1000, args.rows_per_day // 7))
+        print(f"{'✅' if ok else '❌'} 기준 구현(체결 단위 Python)과 1분봉 비교 (청크 경계 포함): {'일치' if ok else '불일치'}")
+
+        sinks = [s for s in args.sink.split(",") if s and s != "none"]
+        intervals = [s.strip() for s in args.intervals.split(",")]
+        totals = load_files(paths, intervals, sinks, args.workers, verbose=False)
+        seconds = totals["seconds"]
+        rows_per_sec = totals["rows"] / seconds
+        print(f"\n📊 파일 {totals['files']}개 | {totals['rows']:,}행 (중복 {totals['duplicates']:,}) → 봉 {totals['bars']:,} | "
+              f"{seconds:.2f}초")
+        print(f"   {rows_per_sec / 1e6:.2f}M rows/s | zip {totals['bytes'] / seconds / 1e6:.0f} MB/s | "
+              f"워커 최대 RSS {totals['max_rss_mb']:.0f}MB | 워커 {args.workers or os.cpu_count()}개")
+        print(f"   1년치 환산 (하루 {args.rows_per_day:,}행): {365 * args.rows_per_day / rows_per_sec / 60:.1f}분")
+
+
+if __name__ == "__main__":
+    main()
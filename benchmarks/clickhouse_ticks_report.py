@@ -0,0 +1,193 @@
+"""
+원본 틱 테이블 저장 효율 + 스캔 속도 리포트 (ClickHouse HTTP, 기본 CLICKHOUSE_URL).
+
+- 하루치 BTCUSDT depth(depth_levels)의 틱(레벨 변경 1행)당 압축 바이트, 열별 압축률
+- 같은 데이터를 기본 코덱(LZ4) 테이블에 복사해서 코덱 효과 비교 (--compare-default-codecs)
+- 스캔 속도: 하루 전체 집계 / 초 단위 최우선 호가 / 1시간 구간 → 3회 중 최고 기록, rows/s, MB/s
+  (ClickHouse X-ClickHouse-Summary의 read_rows/read_bytes 기준)
+- 데이터가 없으면 --generate로 합성 하루치(100ms diff, 이벤트당 레벨 --levels개) 생성
+
+실행:
+  docker-compose up -d clickhouse
+  python3 -m benchmarks.clickhouse_ticks_report --generate --date 2026-02-11 --compare-default-codecs
+  python3 -m benchmarks.clickhouse_ticks_report --symbol BTCUSDT              # 적재된 가장 최근 날짜
+"""
+import argparse
+import json
+import time
+import urllib.parse
+import urllib.request
+
+from common.config import Config
+
+DEFAULT_CODEC_TABLE = "depth_levels_default_codecs"
+
+
+def query(sql: str, **params):
+    """(응답 텍스트, X-ClickHouse-Summary dict). params는 {name:Type} 바인딩"""
+    args = {"query": sql}
+    args.update({f"param_{k}": str(v) for k, v in params.items()})
+    url = f"{Config.CLICKHOUSE_URL}?{urllib.parse.urlencode(args)}"
+    with urllib.request.urlopen(urllib.request.Request(url, data=b"", method="POST"), timeout=600) as resp:
+        summary = json.loads(resp.headers.get("X-ClickHouse-Summary") or "{}")
+        return resp.read().decode(), summary
+
+
+def query_rows(sql: str, **params) -> list:
+    text, _ = query(sql + " FORMAT JSONEachRow", **params)
+    return [json.loads(line) for line in text.splitlines() if line]
+
+
+def generate_day(symbol: str, day: str, levels: int):
+    """합성 하루치: 100ms마다 이벤트 1개, 이벤트당 bid/ask 레벨 levels개 (가격은 0.1 tick, 느린 random walk 모양)"""
+    events = 86400 * 10
+    half = max(1, levels // 2)
+    query(f"""
+        INSERT INTO depth_levels
+        SELECT
+            {{symbol:String}} AS symbol,
+            toDateTime64({{day:Date}}, 3, 'UTC') + toIntervalMillisecond(event * 100) AS event_time,
+            event_time - toIntervalMillisecond(3 + event % 5) AS transaction_time,
+            1000000000 + event * 40 AS first_update_id,
+            first_update_id + 20 + event % 17 AS final_update_id,
+            first_update_id - 1 AS prev_final_update_id,
+            if(level < {half}, 'bid', 'ask') AS side,
+            round(mid + if(side = 'bid', -1, 1) * (0.1 + (level % {half}) * 0.1 + (cityHash64(number) % 30) * 0.1), 1) AS price,
+            if(cityHash64(number, 1) % 4 = 0, 0, round((cityHash64(number, 2) % 50000) / 1000, 3)) AS quantity
+        FROM
+        (
+            SELECT
+                number,
+                intDiv(number, {levels}) AS event,
+                number % {levels} AS level,
+                round(68000 + 800 * sin(event / 40000) + 150 * sin(event / 2300) + (cityHash64(event) % 50) * 0.1, 1) AS mid
+            FROM numbers({events * levels})
+        )
+    """, symbol=symbol, day=day)
+    query("OPTIMIZE TABLE depth_levels PARTITION {day:Date} FINAL", day=day)
+
+
+def storage_stats(table: str, day: str) -> dict:
+    rows = query_rows(
+        "SELECT sum(rows) AS rows, sum(data_compressed_bytes) AS compressed, sum(data_uncompressed_bytes) AS uncompressed "
+        "FROM system.parts WHERE database = currentDatabase() AND table = {table:String} "
+        "AND partition = {day:String} AND active",
+        table=table, day=day,
+    )
+    return rows[0] if rows else {"rows": 0, "compressed": 0, "uncompressed": 0}
+
+
+def column_stats(table: str, day: str) -> list:
+    return query_rows(
+        "SELECT column, sum(column_data_compressed_bytes) AS compressed, sum(column_data_uncompressed_bytes) AS uncompressed "
+        "FROM system.parts_columns WHERE database = currentDatabase() AND table = {table:String} "
+        "AND partition = {day:String} AND active GROUP BY column ORDER BY compressed DESC",
+        table=table, day=day,
+    )
+
+
+def compare_default_codecs(day: str) -> dict:
+    """같은 하루치를 코덱 지정 없는 테이블(서버 기본 LZ4)에 복사 → 크기 비교 후 삭제"""
+    query(f"DROP TABLE IF EXISTS {DEFAULT_CODEC_TABLE}")
+    query(f"""
+        CREATE TABLE {DEFAULT_CODEC_TABLE}
+        (
+            symbol LowCardinality(String), event_time DateTime64(3, 'UTC'), transaction_time DateTime64(3, 'UTC'),
+            first_update_id UInt64, final_update_id UInt64, prev_final_update_id Int64,
+            side Enum8('bid' = 1, 'ask' = 2), price Float64, quantity Float64
+        )
+        ENGINE = MergeTree PARTITION BY toDate(event_time) ORDER BY (symbol, event_time, final_update_id, side, price)
+    """)
+    try:
+        query(f"INSERT INTO {DEFAULT_CODEC_TABLE} SELECT * FROM depth_levels WHERE toDate(event_time) = {{day:Date}}", day=day)
+        query(f"OPTIMIZE TABLE {DEFAULT_CODEC_TABLE} FINAL")
+        return storage_stats(DEFAULT_CODEC_TABLE, day)
+    finally:
+        query(f"DROP TABLE IF EXISTS {DEFAULT_CODEC_TABLE}")
+
+
+SCANS = [
+    ("하루 전체 집계", """
+        SELECT count(), sum(quantity), min(price), max(price) FROM depth_levels
+        WHERE symbol = {symbol:String} AND event_time >= {day:Date} AND event_time < {day:Date} + INTERVAL 1 DAY"""),
+    ("초 단위 최우선 호가", """
+        SELECT toStartOfSecond(event_time) AS sec,
+               maxIf(price, side = 'bid' AND quantity > 0) AS bid, minIf(price, side = 'ask' AND quantity > 0) AS ask
+        FROM depth_levels
+        WHERE symbol = {symbol:String} AND event_time >= {day:Date} AND event_time < {day:Date} + INTERVAL 1 DAY
+        GROUP BY sec FORMAT Null"""),
+    ("1시간 구간 (12~13시)", """
+        SELECT count(), avg(price) FROM depth_levels
+        WHERE symbol = {symbol:String}
+          AND event_time >= {day:Date} + INTERVAL 12 HOUR AND event_time < {day:Date} + INTERVAL 13 HOUR"""),
+]
+
+
+def run_scans(symbol: str, day: str, repeat: int):
+    for label, sql in SCANS:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            _, summary = query(sql + " SETTINGS use_query_cache = 0", symbol=symbol, day=day)
+            elapsed = time.perf_counter() - started
+            if best is None or elapsed < best[0]:
+                best = (elapsed, summary)
+        elapsed, summary = best
+        read_rows = int(summary.get("read_rows", 0))
+        read_bytes = int(summary.get("read_bytes", 0))
+        print(f"   {label}: {elapsed * 1000:.0f}ms | 읽은 행 {read_rows:,} ({read_rows / elapsed / 1e6:.1f}M rows/s) | "
+              f"{read_bytes / elapsed / 1e6:,.0f} MB/s (비압축 기준)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClickHouse 원본 틱 테이블 틱당 바이트 + 스캔 속도")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--date", help="YYYY-MM-DD (기본: depth_levels에 있는 가장 최근 날짜)")
+    parser.add_argument("--generate", action="store_true", help="해당 날짜에 합성 하루치 depth 생성")
+    parser.add_argument("--levels", type=int, default=20, help="--generate 이벤트당 레벨 변경 수")
+    parser.add_argument("--compare-default-codecs", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.generate:
+        if not args.date:
+            parser.error("--generate는 --date 필요")
+        print(f"🧪 합성 depth 생성: {args.symbol} {args.date} (100ms x 레벨 {args.levels}개)...")
+        started = time.time()
+        generate_day(args.symbol, args.date, args.levels)
+        print(f"   완료 ({time.time() - started:.1f}초)")
+
+    day = args.date
+    if not day:
+        rows = query_rows("SELECT toString(max(toDate(event_time))) AS day FROM depth_levels WHERE symbol = {symbol:String}",
+                          symbol=args.symbol)
+        day = rows[0]["day"] if rows else None
+        if not day or day == "1970-01-01":
+            print("❌ depth_levels에 데이터 없음 (--generate --date YYYY-MM-DD로 합성 데이터 생성 가능)")
+            return
+
+    stats = storage_stats("depth_levels", day)
+    rows = int(stats["rows"])
+    if not rows:
+        print(f"❌ {day} 파티션에 데이터 없음")
+        return
+    compressed, uncompressed = int(stats["compressed"]), int(stats["uncompressed"])
+    print(f"\n📦 depth_levels {day} | 틱(레벨 변경) {rows:,}행 | 압축 {compressed / 1e6:,.1f}MB "
+          f"(비압축 {uncompressed / 1e6:,.1f}MB, {uncompressed / max(1, compressed):.1f}x) | "
+          f"틱당 {compressed / rows:.2f} bytes")
+    for col in column_stats("depth_levels", day):
+        c, u = int(col["compressed"]), int(col["uncompressed"])
+        print(f"   {col['column']:<22} {c / rows:6.2f} bytes/tick ({u / max(1, c):5.1f}x)")
+
+    if args.compare_default_codecs:
+        base = compare_default_codecs(day)
+        base_compressed = int(base["compressed"])
+        print(f"\n⚖️ 기본 코덱(LZ4) 대비: {base_compressed / rows:.2f} → {compressed / rows:.2f} bytes/tick "
+              f"({base_compressed / max(1, compressed):.1f}배 작음)")
+
+    print(f"\n🔍 스캔 속도 ({args.symbol} {day}, {args.repeat}회 중 최고)")
+    run_scans(args.symbol, day, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
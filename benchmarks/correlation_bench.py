@@ -0,0 +1,143 @@
+"""
+상관/변동성 행렬 벤치마크: 증분 EW 공분산(common/correlation.py) vs 봉마다 구간 재계산.
+
+- 합성 1분봉: BTCUSDT 팩터 x 심볼별 beta + 개별 잡음 (정답 beta를 알고 있음)
+- incremental: 봉마다 EWCovariance.update 1회 (O(N²)) → p50/p99
+- publish    : 상관계수 + beta + realized vol 계산 + 메시지 인코딩(JSON) 시간과 크기
+- naive      : 같은 EW 가중치로 최근 6 반감기 구간 수익률 전체에서 공분산을 다시 계산 (O(W·N²), 마지막 --naive-bars개 봉만)
+- 마지막 봉에서 두 결과 차이(구간 절단 오차만큼) + beta 추정 오차 확인
+- warmup     : 관측이 min_periods봉뿐일 때 치우침 확인 (독립 수익률이라 정답을 앎, 시드 --warmup-trials개 x 심볼 평균)
+               처음부터 있던 심볼의 분산 / 정답 분산 ≈ 1, 늦게 상장된 심볼의 beta·상관 평균 오차 ≈ 0
+
+실행: python3 -m benchmarks.correlation_bench --symbols 100,300,500 --bars 1440
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from common.correlation import EWCovariance, encode_matrix
+
+
+def make_closes(n_symbols: int, n_bars: int, seed: int = 11):
+    """(bars x symbols 종가, 정답 beta) — 0번 심볼이 BTCUSDT(팩터 자체)"""
+    rng = np.random.default_rng(seed)
+    beta = rng.uniform(0.3, 1.8, n_symbols)
+    beta[0] = 1.0
+    factor = rng.normal(0, 0.0008, n_bars)
+    returns = np.outer(factor, beta) + rng.normal(0, 0.0006, (n_bars, n_symbols)) * rng.uniform(0.5, 2.0, n_symbols)
+    returns[:, 0] = factor
+    closes = rng.uniform(1, 50_000, n_symbols) * np.exp(np.cumsum(returns, axis=0))
+    return closes, beta
+
+
+def naive_covariance(closes: np.ndarray, alpha: float, window: int) -> np.ndarray:
+    """최근 window개 수익률에 EW 가중치 (1-α)^k를 주고 가중 공분산을 처음부터 계산"""
+    r = np.log(closes[-window - 1:][1:] / closes[-window - 1:][:-1])
+    w = (1.0 - alpha) ** np.arange(len(r))[::-1]
+    w /= w.sum()
+    mean = w @ r
+    d = r - mean
+    return (d * w[:, None]).T @ d
+
+
+def warmup_check(halflife: float, min_periods: int, n_symbols: int = 200, listed_late_at: int = 200, seed: int = 5):
+    """min_periods 시점 (분산 비율 평균, 늦게 상장된 심볼 beta 평균 오차, 상관 평균 오차) — 시드 1개"""
+    rng = np.random.default_rng(seed)
+    factor_sd, noise_sd = 0.0008, rng.uniform(0.0003, 0.0012, n_symbols)
+    beta = rng.uniform(0.3, 1.8, n_symbols)
+    beta[0], noise_sd[0] = 1.0, 0.0
+    true_var = beta ** 2 * factor_sd ** 2 + noise_sd ** 2
+    true_corr = beta * factor_sd / np.sqrt(true_var)
+    symbols = ["BTCUSDT"] + [f"SYM{i:04d}USDT" for i in range(1, n_symbols)]
+    late = np.arange(n_symbols) >= n_symbols // 2  # 뒤 절반은 listed_late_at 봉에 상장
+
+    cov = EWCovariance(halflife=halflife, min_periods=min_periods)
+    closes = np.full(n_symbols, 100.0)
+    var_ratio = None
+    for t in range(listed_late_at + min_periods + 1):
+        returns = beta * rng.normal(0, factor_sd) + rng.normal(0, 1.0, n_symbols) * noise_sd
+        closes = closes * np.exp(returns)
+        listed = ~late | (t >= listed_late_at)
+        cov.update([symbols[i] for i in np.flatnonzero(listed)], closes[listed], t * 60_000)
+        if t == min_periods:  # 처음부터 있던 심볼: 수익률 min_periods개
+            var_ratio = float(np.mean(np.diag(cov.covariance())[:n_symbols // 2] / true_var[~late]))
+    _, corr = cov.correlation()
+    est_beta = cov.beta("BTCUSDT")
+    rows = np.array([cov.symbol_index[symbols[i]] for i in np.flatnonzero(late)])
+    return (var_ratio, float(np.mean(est_beta[rows] - beta[late])),
+            float(np.mean(corr[rows, cov.symbol_index["BTCUSDT"]] - true_corr[late])))
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+
+def run(n_symbols: int, n_bars: int, halflife: float, naive_bars: int):
+    closes, true_beta = make_closes(n_symbols, n_bars)
+    symbols = ["BTCUSDT"] + [f"SYM{i:04d}USDT" for i in range(1, n_symbols)]
+    cov = EWCovariance(halflife=halflife)
+
+    update_ms = []
+    for t in range(n_bars):
+        started = time.perf_counter()
+        cov.update(symbols, closes[t], t * 60_000)
+        update_ms.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    names, corr = cov.correlation()
+    beta = cov.beta("BTCUSDT")
+    payload = json.dumps(encode_matrix(names, corr, cov.realized_vol(), beta, interval="1m"))
+    publish_ms = (time.perf_counter() - started) * 1000
+
+    window = int(halflife * 6)
+    naive_ms = []
+    for t in range(n_bars - naive_bars, n_bars):
+        started = time.perf_counter()
+        naive = naive_covariance(closes[: t + 1], cov.alpha, window)
+        naive_ms.append((time.perf_counter() - started) * 1000)
+
+    # 증분(전체 이력)과 naive(6 반감기 절단)는 절단된 꼬리 가중치(1/64)만큼 다름
+    rel_err = float(np.abs(cov.covariance() - naive).max() / np.abs(naive).max())
+    beta_err = float(np.abs(beta - true_beta).mean())
+    return {
+        "symbols": n_symbols,
+        "update_p50": percentile(update_ms[10:], 50),
+        "update_p99": percentile(update_ms[10:], 99),
+        "publish_ms": publish_ms,
+        "publish_kb": len(payload) / 1024,
+        "naive_ms": float(np.median(naive_ms)),
+        "rel_err": rel_err,
+        "beta_err": beta_err,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="증분 EW 상관 행렬 vs 재계산")
+    parser.add_argument("--symbols", default="100,300,500")
+    parser.add_argument("--bars", type=int, default=1440)
+    parser.add_argument("--halflife", type=float, default=60.0)
+    parser.add_argument("--naive-bars", type=int, default=20)
+    parser.add_argument("--min-periods", type=int, default=30)
+    parser.add_argument("--warmup-trials", type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"🧪 합성 1분봉 {args.bars}개, 반감기 {args.halflife:g}봉 (naive 구간 {int(args.halflife * 6)}봉)\n")
+    print(f"{'심볼':>6} | {'갱신 p50':>9} | {'갱신 p99':>9} | {'발행':>8} | {'메시지':>8} | {'naive 재계산':>12} | "
+          f"{'배수':>6} | {'naive 대비 오차':>14} | {'beta 오차':>8}")
+    for n in [int(s) for s in args.symbols.split(",")]:
+        r = run(n, args.bars, args.halflife, args.naive_bars)
+        print(f"{r['symbols']:>6} | {r['update_p50']:>7.3f}ms | {r['update_p99']:>7.3f}ms | {r['publish_ms']:>6.1f}ms | "
+              f"{r['publish_kb']:>6.0f}KB | {r['naive_ms']:>10.2f}ms | {r['naive_ms'] / max(r['update_p50'], 1e-9):>5.0f}x | "
+              f"{r['rel_err']:>14.2e} | {r['beta_err']:>8.3f}")
+
+    # 팩터가 모든 심볼에 공통이라 시드 1개로는 팩터 표본 분산만큼 흔들림 → 시드 여러 개 평균
+    var_ratio, beta_bias, corr_bias = np.mean(
+        [warmup_check(args.halflife, args.min_periods, seed=seed) for seed in range(args.warmup_trials)], axis=0)
+    print(f"\n🔥 워밍업 (관측 {args.min_periods}봉, 시드 {args.warmup_trials}개): 분산/정답 평균 {var_ratio:.3f} | "
+          f"늦게 상장된 심볼 beta 평균 오차 {beta_bias:+.3f}, 상관 평균 오차 {corr_bias:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
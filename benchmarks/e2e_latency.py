@@ -0,0 +1,212 @@
+"""
+End-to-end 지연 벤치마크: 가짜 거래소 → 실제 수집기 → 로컬 Kafka → Python 캔들 프로세서 → 소비자.
+
+"N msgs/sec에서 거래소 이벤트 → 캔들 출력까지 얼마나 걸리나"를 구간별로 측정.
+인터넷 없이 한 대의 Linux에서 실행 (Kafka는 docker-compose의 로컬 브로커).
+
+구성
+- benchmarks/fake_binance_ws.py: 합성/녹화 aggTrade를 목표 rate로 전송 (E/T = 전송 시각)
+- collectors.depth_kline_aggtrade: 실제 수집기 프로세스 (BINANCE_WS_URL로 가짜 서버에 연결)
+- processors.candle_processor --interval 1s: 실제 프로세서 프로세스
+- 이 스크립트: binance-trade / binance-candle을 구독하면서 구간별 지연 측정
+
+구간
+- exchange→collector : envelope ts - E          (WebSocket + 수집기 루프)
+- collector→kafka    : 소비 시각 - envelope ts   (producer 배치 + 브로커 + fetch)
+- collector→emit     : candle ts - last_ingest_ts (Kafka 경유 + 프로세서 처리)
+- emit→consumer      : 소비 시각 - candle ts
+- total              : 소비 시각 - 마지막 체결 T (거래소 이벤트 → 캔들 수신)
+
+rate를 단계적으로 올리면서 처리량이 목표의 95% 미만이거나 total p99가 SLO를 넘는 첫 단계를 포화 지점으로 보고.
+
+실행:
+  docker-compose up -d zookeeper kafka && ./infra/setup-kafka.sh
+  python3 -m benchmarks.e2e_latency --rates 200,500,1000,2000,5000 --symbols 10 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from kafka import KafkaConsumer
+
+from benchmarks.fake_binance_ws import FakeBinanceServer
+from common.config import Config
+
+STAGES = ["exchange→collector", "collector→kafka", "collector→emit", "emit→consumer", "total"]
+SYMBOL_PREFIX = "BENCH"
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * (len(ordered) - 1)))] if ordered else float("nan")
+
+
+class LatencyConsumer(threading.Thread):
+    """binance-trade / binance-candle 소비 → 현재 단계(step)의 구간별 지연 샘플 수집"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.consumer = KafkaConsumer(
+            "binance-trade", Config.CANDLE_TOPIC,
+            bootstrap_servers=[Config.KAFKA_BOOTSTRAP_SERVERS],
+            group_id=f"e2e-bench-{uuid.uuid4().hex[:8]}",
+            auto_offset_reset="latest",
+            fetch_max_wait_ms=10,
+            value_deserializer=lambda v: json.loads(v.decode("utf-8")),
+        )
+        self.step = None  # None이면 샘플 버림 (단계 전환 구간)
+        self.samples = {}
+        self.trade_counts = {}
+        self.running = True
+
+    def wait_assigned(self, timeout_sec: float = 30):
+        started = time.time()
+        while not self.consumer.assignment() and time.time() - started < timeout_sec:
+            time.sleep(0.1)
+        if not self.consumer.assignment():
+            raise TimeoutError("Kafka 파티션 할당 실패 (브로커/토픽 확인)")
+
+    def _add(self, stage: str, value: float):
+        self.samples.setdefault(self.step, {s: [] for s in STAGES})[stage].append(value)
+
+    def run(self):
+        while self.running:
+            for tp, records in self.consumer.poll(timeout_ms=50).items():
+                now_ms = time.time() * 1000
+                if self.step is None:
+                    continue
+                for r in records:
+                    msg = r.value
+                    if not msg.get("symbol", "").startswith(SYMBOL_PREFIX):
+                        continue
+                    if tp.topic == "binance-trade":
+                        self._add("exchange→collector", msg["ts"] - msg["data"]["E"])
+                        self._add("collector→kafka", now_ms - msg["ts"])
+                        self.trade_counts[self.step] = self.trade_counts.get(self.step, 0) + 1
+                    else:
+                        self._add("collector→emit", msg["ts"] - msg["last_ingest_ts"])
+                        self._add("emit→consumer", now_ms - msg["ts"])
+                        self._add("total", now_ms - msg["last_trade_time"])
+
+    def close(self):
+        self.running = False
+        self.join(timeout=2)
+        self.consumer.close()
+
+
+def _spawn(args: list, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", *args],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+
+async def run_benchmark(args) -> list:
+    server = FakeBinanceServer(port=args.port, rate=args.rates[0], replay_path=args.replay)
+    await server.serve()
+
+    consumer = LatencyConsumer()
+    consumer.start()
+    consumer.wait_assigned()
+
+    symbols = ",".join(f"{SYMBOL_PREFIX.lower()}{i:03d}usdt" for i in range(args.symbols))
+    checkpoint_dir = tempfile.mkdtemp(prefix="e2e-bench-")
+    processes = [
+        _spawn(["processors.candle_processor", "--interval", "1s"], {"PROCESSOR_CHECKPOINT_DIR": checkpoint_dir}),
+        # 벤치마크 수집기는 실제 /dev/shm 상태 테이블과 거래소 REST(호가창 스냅샷 bootstrap)를 건드리지 않음
+        _spawn(["collectors.depth_kline_aggtrade", symbols], {
+            "BINANCE_WS_URL": f"ws://127.0.0.1:{args.port}/stream",
+            "SHM_STATE_ENABLED": "0",
+            "BOOK_SNAPSHOT_ENABLED": "0",
+        }),
+    ]
+    results = []
+    try:
+        print(f"⏳ 워밍업 ({args.warmup}초, 심볼 {args.symbols}개)...")
+        await asyncio.sleep(args.warmup)
+        for p in processes:
+            if p.poll() is not None:
+                raise RuntimeError(f"하위 프로세스 종료됨: {p.args}\n{p.stderr.read().decode()[-2000:]}")
+
+        for rate in args.rates:
+            server.set_rate(rate)
+            consumer.step = None
+            await asyncio.sleep(args.settle)  # 이전 단계 잔여분/전환 구간 제외
+            sent_before = server.sent_count
+            consumer.step = rate
+            await asyncio.sleep(args.duration)
+            consumer.step = None
+
+            sent = server.sent_count - sent_before
+            received = consumer.trade_counts.get(rate, 0)
+            stages = consumer.samples.get(rate, {s: [] for s in STAGES})
+            row = {"rate": rate, "sent_per_sec": sent / args.duration, "achieved_per_sec": received / args.duration}
+            for stage in STAGES:
+                ordered = sorted(stages[stage])
+                row[stage] = {"p50": percentile(ordered, 0.50), "p99": percentile(ordered, 0.99), "n": len(ordered)}
+            results.append(row)
+            print(f"  rate {rate:>7,}/s | 처리 {row['achieved_per_sec']:>9,.1f}/s | "
+                  f"total p50 {row['total']['p50']:.0f}ms p99 {row['total']['p99']:.0f}ms")
+    finally:
+        for p in processes:
+            p.terminate()
+        for p in processes:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        consumer.close()
+    return results
+
+
+def print_report(results: list, slo_ms: float):
+    print("\n📊 구간별 지연 (ms, p50 / p99)")
+    header = f"{'rate/s':>8} {'처리/s':>10} " + " ".join(f"{s:>22}" for s in STAGES)
+    print(header)
+    for row in results:
+        cells = " ".join(f"{row[s]['p50']:>10.1f} / {row[s]['p99']:>9.1f}" for s in STAGES)
+        print(f"{row['rate']:>8,} {row['achieved_per_sec']:>10,.1f} {cells}")
+
+    saturation = next(
+        (r for r in results
+         if r["achieved_per_sec"] < 0.95 * r["sent_per_sec"] or not r["total"]["p99"] <= slo_ms),
+        None,
+    )
+    if saturation:
+        print(f"\n🔥 포화 지점: {saturation['rate']:,} msgs/sec "
+              f"(처리 {saturation['achieved_per_sec']:,.1f}/s, total p99 {saturation['total']['p99']:.0f}ms, SLO {slo_ms:.0f}ms)")
+    else:
+        print(f"\n✅ 측정한 최대 rate {results[-1]['rate']:,} msgs/sec까지 포화 없음 (SLO {slo_ms:.0f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end 파이프라인 지연 벤치마크 (로컬 전용)")
+    parser.add_argument("--rates", default="200,500,1000,2000,5000", help="단계별 전체 msgs/sec (쉼표 구분)")
+    parser.add_argument("--symbols", type=int, default=10, help="심볼 수")
+    parser.add_argument("--duration", type=float, default=20.0, help="단계당 측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=10.0)
+    parser.add_argument("--settle", type=float, default=3.0, help="단계 전환 후 측정 제외 시간(초)")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="total p99 SLO (ms)")
+    parser.add_argument("--replay", help="녹화된 combined-stream 프레임 JSONL (기본: 합성 aggTrade)")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+    args.rates = [int(r) for r in args.rates.split(",")]
+
+    results = asyncio.run(run_benchmark(args))
+    print_report(results, args.slo_ms)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+로컬 가짜 Binance USDⓈ-M REST 서버 (REST 폴러 테스트/벤치마크용, 인터넷 불필요).
+
+- /fapi/v1/exchangeInfo (합성 심볼 --symbols개), /fapi/v1/openInterest, /fapi/v1/premiumIndex,
+  /futures/data/takerlongshortRatio — 응답 필드는 실제 API와 같은 이름
+- 실제 거래소처럼 분 단위 weight 집계 → X-MBX-USED-WEIGHT-1M 헤더, 한도(--weight-limit) 넘으면 429 + Retry-After
+  /futures/data는 5분 --data-limit회 별도 집계
+- 초별 요청 수 / weight, 새 TCP 연결 수를 기록 → 폴러의 분산/keep-alive 확인 (rest_poller_bench.py)
+
+단독 실행: python3 -m benchmarks.fake_binance_rest --port 9444 --symbols 300
+폴러 연결: BINANCE_REST_URL=http://127.0.0.1:9444 python3 -m collectors.rest_poller all
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+WEIGHTS = {
+    "/fapi/v1/exchangeInfo": 1,
+    "/fapi/v1/openInterest": 1,
+    "/fapi/v1/premiumIndex": 10,  # symbol 없이 전체 조회 (symbol 지정 시 1)
+}
+
+
+class FakeBinanceRest:
+    def __init__(self, host: str = "127.0.0.1", port: int = 9444, n_symbols: int = 300,
+                 weight_limit: int = 2400, data_limit: int = 1000, latency_ms: float = 0.0):
+        self.host = host
+        self.port = port
+        self.symbols = ["BTCUSDT", "ETHUSDT"] + [f"SYM{i:04d}USDT" for i in range(max(0, n_symbols - 2))]
+        self.weight_limit = weight_limit
+        self.data_limit = data_limit
+        self.latency_ms = latency_ms
+        self.minute = 0
+        self.used_weight = 0
+        self.data_window = 0
+        self.data_used = 0
+        self.per_second = Counter()   # 초 → 요청 수
+        self.weight_per_second = Counter()
+        self.connections = set()
+        self.requests = 0
+        self.rejected = 0
+        self.runner = None
+
+    def _charge(self, path: str, params) -> tuple:
+        """(한도 초과 여부, Retry-After 초) — weight는 실제 거래소처럼 분 경계에서 초기화"""
+        now = time.time()
+        self.per_second[int(now)] += 1
+        if path.startswith("/futures/data/"):
+            window = int(now // 300)
+            if window != self.data_window:
+                self.data_window, self.data_used = window, 0
+            self.data_used += 1
+            if self.data_used > self.data_limit:
+                return True, 300 - now % 300
+            return False, 0
+        minute = int(now // 60)
+        if minute != self.minute:
+            self.minute, self.used_weight = minute, 0
+        weight = WEIGHTS.get(path, 1)
+        if path == "/fapi/v1/premiumIndex" and "symbol" in params:
+            weight = 1
+        self.used_weight += weight
+        self.weight_per_second[int(now)] += weight
+        if self.used_weight > self.weight_limit:
+            return True, 60 - now % 60
+        return False, 0
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.requests += 1
+        self.connections.add(id(request.transport))
+        limited, retry_after = self._charge(request.path, request.query)
+        headers = {"X-MBX-USED-WEIGHT-1M": str(self.used_weight)}
+        if limited:
+            self.rejected += 1
+            return web.json_response({"code": -1003, "msg": "Too many requests"}, status=429,
+                                     headers={**headers, "Retry-After": str(int(retry_after) + 1)})
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000 * random.uniform(0.5, 1.5))
+        resp = await handler(request)
+        resp.headers.update(headers)
+        return resp
+
+    def _symbol(self, request) -> str:
+        symbol = request.query.get("symbol", "")
+        if symbol not in self.symbols:
+            raise web.HTTPBadRequest(text='{"code":-1121,"msg":"Invalid symbol."}', content_type="application/json")
+        return symbol
+
+    async def exchange_info(self, request):
+        return web.json_response({"symbols": [
+            {"symbol": s, "contractType": "PERPETUAL", "quoteAsset": "USDT", "status": "TRADING"} for s in self.symbols
+        ]})
+
+    async def open_interest(self, request):
+        symbol = self._symbol(request)
+        return web.json_response({
+            "symbol": symbol, "openInterest": f"{random.uniform(1e3, 1e6):.3f}", "time": int(time.time() * 1000),
+        })
+
+    def _premium(self, symbol: str, now_ms: int) -> dict:
+        mark = random.uniform(1, 50_000)
+        return {
+            "symbol": symbol, "markPrice": f"{mark:.2f}", "indexPrice": f"{mark * 0.9999:.2f}",
+            "lastFundingRate": f"{random.uniform(-0.0005, 0.0005):.8f}", "interestRate": "0.00010000",
+            "nextFundingTime": (now_ms // 28_800_000 + 1) * 28_800_000, "time": now_ms,
+        }
+
+    async def premium_index(self, request):
+        now_ms = int(time.time() * 1000)
+        if "symbol" in request.query:
+            return web.json_response(self._premium(self._symbol(request), now_ms))
+        return web.json_response([self._premium(s, now_ms) for s in self.symbols])
+
+    async def taker_long_short(self, request):
+        self._symbol(request)
+        period_start = int(time.time() * 1000) // 300_000 * 300_000  # 5분 기간
+        buy, sell = random.uniform(100, 1000), random.uniform(100, 1000)
+        return web.json_response([{
+            "buySellRatio": f"{buy / sell:.4f}", "buyVol": f"{buy:.4f}", "sellVol": f"{sell:.4f}",
+            "timestamp": period_start,
+        }])
+
+    async def start(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/fapi/v1/exchangeInfo", self.exchange_info)
+        app.router.add_get("/fapi/v1/openInterest", self.open_interest)
+        app.router.add_get("/fapi/v1/premiumIndex", self.premium_index)
+        app.router.add_get("/futures/data/takerlongshortRatio", self.taker_long_short)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="가짜 Binance REST 서버")
+    parser.add_argument("--port", type=int, default=9444)
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--weight-limit", type=int, default=2400)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeBinanceRest(port=args.port, n_symbols=args.symbols, weight_limit=args.weight_limit,
+                             latency_ms=args.latency_ms)
+    await server.start()
+    print(f"🧪 가짜 Binance REST: http://127.0.0.1:{args.port} (심볼 {len(server.symbols)}개, weight 한도 {args.weight_limit}/분)")
+    while True:
+        await asyncio.sleep(10)
+        print(f"   요청 {server.requests:,} | 연결 {len(server.connections)} | used weight {server.used_weight} | "
+              f"429 {server.rejected}")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
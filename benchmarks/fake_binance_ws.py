@@ -0,0 +1,127 @@
+"""
+로컬 가짜 Binance combined-stream WebSocket 서버 (인터넷 없이 벤치마크/테스트용).
+
+- ws://127.0.0.1:<port>/stream?streams=btcusdt@aggTrade/... 형식 그대로 받음
+- 구독한 <symbol>@aggTrade 스트림마다 합성 aggTrade를 목표 rate(전체 msgs/sec)로 전송
+- --replay: 녹화된 combined-stream 프레임(JSONL)을 재생 (심볼/E/T는 구독 스트림·전송 시각으로 교체)
+- E/T = 서버 전송 시각(ms) → 하류에서 "거래소 이벤트 → 저장" 지연의 기준점
+
+단독 실행: python3 -m benchmarks.fake_binance_ws --rate 2000
+수집기 연결: BINANCE_WS_URL=ws://127.0.0.1:9443/stream python3 -m collectors.depth_kline_aggtrade btcusdt,ethusdt
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+
+class FakeBinanceServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 9443, rate: float = 100.0, replay_path: str = None):
+        self.host = host
+        self.port = port
+        self.rate = rate  # 전체 초당 메시지 수 (실행 중 변경 가능)
+        self.replay_frames = self._load_replay(replay_path) if replay_path else None
+        self.sent_count = 0
+        self.clients = 0
+        self._agg_id = itertools.count(1)
+        self._prices = {}
+
+    @staticmethod
+    def _load_replay(path: str) -> list:
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _synthetic_frame(self, stream: str, now_ms: int) -> str:
+        symbol = stream.split("@", 1)[0].upper()
+        price = self._prices.get(symbol, 100.0) * (1 + random.uniform(-0.0005, 0.0005))
+        self._prices[symbol] = price
+        agg_id = next(self._agg_id)
+        return json.dumps({
+            "stream": stream,
+            "data": {
+                "e": "aggTrade", "E": now_ms, "s": symbol, "a": agg_id,
+                "p": f"{price:.2f}", "q": f"{random.uniform(0.001, 2):.3f}",
+                "f": agg_id, "l": agg_id, "T": now_ms, "m": random.random() < 0.5,
+            },
+        })
+
+    def _replay_frame(self, index: int, stream: str, now_ms: int) -> str:
+        """녹화 프레임의 가격/수량 흐름은 유지하고 심볼/시각만 구독한 스트림 기준으로 교체"""
+        data = dict(self.replay_frames[index % len(self.replay_frames)].get("data", {}))
+        data["s"] = stream.split("@", 1)[0].upper()
+        data["E"] = data["T"] = now_ms
+        return json.dumps({"stream": stream, "data": data})
+
+    async def _handler(self, ws, path=None):
+        # websockets 구버전은 handler(ws, path), 신버전은 ws.request.path
+        path = path or getattr(ws, "path", None) or ws.request.path
+        streams = parse_qs(urlparse(path).query).get("streams", [""])[0].split("/")
+        trade_streams = [s for s in streams if s.endswith("@aggTrade")]
+        self.clients += 1
+        print(f"🔌 클라이언트 연결: {len(streams)}개 스트림 (aggTrade {len(trade_streams)}개)")
+        if not trade_streams:
+            await ws.wait_closed()
+            return
+
+        index = 0
+        segment_rate = None
+        try:
+            while True:
+                # rate가 바뀌면 그 시점부터 새 구간으로 계산 (몰아서 보내는 burst 방지)
+                if self.rate != segment_rate:
+                    segment_rate, segment_start, sent_here = self.rate, time.perf_counter(), 0
+                # 1ms 틱마다 "구간 시작 후 지금까지 보냈어야 할 개수"만큼 전송
+                elapsed = time.perf_counter() - segment_start
+                due = int(segment_rate * elapsed) - sent_here
+                if due > 0:
+                    now_ms = int(time.time() * 1000)
+                    for _ in range(due):
+                        stream = trade_streams[index % len(trade_streams)]
+                        if self.replay_frames:
+                            frame = self._replay_frame(index, stream, now_ms)
+                        else:
+                            frame = self._synthetic_frame(stream, now_ms)
+                        await ws.send(frame)
+                        index += 1
+                    sent_here += due
+                    self.sent_count += due
+                await asyncio.sleep(0.001)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.clients -= 1
+
+    def set_rate(self, rate: float):
+        """연결을 유지한 채 전송 rate 변경 (다음 틱부터 적용)"""
+        self.rate = rate
+
+    async def serve(self):
+        return await websockets.serve(self._handler, self.host, self.port, max_queue=None)
+
+
+async def _main():
+    parser = argparse.ArgumentParser(description="로컬 가짜 Binance WebSocket 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--rate", type=float, default=100.0, help="전체 초당 aggTrade 메시지 수")
+    parser.add_argument("--replay", help="녹화된 combined-stream 프레임 JSONL 경로")
+    args = parser.parse_args()
+
+    server = FakeBinanceServer(args.host, args.port, args.rate, args.replay)
+    await server.serve()
+    print(f"🚀 가짜 Binance WS 서버: ws://{args.host}:{args.port}/stream (rate {args.rate}/s)")
+    while True:
+        await asyncio.sleep(1)
+        print(f"⏱️ 전송 누적: {server.sent_count:,} | 클라이언트 {server.clients}", end="\r")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        print("\n🛑 중단")
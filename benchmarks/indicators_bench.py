@@ -0,0 +1,117 @@
+"""
+기술적 지표 벤치마크: 증분 엔진(common/indicators.py) vs 봉마다 전체 구간 재계산.
+
+- 합성 1분봉(랜덤워크)을 N개 심볼 x T개 봉으로 만들고, 봉 시점마다 전체 심볼 지표를 갱신
+- incremental: IndicatorEngine.update 1회 (심볼 벡터, 봉당 O(1))
+- naive      : 심볼마다 지금까지의 전체 이력으로 EMA/RSI/ATR을 처음부터 다시 계산 + 최근 구간 VWAP/변동성
+  (naive는 느려서 마지막 --naive-bars개 봉 시점만 측정하고 봉 시점당 시간으로 비교)
+- 마지막 봉의 두 결과가 같은지도 확인 (엔진 정확성 검증)
+
+실행: python3 -m benchmarks.indicators_bench --symbols 500 --bars 1440
+"""
+import argparse
+import time
+
+import numpy as np
+
+from common.indicators import INDICATOR_COLUMNS, IndicatorEngine
+
+
+def make_bars(n_symbols: int, n_bars: int, seed: int = 7):
+    """심볼 x 봉 (high, low, close, volume) 합성 데이터"""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(1, 50_000, size=(n_symbols, 1))
+    close = base * np.exp(np.cumsum(rng.normal(0, 0.002, size=(n_symbols, n_bars)), axis=1))
+    spread = np.abs(rng.normal(0, 0.001, size=(n_symbols, n_bars))) * close
+    high = close + spread
+    low = close - spread
+    volume = rng.exponential(10.0, size=(n_symbols, n_bars))
+    return high, low, close, volume
+
+
+def naive_indicators(high, low, close, volume, engine: IndicatorEngine) -> dict:
+    """심볼 1개의 전체 이력 → 마지막 봉 지표 (엔진과 같은 정의를 처음부터 다시 계산)"""
+    n = len(close)
+    ema = close[0]
+    for c in close[1:]:
+        ema += engine.ema_alpha * (c - ema)
+
+    diff = np.diff(close)
+    gain = np.maximum(diff, 0.0)
+    loss = np.maximum(-diff, 0.0)
+    avg_gain = avg_loss = 0.0
+    for i in range(len(diff)):
+        k = min(i + 1, engine.rsi_period)
+        avg_gain += (gain[i] - avg_gain) / k
+        avg_loss += (loss[i] - avg_loss) / k
+    if n - 1 < engine.rsi_period:
+        rsi = np.nan
+    elif avg_loss > 0:
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    else:
+        rsi = 100.0 if avg_gain > 0 else 50.0
+
+    prev = np.concatenate(([close[0]], close[:-1]))
+    tr = np.maximum.reduce([high - low, np.abs(high - prev), np.abs(low - prev)])
+    tr[0] = high[0] - low[0]
+    atr = 0.0
+    for i in range(n):
+        atr += (tr[i] - atr) / min(i + 1, engine.atr_period)
+    if n < engine.atr_period:
+        atr = np.nan
+
+    w = engine.vwap_window
+    tp = (high[-w:] + low[-w:] + close[-w:]) / 3.0
+    v_sum = volume[-w:].sum()
+    vwap = (tp * volume[-w:]).sum() / v_sum if v_sum > 0 else close[-1]
+
+    r = np.log(close[1:] / close[:-1])
+    realized_vol = np.sqrt((r[-engine.vol_window:] ** 2).sum()) if n > engine.vol_window \
+        else np.sqrt((r ** 2).sum())
+    return {"ema": ema, "rsi": rsi, "atr": atr, "vwap": vwap, "realized_vol": realized_vol}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="증분 지표 엔진 vs 전체 재계산 벤치마크")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=1440, help="심볼당 봉 수 (1440 = 1분봉 하루)")
+    parser.add_argument("--naive-bars", type=int, default=5, help="naive 측정할 마지막 봉 시점 수")
+    args = parser.parse_args()
+
+    high, low, close, volume = make_bars(args.symbols, args.bars)
+    symbols = [f"SYM{i:04d}USDT" for i in range(args.symbols)]
+
+    engine = IndicatorEngine()
+    started = time.perf_counter()
+    for t in range(args.bars):
+        last = engine.update(symbols, high[:, t], low[:, t], close[:, t], volume[:, t])
+    incremental_sec = time.perf_counter() - started
+    per_step_inc = incremental_sec / args.bars
+
+    started = time.perf_counter()
+    for t in range(args.bars - args.naive_bars, args.bars):
+        naive = [
+            naive_indicators(high[s, :t + 1], low[s, :t + 1], close[s, :t + 1], volume[s, :t + 1], engine)
+            for s in range(args.symbols)
+        ]
+    per_step_naive = (time.perf_counter() - started) / args.naive_bars
+
+    max_err = {}
+    for name in INDICATOR_COLUMNS:
+        expected = np.array([row[name] for row in naive])
+        scale = np.maximum(np.abs(expected), 1e-12)
+        both_nan = np.isnan(expected) & np.isnan(last[name])  # 워밍업 전은 둘 다 NaN이어야 정상
+        err = np.where(both_nan, 0.0, np.abs(last[name] - expected) / scale)
+        max_err[name] = float(np.max(err))
+
+    print(f"📊 심볼 {args.symbols} x 봉 {args.bars}")
+    print(f"   incremental: 봉 시점당 {per_step_inc * 1000:.3f}ms "
+          f"(심볼-봉당 {per_step_inc / args.symbols * 1e6:.2f}µs, 전체 {incremental_sec:.2f}초)")
+    print(f"   naive      : 봉 시점당 {per_step_naive * 1000:.1f}ms (이력 {args.bars}봉 기준)")
+    print(f"   speedup    : x{per_step_naive / per_step_inc:,.0f}")
+    ok = all(err < 1e-9 for err in max_err.values())
+    print(f"{'✅' if ok else '❌'} 마지막 봉 상대오차: " + ", ".join(f"{k}={v:.1e}" for k, v in max_err.items()))
+
+
+if __name__ == "__main__":
+    main()
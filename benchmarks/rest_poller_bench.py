@@ -0,0 +1,93 @@
+"""
+REST 폴러 벤치마크: collectors/rest_poller.py를 가짜 REST 서버(fake_binance_rest.py)에 붙여서 확인 (Kafka 불필요).
+
+- 초별 요청 수: 평균 / 최대 / 변동계수 → 주기 안에서 고르게 분산되는지
+- 분당 최대 used weight vs 예산, 429 횟수 (예산 안에서 돌면 0)
+- 새 TCP 연결 수 (keep-alive 풀이면 --pool 이하)
+- open interest 심볼별 요청 횟수 최소/최대 → 모든 심볼이 같은 주기로 도는지
+- Kafka 대신 메시지를 메모리에 모아서 envelope/토픽 라우팅 확인
+
+실행: python3 -m benchmarks.rest_poller_bench --symbols 300 --duration 60
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+from benchmarks.fake_binance_rest import FakeBinanceRest
+from collectors.rest_poller import EXCHANGE_LIMITS_PER_MIN, RestMetricsPoller
+from common.config import Config
+
+
+class CaptureSink:
+    """KafkaProducerWrapper 대신 (topic, key, value) 기록"""
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, topic: str, value: dict, key: str = None, headers: list = None):
+        self.messages.append((topic, key, value))
+
+    def flush(self):
+        pass
+
+
+async def run(args):
+    server = FakeBinanceRest(port=args.port, n_symbols=args.symbols, latency_ms=args.latency_ms)
+    await server.start()
+    sink = CaptureSink()
+    poller = RestMetricsPoller(server.symbols, kafka=sink, rest_url=f"http://127.0.0.1:{args.port}",
+                               budget=args.budget, pool_size=args.pool)
+    requested = Counter()
+    original = poller._request
+
+    async def counting_request(metric, symbol=None):
+        requested[(metric.name, symbol)] += 1
+        return await original(metric, symbol)
+
+    poller._request = counting_request
+    task = asyncio.create_task(poller.run())
+    started = time.time()
+    await asyncio.sleep(args.duration)
+    poller.stop()
+    await task
+    await server.stop()
+
+    seconds = sorted(server.per_second)
+    full = [server.per_second[s] for s in seconds[1:-1]]  # 처음/마지막 초는 일부만
+    minutes = Counter()
+    for sec, weight in server.weight_per_second.items():
+        minutes[sec // 60] += weight
+    oi_counts = [requested[("openInterest", s)] for s in server.symbols]
+    topics = Counter(topic for topic, _, _ in sink.messages)
+    sample = next((v for t, _, v in sink.messages if t == Config.get_topic("x@openInterest")), None)
+
+    print(f"\n📊 {time.time() - started:.0f}초 | 심볼 {len(server.symbols)} | 예산 {args.budget:.0%} "
+          f"(weight {EXCHANGE_LIMITS_PER_MIN['weight'] * args.budget:,.0f}/분) | 풀 {args.pool}")
+    print(f"   주기: " + ", ".join(f"{name} {sec:.1f}초" for name, sec in poller.intervals.items()))
+    if full:
+        mean = statistics.mean(full)
+        print(f"   초별 요청: 평균 {mean:.1f} | 최대 {max(full)} | 변동계수 {statistics.pstdev(full) / mean:.2f}")
+    print(f"   분당 weight 최대 {max(minutes.values(), default=0):,} (분 경계 기준) | 429 {server.rejected} | "
+          f"새 연결 {len(server.connections)}")
+    print(f"   openInterest 심볼별 요청: 최소 {min(oi_counts)} / 최대 {max(oi_counts)}")
+    print(f"   전송: " + ", ".join(f"{topic} {n:,}" for topic, n in sorted(topics.items())))
+    if sample:
+        print(f"   envelope 예: stream={sample['stream']} data.e={sample['data']['e']} symbol={sample['symbol']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="REST 폴러 분산/한도/커넥션 재사용 확인")
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--budget", type=float, default=0.5)
+    parser.add_argument("--pool", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="가짜 서버 응답 지연 (평균)")
+    parser.add_argument("--port", type=int, default=9444)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+miniTicker 스크리너 벤치마크: 열 배열 제자리 갱신(common/screener.py) vs 심볼별 dict + 매 프레임 sorted() (Kafka/인터넷 불필요).
+
+- 합성 !miniTicker@arr 프레임: --symbols개 심볼 랜덤워크, 프레임마다 --update-ratio 비율만 포함 (실제처럼 바뀐 심볼만)
+  --spikes개 심볼은 마지막 구간에서 거래대금 유입을 10배로 → volume_spikes 상위에 잡히는지 확인
+- parse   : 프레임 JSON 파싱 (수집기에서 어차피 하는 일, 비교 기준)
+- update  : TickerScreener.update p50/p99
+- snapshot: 전체 지표 + 순위 + 상위 목록 + JSON 직렬화 p50/p99, 메시지 크기
+- naive   : 심볼별 dict에 float() 갱신 + 전체 sorted()로 같은 상승/하락/거래대금 상위 → 시간 비교 + 결과 일치 확인
+
+실행: python3 -m benchmarks.screener_bench --symbols 300,600 --frames 1200
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from common.screener import TickerScreener
+
+
+def make_frames(n_symbols: int, n_frames: int, update_ratio: float, n_spikes: int, seed: int = 7):
+    """(JSON 프레임 목록, 급증 심볼) — E는 1초 간격"""
+    rng = np.random.default_rng(seed)
+    symbols = ["BTCUSDT", "ETHUSDT"] + [f"SYM{i:04d}USDT" for i in range(n_symbols - 2)]
+    open_ = rng.uniform(0.01, 50_000, n_symbols)
+    price = open_ * np.exp(rng.normal(0, 0.03, n_symbols))
+    flow = rng.lognormal(np.log(2e4), 1.0, n_symbols)  # 심볼별 초당 거래대금 평균
+    quote = flow * 86_400
+    spikes = rng.choice(np.arange(2, n_symbols), n_spikes, replace=False)
+    spike_from = int(n_frames * 0.9)
+    frames = []
+    base_ms = 1_700_000_000_000
+    for f in range(n_frames):
+        price *= np.exp(rng.normal(0, 0.0005, n_symbols))
+        inflow = flow * rng.exponential(1.0, n_symbols)
+        if f >= spike_from:
+            inflow[spikes] *= 10
+        quote += inflow - flow  # 24h 롤링: 24시간 전 빠진 거래대금 ≈ 평균
+        event = base_ms + f * 1000
+        rows = np.flatnonzero(rng.random(n_symbols) < update_ratio)
+        frames.append(json.dumps({"stream": "!miniTicker@arr", "data": [{
+            "e": "24hrMiniTicker", "E": event, "s": symbols[i], "c": f"{price[i]:.6f}", "o": f"{open_[i]:.6f}",
+            "h": f"{max(price[i], open_[i]) * 1.01:.6f}", "l": f"{min(price[i], open_[i]) * 0.99:.6f}",
+            "v": f"{quote[i] / price[i]:.3f}", "q": f"{quote[i]:.2f}",
+        } for i in rows]}))
+    return frames, {symbols[i] for i in spikes}
+
+
+class NaiveScreener:
+    """심볼별 dict + 매 프레임 전체 정렬 (비교용)"""
+
+    def __init__(self, top_k: int, min_quote_volume: float):
+        self.top_k = top_k
+        self.min_quote_volume = min_quote_volume
+        self.state = {}
+
+    def update(self, tickers: list):
+        for t in tickers:
+            self.state[t["s"]] = {"c": float(t["c"]), "o": float(t["o"]), "q": float(t["q"])}
+
+    def snapshot(self) -> dict:
+        rows = [(s, (v["c"] - v["o"]) / v["o"] * 100.0, v["q"]) for s, v in self.state.items()
+                if v["q"] >= self.min_quote_volume and v["o"] > 0]
+        by_change = sorted(rows, key=lambda r: r[1], reverse=True)
+        return {
+            "gainers": [r[0] for r in by_change[:self.top_k]],
+            "losers": [r[0] for r in by_change[::-1][:self.top_k]],
+            "top_volume": [r[0] for r in sorted(rows, key=lambda r: r[2], reverse=True)[:self.top_k]],
+            "ranks": [r[0] for r in by_change],
+        }
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+
+def run(n_symbols: int, n_frames: int, update_ratio: float, n_spikes: int, top_k: int):
+    frames, spike_symbols = make_frames(n_symbols, n_frames, update_ratio, n_spikes)
+    # 벤치마크 길이에 맞게 반감기를 줄임 (실행 기본값은 60초/3600초)
+    screener = TickerScreener(top_k=top_k, move_window_sec=60, fast_halflife_sec=15,
+                              slow_halflife_sec=n_frames * 0.3, min_quote_volume=1_000_000)
+    naive = NaiveScreener(top_k, 1_000_000)
+    parse_ms, update_ms, snapshot_ms, naive_ms = [], [], [], []
+    size = 0
+    for frame in frames:
+        started = time.perf_counter()
+        tickers = json.loads(frame)["data"]
+        parse_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        screener.update(tickers)
+        update_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        snapshot = screener.snapshot()
+        payload = json.dumps(snapshot)
+        snapshot_ms.append((time.perf_counter() - started) * 1000)
+        size = len(payload)
+
+        started = time.perf_counter()
+        naive.update(tickers)
+        expected = naive.snapshot()
+        naive_ms.append((time.perf_counter() - started) * 1000)
+
+    # 마지막 프레임 기준 결과 비교 (등락률은 같은 float 연산이라 순서까지 같아야 함)
+    ranked = [s for _, s in sorted(zip(snapshot["ranks"]["change_rank"], snapshot["ranks"]["symbol"]))]
+    match = (
+        [s for s, _ in snapshot["gainers"]] == expected["gainers"]
+        and [s for s, _ in snapshot["losers"]] == expected["losers"]
+        and [s for s, _ in snapshot["top_volume"]] == expected["top_volume"]
+        and ranked == expected["ranks"]
+    )
+    caught = len(spike_symbols & {s for s, _ in snapshot["volume_spikes"]})
+    return {
+        "symbols": n_symbols,
+        "per_frame": int(np.mean([len(json.loads(f)["data"]) for f in frames[:50]])),
+        "parse_p50": percentile(parse_ms, 50),
+        "update_p50": percentile(update_ms[10:], 50),
+        "update_p99": percentile(update_ms[10:], 99),
+        "snapshot_p50": percentile(snapshot_ms[10:], 50),
+        "snapshot_p99": percentile(snapshot_ms[10:], 99),
+        "snapshot_kb": size / 1024,
+        "naive_p50": percentile(naive_ms[10:], 50),
+        "match": match,
+        "spikes": f"{caught}/{len(spike_symbols)}",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="miniTicker 열 배열 스크리너 vs dict + sorted")
+    parser.add_argument("--symbols", default="300,600")
+    parser.add_argument("--frames", type=int, default=1200, help="프레임 수 (1프레임 = 1초)")
+    parser.add_argument("--update-ratio", type=float, default=0.7, help="프레임마다 포함되는 심볼 비율")
+    parser.add_argument("--spikes", type=int, default=5, help="거래대금 급증 주입 심볼 수")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"🧪 합성 !miniTicker@arr {args.frames}프레임, 프레임당 심볼 {args.update_ratio:.0%}, 상위 {args.top}\n")
+    print(f"{'심볼':>6} | {'프레임당':>6} | {'JSON 파싱':>9} | {'갱신 p50':>9} | {'갱신 p99':>9} | {'스냅샷 p50':>10} | "
+          f"{'스냅샷 p99':>10} | {'메시지':>7} | {'naive p50':>9} | {'결과 일치':>8} | {'급증 감지':>8}")
+    for n in [int(s) for s in args.symbols.split(",")]:
+        r = run(n, args.frames, args.update_ratio, args.spikes, args.top)
+        print(f"{r['symbols']:>6} | {r['per_frame']:>8} | {r['parse_p50']:>7.3f}ms | {r['update_p50']:>7.3f}ms | "
+              f"{r['update_p99']:>7.3f}ms | {r['snapshot_p50']:>8.3f}ms | {r['snapshot_p99']:>8.3f}ms | "
+              f"{r['snapshot_kb']:>5.0f}KB | {r['naive_p50']:>7.3f}ms | {str(r['match']):>9} | {r['spikes']:>9}")
+
+
+if __name__ == "__main__":
+    main()
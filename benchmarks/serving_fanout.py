@@ -0,0 +1,143 @@
+"""
+서빙 API WebSocket fan-out 벤치마크 (Kafka 없이 로컬 단독 실행).
+
+- 이 프로세스: MarketDataServer(consume_kafka=False)를 띄우고 합성 캔들을 --rate개/초로 주입
+- 클라이언트 프로세스 --procs개: 합계 --clients개 WebSocket 연결, 전부 같은 심볼 채널 구독
+- 지연 = 클라이언트 수신 시각 - 주입 시각(ts), p50/p99/max와 전달률 출력 (목표: 수천 구독자 p99 < 10ms)
+- 서버 fan-out 시간(메시지 1건을 전체 구독자 소켓에 write하는 데 걸린 시간)도 따로 출력
+  → 클라이언트와 서버가 같은 코어를 나눠 쓰면 end-to-end 지연에는 클라이언트 처리 시간이 섞이므로 같이 볼 것
+
+실행: python3 -m benchmarks.serving_fanout --clients 2000 --procs 4 --rate 20 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import resource
+import time
+
+import aiohttp
+from aiohttp import web
+
+from serving.market_data_api import MarketDataServer
+
+CHANNEL_SYMBOL = "BENCHUSDT"
+
+
+def _raise_nofile():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def _client_main(port: int, connections: int, duration: float, ready, results):
+    latencies = []
+    received = 0
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:  # 기본 100개 제한 해제
+        sockets = []
+        for _ in range(connections):
+            ws = await session.ws_connect(f"http://127.0.0.1:{port}/ws")
+            await ws.send_str(json.dumps({"op": "subscribe", "channels": [f"candle:{CHANNEL_SYMBOL}:1s"]}))
+            sockets.append(ws)
+        ready.put(connections)
+
+        async def read(ws):
+            nonlocal received
+            async for msg in ws:
+                now_ms = time.time() * 1000
+                data = json.loads(msg.data)
+                if data.get("ts"):
+                    latencies.append(now_ms - data["ts"])
+                    received += 1
+
+        readers = [asyncio.create_task(read(ws)) for ws in sockets]
+        await asyncio.sleep(duration)
+        for task in readers:
+            task.cancel()
+        for ws in sockets:
+            await ws.close()
+    results.put((received, latencies))
+
+
+def _client_process(port, connections, duration, ready, results):
+    _raise_nofile()
+    asyncio.run(_client_main(port, connections, duration, ready, results))
+
+
+async def run_benchmark(args):
+    server = MarketDataServer(consume_kafka=False)
+    runner = web.AppRunner(server.build_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+
+    ctx = mp.get_context("spawn")
+    ready, results = ctx.Queue(), ctx.Queue()
+    per_proc = args.clients // args.procs
+    run_sec = args.duration + 5
+    procs = [
+        ctx.Process(target=_client_process, args=(args.port, per_proc, run_sec, ready, results), daemon=True)
+        for _ in range(args.procs)
+    ]
+    for p in procs:
+        p.start()
+    loop = asyncio.get_running_loop()
+    connected = 0
+    for _ in procs:
+        connected += await loop.run_in_executor(None, ready.get)
+    print(f"🔌 구독자 {connected:,}명 연결 완료 → {args.rate}개/초 주입 {args.duration:.0f}초")
+
+    sent = 0
+    fanout_ms = []
+    started = time.time()
+    window_start = int(started * 1000)
+    while time.time() - started < args.duration:
+        t0 = time.perf_counter()
+        server.on_candle({
+            "symbol": CHANNEL_SYMBOL, "interval": "1s", "window_start": window_start + sent * 1000,
+            "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0, "quote_volume": 1.0,
+            "trades_count": 1, "is_closed": True, "ts": time.time() * 1000,
+        })
+        fanout_ms.append((time.perf_counter() - t0) * 1000)
+        sent += 1
+        await asyncio.sleep(1.0 / args.rate)
+
+    received, latencies = 0, []
+    for _ in procs:
+        n, samples = await loop.run_in_executor(None, results.get)
+        received += n
+        latencies.extend(samples)
+    for p in procs:
+        p.join(timeout=5)
+    await runner.cleanup()
+
+    latencies.sort()
+    expected = sent * connected
+    if not latencies:
+        print("❌ 수신된 메시지 없음")
+        return
+    last = len(latencies) - 1
+    p50, p99 = latencies[int(last * 0.50)], latencies[int(last * 0.99)]
+    print(f"📊 주입 {sent}건 x 구독자 {connected:,} = 기대 {expected:,} | 수신 {received:,} "
+          f"({received / expected * 100:.1f}%) | 서버 전송 {server.delivered:,}")
+    print(f"   지연 p50={p50:.2f}ms p99={p99:.2f}ms max={latencies[last]:.2f}ms "
+          f"{'✅' if p99 < args.slo_ms else '❌'} (SLO p99 < {args.slo_ms:.0f}ms)")
+    fanout_ms.sort()
+    print(f"   서버 fan-out (1건 → 구독자 {connected:,}명 write) p50={fanout_ms[len(fanout_ms) // 2]:.2f}ms "
+          f"max={fanout_ms[-1]:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서빙 API WebSocket fan-out 지연 벤치마크")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--procs", type=int, default=4, help="클라이언트 프로세스 수")
+    parser.add_argument("--rate", type=float, default=20.0, help="초당 주입 메시지 수")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--slo-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    _raise_nofile()
+    asyncio.run(run_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
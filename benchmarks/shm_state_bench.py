@@ -0,0 +1,74 @@
+"""
+공유 메모리 최신 상태(common/shm_state.py) 읽기 벤치마크 + seqlock 일관성 확인.
+
+- writer 프로세스: 심볼 N개의 호가를 쉬지 않고 갱신 (bid=k, ask=k+1, bid_qty=k, ask_qty=k 로 한 번에 기록)
+- reader(이 프로세스): 무작위 심볼을 계속 읽으면서 읽기 시간 p50/p99, 재시도 수 측정
+  같은 갱신의 필드가 섞여 읽히면(torn read) ask - bid != 1 또는 bid != bid_qty 로 드러남
+
+실행: python3 -m benchmarks.shm_state_bench --symbols 200 --duration 5
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import tempfile
+import time
+
+from common.shm_state import ShmStateReader, ShmStateWriter
+
+
+def _writer(path: str, symbols: list, duration: float, ready):
+    writer = ShmStateWriter(path)
+    for symbol in symbols:
+        writer.update_book(symbol, 0.0, 0.0, 1.0, 0.0, 0)
+    ready.set()
+    k = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        for symbol in symbols:
+            k += 1
+            writer.update_book(symbol, float(k), float(k), float(k + 1), float(k), k)
+    writer.close()
+    print(f"✍️ writer 갱신 {k:,}건 ({k / duration:,.0f}/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공유 메모리 최신 상태 읽기 벤치마크")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    path = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), f"shm-bench-{os.getpid()}")
+    symbols = [f"BENCH{i}USDT" for i in range(args.symbols)]
+    ready = mp.Event()
+    proc = mp.Process(target=_writer, args=(path, symbols, args.duration, ready))
+    proc.start()
+    ready.wait()
+
+    reader = ShmStateReader(path)
+    samples = []
+    torn = misses = 0
+    deadline = time.time() + args.duration - 0.5
+    while time.time() < deadline:
+        symbol = random.choice(symbols)
+        t0 = time.perf_counter_ns()
+        state = reader.get(symbol)
+        samples.append(time.perf_counter_ns() - t0)
+        if state is None:
+            misses += 1
+        elif state.ask_price - state.bid_price != 1.0 or state.bid_price != state.bid_qty:
+            torn += 1
+    proc.join()
+    reader.close()
+    os.unlink(path)
+
+    samples.sort()
+    last = len(samples) - 1
+    print(f"📊 읽기 {len(samples):,}건 | p50={samples[last // 2] / 1000:.2f}µs "
+          f"p99={samples[int(last * 0.99)] / 1000:.2f}µs max={samples[last] / 1000:.1f}µs | "
+          f"재시도 {reader.retries:,} | 실패 {misses}")
+    print(f"{'✅' if torn == 0 else '❌'} torn read {torn}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 import asyncio
 from common.config import Config
 from common.kafka_utils import KafkaProducerWrapper
+from common.shm_state import ShmStateLocked, ShmStateWriter
+from common.tracing import Tracer, now_us
+from collectors.book_snapshots import BookSnapshotPublisher
 import websockets
 import json
 import time
@@ -11,10 +14,12 @@ from utils.binance_stream_enum import BinanceStreamType
 
 class BaseBinanceCollector(ABC):
     def __init__(self, symbol: str, streams: list):
-        self.symbol = symbol.lower()
+        # 쉼표로 여러 심볼 지정 가능 ("btcusdt,ethusdt") → 한 연결로 심볼 x 스트림 전부 구독
+        self.symbols = [s.strip().lower() for s in symbol.split(",") if s.strip()]
+        self.symbol = self.symbols[0]
         self.streams = streams
-        self.base_url = "wss://fstream.binance.com/stream?streams="
-        self.url = f"{self.base_url}{'/'.join([f'{self.symbol}@{s.value if isinstance(s, BinanceStreamType) else s}' for s in streams])}"
+        self.base_url = f"{Config.BINANCE_WS_URL}?streams="
+        self.url = f"{self.base_url}{'/'.join(self._stream_names())}"
         
         # 메트릭 관리
         self.total_count = 0
@@ -24,6 +29,46 @@ class BaseBinanceCollector(ABC):
         self.printed_samples = 0
         self.running = True  # 종료 플래그 추가
         self.kafka = KafkaProducerWrapper(Config.KAFKA_BOOTSTRAP_SERVERS)
+        # 같은 호스트 전략 프로세스용 최신 상태 (Kafka 왕복 없이 common.shm_state.ShmStateReader로 읽음)
+        self.state_writer = self._open_state_writer() if Config.SHM_STATE_ENABLED else None
+        # 샘플링된 메시지에만 구간별 시각을 Kafka header로 부착 (common/tracing.py)
+        self.tracer = Tracer() if Config.TRACE_SAMPLE_EVERY > 0 else None
+        self._trace_rx = None  # 지금 처리 중인 프레임의 수신 시각 (추적 대상일 때만)
+        # depth 구독 시 심볼별 전체 호가창 스냅샷을 압축 토픽에 주기적으로 발행 (새 소비자 bootstrap용)
+        # 유지하는 호가창의 최우선 호가는 공유 메모리에도 기록 (depth diff 원본으로는 기록 안 함)
+        subscribes_depth = any(Config.get_topic(name) == Config.DEPTH_TOPIC for name in self._stream_names())
+        self.book_snapshots = (
+            BookSnapshotPublisher(self.kafka, state_writer=self.state_writer)
+            if Config.BOOK_SNAPSHOT_ENABLED and subscribes_depth else None
+        )
+
+    @staticmethod
+    def _open_state_writer():
+        """writer는 경로당 1개 (다른 수집기가 이미 쓰고 있으면 공유 메모리 없이 동작)"""
+        try:
+            return ShmStateWriter(Config.SHM_STATE_PATH)
+        except ShmStateLocked as e:
+            print(f"⚠️ {e} → 이 수집기는 공유 메모리 기록 안 함 (SHM_STATE_PATH를 다르게 지정)")
+            return None
+
+    def _stream_names(self) -> list:
+        """심볼 x 스트림 조합. '!'로 시작하는 전체 시장 스트림(!forceOrder@arr 등)은 심볼 없이 한 번만"""
+        names = []
+        for s in self.streams:
+            name = s.value if isinstance(s, BinanceStreamType) else s
+            if name.startswith("!"):
+                names.append(name)
+            else:
+                names.extend(f"{sym}@{name}" for sym in self.symbols)
+        return names
+
+    def _payload_symbol(self, payload) -> str:
+        """payload의 심볼 ("s", 청산은 주문 객체 "o.s"), 없으면 수집기 심볼"""
+        if isinstance(payload, dict):
+            symbol = payload.get("s") or (payload.get("o") or {}).get("s")
+            if symbol:
+                return symbol.upper()
+        return self.symbol.upper()
 
     @abstractmethod
     async def process_data(self, stream_name: str, payload: dict):
@@ -33,14 +78,25 @@ class BaseBinanceCollector(ABC):
     async def _send_to_kafka(self, stream_name: str, payload: dict):
         """Kafka로 메시지 전송"""
         try:
+            trace_rx = self._trace_rx
+            enq_us = now_us() if trace_rx else 0
             topic = Config.get_topic(stream_name)
+            # 심볼은 payload 기준 (여러 심볼/전체 시장 구독 시 구분)
+            symbol = self._payload_symbol(payload)
             message = {
-                "symbol": self.symbol.upper(),
+                "symbol": symbol,
                 "stream": stream_name,
                 "data": payload,
                 "ts": int(time.time() * 1000)
             }
-            future = self.kafka.send(topic=topic, value=message, key=self.symbol.upper())
+            headers = None
+            if trace_rx:
+                exchange_ms = payload.get("E") if isinstance(payload, dict) else None
+                headers = Tracer.headers(exchange_ms, trace_rx, enq_us, now_us())
+                self._trace_rx = None  # 한 프레임에서 여러 번 보내면 첫 메시지만 추적
+            future = self.kafka.send(topic=topic, value=message, key=symbol, headers=headers)
+            if self.book_snapshots and topic == Config.DEPTH_TOPIC and payload.get("e") == "depthUpdate":
+                self.book_snapshots.on_diff(symbol, payload, future)
             # 주기적으로 flush (매 5개마다 - 더 자주)
             if self.total_count % 5 == 0:
                 self.kafka.flush()
@@ -64,6 +120,8 @@ class BaseBinanceCollector(ABC):
                     try:
                         # 타임아웃을 두어 주기적으로 종료 플래그 확인
                         msg = await asyncio.wait_for(ws.recv(), timeout=1.0)
+                        if self.tracer:
+                            self._trace_rx = self.tracer.sample()
                         self.total_count += 1
                         self.sec_count += 1
                         
@@ -77,8 +135,14 @@ class BaseBinanceCollector(ABC):
                                 print(f"\n📥 [{datetime.now().strftime('%H:%M:%S')}] {stream_name} 샘플 데이터 확인")
                                 self.printed_samples += 1
 
+                            # 공유 메모리 최신 상태는 Kafka 전송 전에 먼저 갱신 (같은 호스트 reader는 브로커 안 거침)
+                            if self.state_writer and isinstance(payload, dict):
+                                self.state_writer.update_from_payload(payload)
+
                             # 실질적인 데이터 처리 로직 호출
                             await self.process_data(stream_name, payload)
+                            if self.book_snapshots:
+                                self.book_snapshots.maybe_publish()
                             
                         except json.JSONDecodeError as e:
                             print(f"❌ JSON 파싱 에러: {e}")
@@ -107,6 +171,10 @@ class BaseBinanceCollector(ABC):
         finally:
             # 종료 시 마지막 flush
             self.kafka.flush()
+            if self.state_writer:
+                self.state_writer.close()
+            if self.book_snapshots:
+                await self.book_snapshots.close()
             self._final_report()
 
     async def _report_metrics(self):
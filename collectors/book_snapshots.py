@@ -0,0 +1,138 @@
+"""
+수집기 쪽 호가창 스냅샷 발행 (depth 스트림 구독 시 base_collector가 자동 사용).
+
+- 심볼별 호가창을 REST 스냅샷(/fapi/v1/depth) + diff로 로컬 유지 (common/order_book.py)
+  동기화 전/gap 후에는 diff를 버퍼에 모아두고 REST 스냅샷을 받은 뒤 이어 붙임
+- diff 전송 future에 callback → 심볼별로 브로커가 확인한 마지막 diff 위치(partition, offset)
+  (로컬 호가창은 전송 전에 갱신하므로 확인된 diff는 항상 스냅샷에 이미 반영되어 있음)
+- diff를 적용해서 호가창이 바뀔 때마다 최우선 호가를 공유 메모리(state_writer)에 기록 (동기화된 호가창만)
+- BOOK_SNAPSHOT_INTERVAL_SEC마다 심볼별 스냅샷을 압축 토픽(key=symbol)에 발행
+  한 번에 전부 보내지 않고 주기 안에서 심볼마다 나눠 보냄 (직렬화 때문에 수신 루프가 멈추지 않게)
+"""
+import asyncio
+import time
+from collections import deque
+
+import aiohttp
+
+from common.config import Config
+from common.order_book import OrderBook
+
+MAX_PENDING_DIFFS = 2000   # 동기화 중 버퍼 (100ms diff 기준 200초 분량)
+RESYNC_BACKOFF_SEC = 5.0   # REST 스냅샷 실패/연속성 불일치 시 재시도 간격
+MAX_CONCURRENT_FETCH = 4   # REST depth(limit=1000)는 weight 20 → 한꺼번에 많이 안 보냄
+
+
+class BookSnapshotPublisher:
+    def __init__(self, kafka, interval_sec: float = None, depth: int = None, rest_url: str = None, state_writer=None):
+        self.kafka = kafka
+        self.state_writer = state_writer  # common.shm_state.ShmStateWriter (없으면 None)
+        self.interval_sec = interval_sec or Config.BOOK_SNAPSHOT_INTERVAL_SEC
+        self.depth = depth or Config.BOOK_SNAPSHOT_DEPTH
+        self.rest_url = (rest_url or Config.BINANCE_REST_URL).rstrip("/")
+        self.books = {}       # symbol → OrderBook (동기화 완료)
+        self.pending = {}     # symbol → 동기화 전 diff 버퍼
+        self.resyncing = set()
+        self.acked = {}       # symbol → (partition, offset): 브로커가 확인한 마지막 diff (producer I/O 스레드가 기록)
+        self.queue = deque()  # 이번 주기에 발행할 심볼
+        self.next_publish = time.time() + self.interval_sec
+        self.spacing = self.interval_sec
+        self.published = 0
+        self.gaps = 0
+        self.session = None
+        self.fetch_limit = None  # asyncio.Semaphore는 실행 중인 루프 안에서 생성 (Python < 3.10은 생성 시점 루프에 묶임)
+
+    def _on_ack(self, symbol, metadata):
+        self.acked[symbol] = (metadata.partition, metadata.offset)
+
+    def _write_top(self, book: OrderBook):
+        """diff 적용 후 호가창의 최우선 호가 → 공유 메모리 (한쪽이 비어 있으면 기록 안 함)"""
+        bid, ask = book.best_bid(), book.best_ask()
+        if bid is not None and ask is not None:
+            self.state_writer.update_book(book.symbol, bid, book.bids[bid], ask, book.asks[ask], book.event_time)
+
+    def on_diff(self, symbol: str, payload: dict, future):
+        """depthUpdate 1건 (Kafka 전송 직후 호출)"""
+        future.add_callback(self._on_ack, symbol)
+        book = self.books.get(symbol)
+        if book is not None:
+            applied_id = book.last_update_id
+            if book.apply_diff(payload):
+                if self.state_writer and book.last_update_id != applied_id:
+                    self._write_top(book)
+                return
+            self.gaps += 1
+            print(f"\n⚠️ [{symbol}] depth diff 연속성 깨짐 (last_update_id={book.last_update_id}, "
+                  f"U={payload.get('U')}, pu={payload.get('pu')}) → REST 스냅샷으로 재동기화")
+            del self.books[symbol]
+        buffer = self.pending.get(symbol)
+        if buffer is None:
+            buffer = self.pending[symbol] = deque(maxlen=MAX_PENDING_DIFFS)
+        buffer.append(payload)
+        if symbol not in self.resyncing:
+            self.resyncing.add(symbol)
+            asyncio.get_running_loop().create_task(self._resync(symbol))
+
+    async def _fetch_depth(self, symbol: str) -> dict:
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        if self.fetch_limit is None:
+            self.fetch_limit = asyncio.Semaphore(MAX_CONCURRENT_FETCH)
+        async with self.fetch_limit:
+            url = f"{self.rest_url}/fapi/v1/depth"
+            async with self.session.get(url, params={"symbol": symbol, "limit": str(self.depth)}) as resp:
+                resp.raise_for_status()
+                return await resp.json()
+
+    async def _resync(self, symbol: str):
+        try:
+            while symbol not in self.books:
+                try:
+                    depth = await self._fetch_depth(symbol)
+                except Exception as e:
+                    print(f"\n⚠️ [{symbol}] REST depth 스냅샷 실패: {e}")
+                    await asyncio.sleep(RESYNC_BACKOFF_SEC)
+                    continue
+                # await 사이에 쌓인 diff까지 한 번에 (여기서부터는 await 없음 → on_diff와 섞이지 않음)
+                book = OrderBook(symbol, int(depth["lastUpdateId"]), depth["bids"], depth["asks"],
+                                 int(depth.get("E") or 0))
+                buffer = self.pending.get(symbol, ())
+                if all(book.apply_diff(payload) for payload in buffer):
+                    self.books[symbol] = book
+                    self.pending.pop(symbol, None)
+                    if self.state_writer:
+                        self._write_top(book)
+                    print(f"\n📗 [{symbol}] 호가창 동기화 (last_update_id={book.last_update_id}, 버퍼 diff {len(buffer)}건)")
+                else:
+                    # REST 스냅샷이 버퍼보다 오래됨 (버퍼 앞부분이 이미 잘림) → 잠시 후 다시
+                    await asyncio.sleep(RESYNC_BACKOFF_SEC)
+        finally:
+            self.resyncing.discard(symbol)
+
+    def maybe_publish(self):
+        """수신 루프에서 메시지마다 호출. 주기마다 심볼 목록을 채우고 호출될 때마다 최대 1개 발행"""
+        now = time.time()
+        if now < self.next_publish:
+            return
+        if not self.queue:
+            self.queue.extend(self.books)
+            # 주기 안에서 심볼마다 고르게 나눠 보냄
+            self.spacing = self.interval_sec / max(1, len(self.queue))
+            if not self.queue:
+                self.next_publish = now + self.interval_sec
+                return
+        symbol = self.queue.popleft()
+        self.next_publish = now + self.spacing
+        book = self.books.get(symbol)
+        position = self.acked.get(symbol)
+        if book is None or position is None:
+            return  # 재동기화 중 / 아직 브로커 확인된 diff 없음 → 시작 위치를 알 수 없음
+        snapshot = book.snapshot(self.depth)
+        snapshot["diff_partition"], snapshot["diff_offset"] = position
+        snapshot["ts"] = int(now * 1000)
+        self.kafka.send(topic=Config.BOOK_SNAPSHOT_TOPIC, value=snapshot, key=symbol)
+        self.published += 1
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
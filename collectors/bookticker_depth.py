@@ -12,6 +12,6 @@ class BookTickerDepthCollector(BaseBinanceCollector):
 # 실행 예시
 if __name__ == "__main__":
     # Enum을 사용하여 타입 안전성 확보
-    streams = [BinanceStreamType.DEPTH]
+    streams = [BinanceStreamType.BOOK_TICKER, BinanceStreamType.DEPTH]  # bookTicker → 서빙 API / shm 최우선 호가
     collector = BookTickerDepthCollector("btcusdt", streams)
     asyncio.run(collector.start())
\ No newline at end of file
@@ -4,9 +4,10 @@ Depth + 1분봉(kline_1m) + aggTrade 한 번에 수집.
 - binance-kline: Binance가 만든 1분봉 (이미 1분 집계됨)
 - binance-trade: aggTrade 체결 (거래 단위)
 
-데이터 확인용: python3 -m collectors.depth_kline_aggtrade
+데이터 확인용: python3 -m collectors.depth_kline_aggtrade [심볼,심볼...]  (기본 btcusdt)
 """
 import asyncio
+import sys
 from collectors.base_collector import BaseBinanceCollector
 from utils.binance_stream_enum import BinanceStreamType
 
@@ -22,5 +23,6 @@ if __name__ == "__main__":
         BinanceStreamType.KLINE_1M,
         BinanceStreamType.AGG_TRADE,
     ]
-    collector = DepthKlineAggTradeCollector("btcusdt", streams)
+    symbols = sys.argv[1] if len(sys.argv) > 1 else "btcusdt"
+    collector = DepthKlineAggTradeCollector(symbols, streams)
     asyncio.run(collector.start())
@@ -0,0 +1,22 @@
+"""
+전체 시장 청산(forceOrder) 수집 → binance-liquidation 토픽.
+!forceOrder@arr 스트림 하나로 모든 심볼의 청산 주문을 받음 (심볼별 구독 불필요)
+
+실행: python3 -m collectors.liquidation
+감지: python3 -m processors.liquidation_detector
+"""
+import asyncio
+from collectors.base_collector import BaseBinanceCollector
+from utils.binance_stream_enum import BinanceStreamType
+
+
+class LiquidationCollector(BaseBinanceCollector):
+    async def process_data(self, stream_name: str, payload: dict):
+        # envelope 심볼은 주문 객체(o.s) 기준, 키도 심볼이라 심볼별로 같은 파티션
+        await self._send_to_kafka(stream_name, payload)
+
+
+if __name__ == "__main__":
+    streams = [BinanceStreamType.ALL_MARKET_LIQUIDATION]
+    collector = LiquidationCollector("btcusdt", streams)  # 전체 시장 스트림이라 심볼은 envelope 기본값으로만 사용
+    asyncio.run(collector.start())
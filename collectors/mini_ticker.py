@@ -0,0 +1,108 @@
+"""
+전체 시장 miniTicker 수집 + 스크리너: !miniTicker@arr 스트림 하나(연결 1개)로 모든 심볼의 24h 시세를 받음.
+
+- 프레임(지난 1초 동안 바뀐 심볼 배열)은 통째로 메시지 1건으로 binance-ticker 토픽에 전송 (key = 스트림 이름)
+  심볼별로 쪼개면 프레임마다 수백 건이 되므로 배열 그대로 보냄 (--no-raw로 끔)
+- 같은 프로세스에서 common/screener.py 열 배열을 제자리 갱신 → 24h 상승/하락, 단기 급등락, 거래대금 급증, 순위 계산
+- --publish-every 프레임마다 압축 순위 스냅샷을 binance-screener(압축 토픽, key=all)에 발행
+  새 소비자는 마지막 스냅샷 1건만 읽으면 됨
+
+실행: python3 -m collectors.mini_ticker [--top 10] [--move-window 300] [--min-quote-volume 1000000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from collectors.base_collector import BaseBinanceCollector
+from common.config import Config
+from common.screener import TickerScreener
+from utils.binance_stream_enum import BinanceStreamType
+
+SCREENER_KEY = "all"
+
+
+class MiniTickerCollector(BaseBinanceCollector):
+    def __init__(self, screener: TickerScreener, forward_raw: bool = True, publish_every: int = 1,
+                 print_every_sec: float = 10.0):
+        # 전체 시장 스트림이라 심볼은 envelope 기본값으로만 사용
+        super().__init__("btcusdt", [BinanceStreamType.ALL_MARKET_MINI_TICKER])
+        self.screener = screener
+        self.forward_raw = forward_raw
+        self.publish_every = publish_every
+        self.print_every_sec = print_every_sec
+        self.update_ms = []
+        self.snapshot_ms = 0.0
+        self.snapshot_bytes = 0
+        self.published = 0
+        self.last_print_time = 0.0
+
+    def _payload_symbol(self, payload) -> str:
+        # 배열 프레임은 심볼 여러 개 → 스트림 이름을 key로 (프레임 순서대로 한 파티션)
+        if isinstance(payload, list):
+            return BinanceStreamType.ALL_MARKET_MINI_TICKER.value
+        return super()._payload_symbol(payload)
+
+    async def process_data(self, stream_name: str, payload: list):
+        if not isinstance(payload, list):
+            return
+        if self.forward_raw:
+            await self._send_to_kafka(stream_name, payload)
+
+        started = time.perf_counter()
+        self.screener.update(payload)
+        self.update_ms.append((time.perf_counter() - started) * 1000)
+        if self.screener.frames % self.publish_every == 0:
+            self._publish()
+
+    def _publish(self):
+        started = time.perf_counter()
+        snapshot = self.screener.snapshot()
+        snapshot["ts"] = int(time.time() * 1000)
+        self.kafka.send(topic=Config.SCREENER_TOPIC, value=snapshot, key=SCREENER_KEY)
+        self.snapshot_ms = (time.perf_counter() - started) * 1000
+        self.published += 1
+
+        now = time.time()
+        if now - self.last_print_time >= self.print_every_sec:
+            self.last_print_time = now
+            self.snapshot_bytes = len(json.dumps(snapshot))
+            fmt = lambda rows: ", ".join(f"{s} {v:+.2f}%" for s, v in rows[:3]) or "-"
+            spikes = ", ".join(f"{s} x{v:.1f}" for s, v in snapshot["volume_spikes"][:3]) or "워밍업 중"
+            print(f"\n📈 심볼 {snapshot['symbols_ranked']}/{snapshot['symbols_total']} | 상승: {fmt(snapshot['gainers'])} | "
+                  f"하락: {fmt(snapshot['losers'])} | {self.screener.move_window_sec:g}초 급등락: {fmt(snapshot['movers'])} | "
+                  f"거래대금 급증: {spikes}")
+
+    async def _report_metrics(self):
+        now = time.time()
+        if now - self.last_report_time >= 1.0:
+            update_p50 = float(np.median(self.update_ms)) if self.update_ms else 0.0
+            self.update_ms = self.update_ms[-1000:]
+            print(f"⏱️ 프레임: {self.total_count:,} | 갱신 p50 {update_p50:.3f}ms | 스냅샷 {self.published:,}건 "
+                  f"({self.snapshot_ms:.2f}ms, {self.snapshot_bytes / 1024:.0f}KB)", end='\r')
+            self.last_report_time = now
+
+
+def main():
+    parser = argparse.ArgumentParser(description="!miniTicker@arr 전체 시장 스크리너")
+    parser.add_argument("--top", type=int, default=10, help="목록별 상위 심볼 수")
+    parser.add_argument("--move-window", type=float, default=300.0, help="단기 등락률 구간 (초)")
+    parser.add_argument("--fast-halflife", type=float, default=60.0, help="거래대금 속도 빠른 EW 반감기 (초)")
+    parser.add_argument("--slow-halflife", type=float, default=3600.0, help="거래대금 속도 기준선 EW 반감기 (초)")
+    parser.add_argument("--min-quote-volume", type=float, default=1_000_000.0, help="24h 거래대금 미만 심볼은 순위 제외")
+    parser.add_argument("--publish-every", type=int, default=1, help="N 프레임마다 스냅샷 발행")
+    parser.add_argument("--no-raw", action="store_true", help="원본 배열 프레임은 Kafka로 보내지 않음")
+    args = parser.parse_args()
+
+    screener = TickerScreener(
+        top_k=args.top, move_window_sec=args.move_window, fast_halflife_sec=args.fast_halflife,
+        slow_halflife_sec=args.slow_halflife, min_quote_volume=args.min_quote_volume,
+    )
+    collector = MiniTickerCollector(screener, forward_raw=not args.no_raw, publish_every=args.publish_every)
+    asyncio.run(collector.start())
+
+
+if __name__ == "__main__":
+    main()
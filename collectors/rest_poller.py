@@ -0,0 +1,308 @@
+"""
+REST 전용 지표 수집 (WebSocket으로 안 오는 것): open interest / funding rate / taker long-short ratio → Kafka.
+
+- 수집기와 같은 envelope {symbol, stream, data, ts}, stream 이름도 "<symbol>@<지표>" → Config.get_topic으로 같은 토픽 라우팅
+  data에는 WebSocket 이벤트처럼 e(지표 이름) / E(거래소 시각) / s(심볼)를 붙임
+- aiohttp 세션 1개 + keep-alive 커넥션 풀 (--pool), 요청마다 TLS 연결을 새로 맺지 않음
+- 스케줄러: (지표, 심볼) 작업마다 주기 안에서 시작 위치를 고르게 나눠서(i/n x 주기) 요청이 몰리지 않게 분산
+  한도마다 스케줄러 루프가 따로 돌아서 한 한도가 멈춰도(429, futures_data 소진) 다른 한도 지표는 계속 요청
+- 한도: 지표마다 속한 한도(weight: 분당 request weight / futures_data: 5분 1000회)의 BUDGET 비율 안에서 token bucket
+  수요(심볼 수 x weight x 분당 횟수)가 예산보다 크면 그 한도의 주기를 비율만큼 늘림 (시작 시 출력)
+  응답의 X-MBX-USED-WEIGHT-1M이 거래소 한도의 90%를 넘으면(같은 IP의 다른 프로세스 포함) 다음 분까지 멈춤,
+  429/418이면 Retry-After만큼 그 한도 전체 정지
+- 같은 (지표, 심볼)에서 값이 그대로면 다시 보내지 않음 (지표마다 비교 필드, 응답 time은 요청 시각이라 비교에서 제외)
+  OI: openInterest / funding: nextFundingTime + lastFundingRate (정산 주기마다 1번) / taker: timestamp (5분 기간)
+- funding rate는 /fapi/v1/premiumIndex 전체 심볼 1회(weight 10)로 받고 구독 심볼만 전송
+
+실행:
+  python3 -m collectors.rest_poller btcusdt,ethusdt
+  python3 -m collectors.rest_poller all                      # 거래 중인 USDT 무기한 전체 (exchangeInfo)
+  BINANCE_REST_URL=http://127.0.0.1:9444 python3 -m collectors.rest_poller all   # 로컬 가짜 서버 (benchmarks/fake_binance_rest.py)
+"""
+import argparse
+import asyncio
+import heapq
+import time
+
+import aiohttp
+
+from common.config import Config
+from common.kafka_utils import KafkaProducerWrapper
+
+EXCHANGE_LIMITS_PER_MIN = {
+    "weight": 2400.0,        # USDⓈ-M REQUEST_WEIGHT 1분
+    "futures_data": 200.0,   # /futures/data/* : IP당 5분 1000회
+}
+USED_WEIGHT_PAUSE_RATIO = 0.9
+REPORT_INTERVAL_SEC = 10.0
+
+
+class RestMetric:
+    """REST 지표 1종: 경로, weight, 속한 한도, 기본 주기, 심볼별 요청 여부, 새 값 판단 필드"""
+
+    __slots__ = ("name", "path", "weight", "limit", "interval_sec", "per_symbol", "params", "dedupe_fields")
+
+    def __init__(self, name, path, weight, limit, interval_sec, dedupe_fields, per_symbol=True, params=None):
+        self.name = name
+        self.path = path
+        self.weight = weight
+        self.limit = limit
+        self.interval_sec = interval_sec
+        self.dedupe_fields = dedupe_fields
+        self.per_symbol = per_symbol
+        self.params = params or {}
+
+
+METRICS = {
+    "openInterest": RestMetric("openInterest", "/fapi/v1/openInterest", 1, "weight", 10.0, ("openInterest",)),
+    "fundingRate": RestMetric("fundingRate", "/fapi/v1/premiumIndex", 10, "weight", 30.0,
+                              ("nextFundingTime", "lastFundingRate"), per_symbol=False),
+    "takerLongShortRatio": RestMetric("takerLongShortRatio", "/futures/data/takerlongshortRatio", 1, "futures_data",
+                                      60.0, ("timestamp",), params={"period": "5m", "limit": "1"}),
+}
+
+
+class TokenBucket:
+    """초당 rate만큼 채워지는 weight 버킷 (capacity = 1초 분량 → 순간 몰림 없이 고르게)"""
+
+    def __init__(self, per_min: float):
+        self.rate = per_min / 60.0
+        self.capacity = max(self.rate, 10.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, weight: float):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= weight:
+                self.tokens -= weight
+                return
+            await asyncio.sleep((weight - self.tokens) / self.rate)
+
+
+class RestMetricsPoller:
+    def __init__(self, symbols: list, metrics: list = None, kafka=None, rest_url: str = None,
+                 budget: float = None, pool_size: int = 8, intervals: dict = None):
+        self.symbols = [s.upper() for s in symbols]
+        self.metrics = [METRICS[name] for name in (metrics or list(METRICS))]
+        self.kafka = kafka or KafkaProducerWrapper(Config.KAFKA_BOOTSTRAP_SERVERS)
+        self.rest_url = (rest_url or Config.BINANCE_REST_URL).rstrip("/")
+        self.budget = Config.BINANCE_REST_WEIGHT_BUDGET if budget is None else budget
+        self.pool_size = pool_size
+        self.intervals = {m.name: (intervals or {}).get(m.name, m.interval_sec) for m in self.metrics}
+        self.buckets = {limit: TokenBucket(per_min * self.budget) for limit, per_min in EXCHANGE_LIMITS_PER_MIN.items()}
+        self.fetch_limit = asyncio.Semaphore(pool_size)
+        self.session = None
+        self.running = True
+        self.last_value = {}  # (지표, 심볼) → 마지막으로 보낸 값의 dedupe_fields
+
+        # 메트릭 관리
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.published = 0
+        self.used_weight = 0
+        self.latencies_ms = []
+        self.last_report_time = None
+        self._stretch_intervals()
+
+    def _stretch_intervals(self):
+        """한도별 분당 수요가 예산보다 크면 그 한도 지표들의 주기를 같은 비율로 늘림"""
+        for limit, per_min in EXCHANGE_LIMITS_PER_MIN.items():
+            metrics = [m for m in self.metrics if m.limit == limit]
+            demand = sum(
+                (len(self.symbols) if m.per_symbol else 1) * m.weight * 60.0 / self.intervals[m.name] for m in metrics
+            )
+            budget = per_min * self.budget
+            if demand > budget:
+                factor = demand / budget
+                for m in metrics:
+                    self.intervals[m.name] *= factor
+                print(f"⚠️ [{limit}] 분당 수요 {demand:,.0f} > 예산 {budget:,.0f} → 주기 {factor:.2f}배: "
+                      + ", ".join(f"{m.name} {self.intervals[m.name]:.1f}초" for m in metrics))
+
+    def _jobs(self, limit: str) -> list:
+        """한도 1개의 (다음 실행 시각, 순번, 지표, 심볼) — 지표마다 주기 안에서 심볼 시작 위치를 고르게 분산"""
+        start = time.monotonic()
+        jobs = []
+        for m in (m for m in self.metrics if m.limit == limit):
+            targets = self.symbols if m.per_symbol else [None]
+            interval = self.intervals[m.name]
+            for i, symbol in enumerate(targets):
+                jobs.append((start + interval * i / len(targets), len(jobs), m, symbol))
+        heapq.heapify(jobs)
+        return jobs
+
+    async def _request(self, metric: RestMetric, symbol: str = None):
+        params = dict(metric.params)
+        if symbol:
+            params["symbol"] = symbol
+        started = time.perf_counter()
+        async with self.session.get(f"{self.rest_url}{metric.path}", params=params) as resp:
+            self.requests += 1
+            used = resp.headers.get("X-MBX-USED-WEIGHT-1M")
+            if used:
+                self.used_weight = int(used)
+                if self.used_weight >= EXCHANGE_LIMITS_PER_MIN["weight"] * USED_WEIGHT_PAUSE_RATIO:
+                    self.buckets["weight"].pause(60.0 - time.time() % 60.0)  # 다음 분까지
+            if resp.status in (418, 429):
+                retry_after = float(resp.headers.get("Retry-After") or 60)
+                self.rate_limited += 1
+                self.buckets[metric.limit].pause(retry_after)
+                print(f"\n⚠️ {metric.name} {resp.status} rate limit → [{metric.limit}] {retry_after:.0f}초 정지")
+                return None
+            resp.raise_for_status()
+            body = await resp.json()
+        self.latencies_ms.append((time.perf_counter() - started) * 1000)
+        return body
+
+    async def _poll(self, metric: RestMetric, symbol: str = None):
+        async with self.fetch_limit:
+            try:
+                body = await self._request(metric, symbol)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                self.errors += 1
+                print(f"\n⚠️ {metric.name} {symbol or ''} 요청 실패: {e}")
+                return
+        if body is None:
+            return
+        if metric.name == "fundingRate":
+            wanted = set(self.symbols)
+            for item in body if isinstance(body, list) else [body]:
+                if item.get("symbol") in wanted:
+                    self._publish(metric, item["symbol"], int(item.get("time") or 0), item)
+        elif isinstance(body, list):
+            if body:
+                latest = body[-1]  # /futures/data/*는 기간별 목록 (limit=1 → 마지막 기간)
+                self._publish(metric, symbol, int(latest.get("timestamp") or 0), latest)
+        else:
+            self._publish(metric, symbol, int(body.get("time") or 0), body)
+
+    def _publish(self, metric: RestMetric, symbol: str, event_time: int, fields: dict):
+        key = (metric.name, symbol)
+        value = tuple(fields.get(name) for name in metric.dedupe_fields)
+        if self.last_value.get(key) == value:
+            return  # 같은 값 (OI 변화 없음 / 아직 새 기간 아님)
+        self.last_value[key] = value
+        stream_name = f"{symbol.lower()}@{metric.name}"
+        message = {
+            "symbol": symbol,
+            "stream": stream_name,
+            "data": {"e": metric.name, "E": event_time, "s": symbol, **fields},
+            "ts": int(time.time() * 1000),
+        }
+        try:
+            self.kafka.send(topic=Config.get_topic(stream_name), value=message, key=symbol)
+            self.published += 1
+        except Exception as e:
+            print(f"❌ Kafka 전송 에러: {e}")
+
+    async def _open_session(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=10))
+
+    async def _schedule(self, limit: str, tasks: set):
+        """한도 1개의 스케줄러: 버킷 대기(정지 포함)는 이 한도 지표들만 막음"""
+        jobs = self._jobs(limit)
+        bucket = self.buckets[limit]
+        while self.running and jobs:
+            due, seq, metric, symbol = jobs[0]
+            delay = max(due, bucket.paused_until) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(min(delay, 1.0))  # 종료 플래그/리포트 확인 (정지 중에도 1초마다)
+                self._report_metrics()
+                continue
+            await bucket.acquire(metric.weight)
+            task = asyncio.create_task(self._poll(metric, symbol))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            # 고정 주기 유지 (밀려서 한 주기 이상 늦으면 지금부터 다시)
+            interval = self.intervals[metric.name]
+            next_due = due + interval if due + interval > time.monotonic() else time.monotonic() + interval
+            heapq.heapreplace(jobs, (next_due, seq, metric, symbol))
+            self._report_metrics()
+
+    async def run(self):
+        await self._open_session()
+        tasks = set()
+        self.last_report_time = time.time()
+        print(f"🚀 {self.__class__.__name__} 시작 | 심볼 {len(self.symbols)}개 | 예산 {self.budget:.0%} | 풀 {self.pool_size} | "
+              + ", ".join(f"{name} {sec:.1f}초" for name, sec in self.intervals.items()))
+        schedulers = [asyncio.create_task(self._schedule(limit, tasks))
+                      for limit in EXCHANGE_LIMITS_PER_MIN if any(m.limit == limit for m in self.metrics)]
+        try:
+            await asyncio.gather(*schedulers)
+        finally:
+            for task in schedulers + list(tasks):
+                task.cancel()
+            await self.session.close()
+            self.session = None
+            self.kafka.flush()
+
+    def stop(self):
+        self.running = False
+
+    def _report_metrics(self):
+        now = time.time()
+        if now - self.last_report_time < REPORT_INTERVAL_SEC:
+            return
+        elapsed = now - self.last_report_time
+        latencies = sorted(self.latencies_ms)
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+        print(f"⏱️ 요청 {self.requests:,} ({self.requests / elapsed:.1f}/s) | 전송 {self.published:,} | "
+              f"used weight {self.used_weight} | 429 {self.rate_limited} | 에러 {self.errors} | "
+              f"응답 p50 {p50:.0f}ms / p99 {p99:.0f}ms", end="\r")
+        self.requests = self.published = 0
+        self.latencies_ms = []
+        self.last_report_time = now
+
+
+async def fetch_perpetual_symbols(rest_url: str = None) -> list:
+    """거래 중인 USDT 무기한 계약 심볼 (exchangeInfo, weight 1)"""
+    url = f"{(rest_url or Config.BINANCE_REST_URL).rstrip('/')}/fapi/v1/exchangeInfo"
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            info = await resp.json()
+    return [
+        s["symbol"] for s in info.get("symbols", [])
+        if s.get("contractType") == "PERPETUAL" and s.get("quoteAsset") == "USDT" and s.get("status") == "TRADING"
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="REST 전용 지표(OI/funding/taker 비율) → Kafka")
+    parser.add_argument("symbols", help="쉼표 구분 심볼 또는 all (USDT 무기한 전체)")
+    parser.add_argument("--metrics", default=",".join(METRICS), help=f"쉼표 구분 ({', '.join(METRICS)})")
+    parser.add_argument("--budget", type=float, default=None, help="거래소 한도 중 사용할 비율 (기본 BINANCE_REST_WEIGHT_BUDGET)")
+    parser.add_argument("--pool", type=int, default=8, help="keep-alive 커넥션 / 동시 요청 수")
+    args = parser.parse_args()
+
+    metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        parser.error(f"알 수 없는 지표: {sorted(unknown)}")
+    symbols = await fetch_perpetual_symbols() if args.symbols == "all" else args.symbols.split(",")
+    poller = RestMetricsPoller(symbols, metrics, budget=args.budget, pool_size=args.pool)
+    try:
+        await poller.run()
+    except KeyboardInterrupt:
+        print("\n🛑 중단")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n🛑 중단")
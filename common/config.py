@@ -4,21 +4,54 @@ class Config:
     # Kafka
     KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092") # 환경 변수가 있으면 사용, 없으면 기본값 사용용
     
+    # Python 스트림 프로세서 (processors/): 오프셋 + 상태 체크포인트 저장 위치
+    # 여러 프로세스로 scale-out 할 때는 공유 볼륨 경로로 지정 (파티션 재할당 시 다른 프로세스가 이어받음)
+    PROCESSOR_CHECKPOINT_DIR = os.getenv("PROCESSOR_CHECKPOINT_DIR", "data/processor-checkpoints")
+    DEPTH_TOPIC = "binance-depth"
+    BOOK_TICKER_TOPIC = "binance-bookticker"  # bookTicker (최우선 호가, 수집기 <symbol>@bookTicker 스트림)
+    CANDLE_TOPIC = "binance-candle"  # candle_processor 출력 (1분봉 등 실시간 갱신)
+    LIQUIDATION_ALERT_TOPIC = "binance-liquidation-alert"  # liquidation_detector 연쇄 청산 알림
+    CORRELATION_TOPIC = "binance-correlation"  # correlation_processor 상관/beta/변동성 행렬 (압축 토픽, key=interval)
+    SCREENER_TOPIC = "binance-screener"  # collectors/mini_ticker 전체 시장 순위 스냅샷 (압축 토픽, key=all)
+
+    # 같은 호스트 프로세스용 최신 상태 공유 메모리 (common/shm_state.py, 수집기가 기록)
+    # 기본: /dev/shm 있으면(Linux) 켜짐, SHM_STATE_ENABLED=0으로 끔
+    SHM_STATE_PATH = os.getenv("SHM_STATE_PATH", "/dev/shm/crypto-realtime-state")
+    SHM_STATE_ENABLED = os.getenv("SHM_STATE_ENABLED", "1" if os.path.isdir("/dev/shm") else "0") == "1"
+
+    # 심볼별 전체 호가창 스냅샷 (collectors/book_snapshots.py → 압축 토픽, key=symbol)
+    # 새 소비자는 이 토픽으로 호가창을 채우고 diff 토픽은 스냅샷의 diff_offset 다음부터 (common/order_book.py)
+    BOOK_SNAPSHOT_TOPIC = "binance-depth-snapshot"
+    BOOK_SNAPSHOT_ENABLED = os.getenv("BOOK_SNAPSHOT_ENABLED", "1") == "1"
+    BOOK_SNAPSHOT_INTERVAL_SEC = float(os.getenv("BOOK_SNAPSHOT_INTERVAL_SEC", "5"))
+    BOOK_SNAPSHOT_DEPTH = int(os.getenv("BOOK_SNAPSHOT_DEPTH", "1000"))  # REST depth limit과 같은 레벨 수
+
+    # 메시지 지연 추적 (common/tracing.py): 수집기가 N개 중 1개에 trace header 부착, 0이면 끔
+    TRACE_SAMPLE_EVERY = int(os.getenv("TRACE_SAMPLE_EVERY", "100"))
+
+    # ClickHouse HTTP 인터페이스 (serving API 캐시 miss fallback)
+    CLICKHOUSE_URL = os.getenv("CLICKHOUSE_URL", "http://localhost:8123/")
+
     # Binance
-    BINANCE_WS_URL = "wss://fstream.binance.com/stream"
+    # 로컬 벤치마크/테스트에서는 가짜 WebSocket 서버 주소로 교체 (benchmarks/fake_binance_ws.py)
+    BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://fstream.binance.com/stream")
+    BINANCE_REST_URL = os.getenv("BINANCE_REST_URL", "https://fapi.binance.com")
+    # REST 폴러(collectors/rest_poller.py)가 쓸 거래소 요청 한도 비율 (같은 IP의 depth 스냅샷 REST 등 여유분 남김)
+    BINANCE_REST_WEIGHT_BUDGET = float(os.getenv("BINANCE_REST_WEIGHT_BUDGET", "0.5"))
     
     # 토픽 매핑 (스트림 이름을 토픽명이랑 매칭)
     TOPIC_MAP = {
-        # "bookTicker": "binance-bookticker",
+        "bookTicker": "binance-bookticker",
         "depth": "binance-depth",
         "trade": "binance-trade",
         "aggTrade": "binance-trade",
         "kline": "binance-kline",
         # "ticker": "binance-ticker",
-        # "miniTicker": "binance-ticker",
-        # "fundingRate": "binance-fundingrate",
-        # "forceOrder": "binance-liquidation",
-        # "openInterest": "binance-openinterest",
+        "miniTicker": "binance-ticker",  # !miniTicker@arr 배열 프레임 (collectors/mini_ticker)
+        "fundingRate": "binance-fundingrate",  # REST 폴러 (premiumIndex)
+        "forceOrder": "binance-liquidation",
+        "openInterest": "binance-openinterest",  # REST 폴러
+        "takerLongShortRatio": "binance-takerlongshort",  # REST 폴러 (/futures/data)
     }
     
     @classmethod
@@ -0,0 +1,281 @@
+# common/correlation.py
+"""
+심볼 간 증분 EW(지수가중) 공분산 → 상관계수 / 기준 심볼 대비 beta / realized volatility (numpy만 의존).
+
+- 봉 시점 1개 = 전체 심볼 로그수익률 벡터 r 1개 → 평균/공분산을 O(N²) 한 번 갱신 (과거 구간 재계산 없음)
+    가중치 w_k = (1-α)^k (k = 몇 봉 전), 심볼별 가중치 합 W ← (1-α)·W + 1, 제곱합 Q ← (1-α)²·Q + 1
+    a = 1/W,  d = r - mean,  mean += a·d,  T ← (1-α)·T + e·eᵀ  (e = d·√(1-a), West 가중 증분식)
+- 가중치 합으로 정규화 (pandas ewm(adjust=True, bias=False)와 같은 방식): cov = T / P
+  P = 쌍별 정규화 합, 봉마다 P ← (1-α)·P + E[e_i·e_j] / cov_ij = √((1-a_i)(1-a_j))·(1 + min(Q_i',Q_j') / (W_i'·W_j'))
+  (W', Q' = 직전 봉까지, 둘째 항 = 두 평균이 같은 봉들을 공유해서 생기는 몫, 한 번 관측되기 시작한 심볼은
+   계속 관측되므로(아래) 공유 구간 = 늦게 상장된 쪽 구간)
+  → 대각은 W - Q/W와 같고, 워밍업 중이나 늦게 상장된 심볼과의 쌍도 0 쪽으로 치우치지 않음
+    (고정 α만 쓰면 분산은 1-(1-α)^n 배, 늦게 들어온 심볼의 beta는 그만큼 작게 나옴)
+  관측 봉 수가 같은 심볼끼리는 W, Q, a가 같아서 (warm_count봉 이상이면 극한값으로 같음) 더하는 몫도 같음
+  → 가장 큰 그룹 몫은 모든 쌍 공통 offset 하나에 더하고 나머지 심볼의 행/열만 보정
+    (평소 O(1), 최근 상장 심볼이 있을 때만 O(N·그 심볼 수))
+- T, P는 scale·S로 저장: 매 봉 (1-α) 곱하기(N² 한 번 더 훑기) 대신 scale만 줄이고 S에는 이번 봉 몫만 더함
+- 이번 봉에 값이 없는 심볼은 수익률 0 (체결이 없으면 가격이 그대로라는 뜻, candle_processor는 체결 있을 때만 봉 생성)
+- 새 심볼은 행/열 0에서 시작, min_periods 봉 전까지 상관/beta/변동성은 NaN
+
+사용:
+    cov = EWCovariance(halflife=60)
+    cov.update(["BTCUSDT", "ETHUSDT"], [43000.0, 2300.0], window_start)   # 같은 봉 시점의 종가들
+    symbols, corr = cov.correlation()
+    beta = cov.beta("BTCUSDT"); vol = cov.realized_vol()
+"""
+import base64
+import math
+import os
+
+import numpy as np
+
+CORR_SCALE = 10_000          # 상관계수 int16 인코딩 (소수 4자리)
+CORR_MISSING = -32768        # NaN (워밍업 전)
+MINUTES_PER_YEAR = 525_600
+EXTRA_PREFIX = "extra_"      # save(extra=...) 배열 이름 접두사 (행렬 필드와 겹치지 않게)
+
+
+class EWCovariance:
+    def __init__(self, halflife: float = 60.0, min_periods: int = 30, periods_per_year: float = MINUTES_PER_YEAR,
+                 capacity: int = 64):
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        self.warm_count = math.ceil(math.log(1e-12) / math.log(1.0 - self.alpha))  # (1-α)^n < 1e-12 → W, Q 수렴
+        self.norm_offset = 0.0  # 모든 쌍 공통 P (scale 단위)
+        self.min_periods = min_periods
+        self.periods_per_year = periods_per_year
+        self.symbol_index = {}
+        self.symbols = []
+        self.scale = 1.0
+        self.last_window = None
+        self.updates = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int):
+        self.capacity = capacity
+        self.mean = np.zeros(capacity)
+        self.cov = np.zeros((capacity, capacity))   # 가중 편차 곱의 합 T = scale * cov (정규화 전)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.weight = np.zeros(capacity)           # 심볼별 가중치 합 W
+        self.weight_sq = np.zeros(capacity)        # 심볼별 가중치 제곱합 Q
+        self.norm = np.zeros((capacity, capacity))  # 쌍별 정규화 합 P = scale * (norm + norm_offset)
+        self.last_close = np.full(capacity, np.nan)
+        self._outer = np.zeros((capacity, capacity))
+
+    def _grow(self, capacity: int):
+        size = self.capacity
+        old = {name: getattr(self, name) for name in ("mean", "count", "weight", "weight_sq", "last_close")}
+        cov, norm = self.cov, self.norm
+        self._alloc(capacity)
+        for name, values in old.items():
+            getattr(self, name)[:size] = values
+        self.cov[:size, :size] = cov
+        self.norm[:size, :size] = norm
+
+    def index_of(self, symbols) -> np.ndarray:
+        """심볼 → 행 번호 (처음 보는 심볼은 새 행, 부족하면 2배로 확장)"""
+        idx = np.empty(len(symbols), dtype=np.int64)
+        start = len(self.symbols)
+        for i, symbol in enumerate(symbols):
+            row = self.symbol_index.get(symbol)
+            if row is None:
+                row = self.symbol_index[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            idx[i] = row
+        if len(self.symbols) > self.capacity:
+            self._grow(max(self.capacity * 2, len(self.symbols)))
+        if len(self.symbols) > start:
+            # 새 행/열은 공통 offset을 상쇄해서 P = 0에서 시작
+            self.norm[start:len(self.symbols), :] = -self.norm_offset
+            self.norm[:, start:len(self.symbols)] = -self.norm_offset
+        return idx
+
+    def update(self, symbols, closes, window_start: int = None):
+        """같은 봉 시점의 (심볼, 종가)로 한 번 갱신. 처음 보는 심볼은 종가만 기억 (수익률은 다음 봉부터)"""
+        idx = self.index_of(symbols)
+        c = np.asarray(closes, dtype=float)
+        n = len(self.symbols)
+        prev = self.last_close[idx]
+        live = ~np.isnan(self.last_close[:n])  # 직전 종가가 있는 심볼만 이번 봉 관측 (나머지는 0 수익률)
+
+        r = np.zeros(n)
+        known = ~np.isnan(prev) & (prev > 0) & (c > 0)
+        r[idx[known]] = np.log(c[known] / prev[known])
+        self.last_close[idx] = c
+
+        decay = 1.0 - self.alpha
+        weight, weight_sq = self.weight[:n], self.weight_sq[:n]
+        # 관측 봉 수 그룹 (같은 그룹 = 같은 W, Q), 가장 큰 그룹이 기준 → 나머지 행만 P 보정
+        group = np.minimum(self.count[:n], self.warm_count)
+        keys, sizes = np.unique(group, return_counts=True)
+        ref = int(np.argmax(group == keys[np.argmax(sizes)]))
+        others = np.flatnonzero(group != group[ref])
+        prev_weight = np.where(weight > 0, weight, 1.0)  # 갱신 전 W', Q' (0은 첫 관측, 공유 봉 없음)
+        prev_weight_sq = weight_sq.copy()
+        weight *= decay
+        weight_sq *= decay * decay
+        weight[live] += 1.0
+        weight_sq[live] += 1.0
+        a = np.zeros(n)
+        a[live] = 1.0 / weight[live]  # 심볼별 유효 α (첫 관측 1 → α로 수렴)
+
+        mean = self.mean[:n]
+        d = r - mean
+        d[~live] = 0.0
+        mean += a * d
+        h = np.sqrt(1.0 - a)  # 첫 관측은 평균을 모르므로 0 (편차 기여 없음), 관측 없는 심볼은 1 → d가 0
+        e = d * h
+        self.scale *= decay
+        outer = self._outer[:n, :n]
+        np.outer(e / self.scale, e, out=outer)
+        self.cov[:n, :n] += outer
+        h[~live] = 0.0
+        # 쌍 (i, j) 증가분 = h_i·h_j·(1 + min(Q_i',Q_j') / (W_i'·W_j')), 기준 그룹끼리의 값은 offset으로
+        ref_norm = h[ref] * h[ref] * (1.0 + prev_weight_sq[ref] / (prev_weight[ref] * prev_weight[ref]))
+        self.norm_offset += ref_norm / self.scale
+        if len(others):
+            shared = np.minimum(prev_weight_sq[others, None], prev_weight_sq[None, :])
+            shared /= prev_weight[others, None] * prev_weight[None, :]
+            rows = h[others, None] * h[None, :] * (1.0 + shared)
+            rows -= ref_norm
+            rows /= self.scale
+            self.norm[others, :n] += rows
+            rows[:, others] = 0.0  # others x others 블록은 위에서 이미 더함
+            self.norm[:n, others] += rows.T
+        if self.scale < 1e-100:
+            # scale이 너무 작아지기 전에 S에 반영 (가끔 한 번, underflow 방지)
+            self.cov[:n, :n] *= self.scale
+            self.norm[:n, :n] += self.norm_offset
+            self.norm[:n, :n] *= self.scale
+            self.norm_offset = 0.0
+            self.scale = 1.0
+        self.count[:n][live] += 1
+        self.last_window = window_start
+        self.updates += 1
+
+    # ---------------- 결과 ----------------
+
+    def covariance(self) -> np.ndarray:
+        """쌍별 정규화 합으로 나눈 공분산 (scale은 분자/분모에 같이 곱해져 있어 상쇄), 관측 2봉 미만인 쌍은 NaN"""
+        n = len(self.symbols)
+        norm = self.norm[:n, :n] + self.norm_offset
+        valid = norm * self.scale > 1e-12
+        return np.where(valid, self.cov[:n, :n] / np.where(valid, norm, 1.0), np.nan)
+
+    def _warm(self, var: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore"):
+            return (self.count[:len(self.symbols)] >= self.min_periods) & (var > 0)
+
+    def correlation(self):
+        """(심볼 목록, N x N 상관계수) — 워밍업 전 심볼의 행/열은 NaN"""
+        cov = self.covariance()
+        var = np.diag(cov).copy()
+        warm = self._warm(var)
+        sd = np.where(warm, np.sqrt(np.where(warm, var, 1.0)), np.nan)
+        with np.errstate(invalid="ignore"):
+            corr = cov / np.outer(sd, sd)
+        np.clip(corr, -1.0, 1.0, out=corr)
+        np.fill_diagonal(corr, np.where(warm, 1.0, np.nan))
+        return list(self.symbols), corr
+
+    def beta(self, benchmark: str) -> np.ndarray:
+        """심볼별 cov(r_i, r_b) / var(r_b) (기준 심볼이 없거나 워밍업 전이면 전부 NaN)"""
+        n = len(self.symbols)
+        row = self.symbol_index.get(benchmark)
+        cov = self.covariance()
+        var = np.diag(cov)
+        warm = self._warm(var)
+        if row is None or not warm[row]:
+            return np.full(n, np.nan)
+        with np.errstate(invalid="ignore"):
+            return np.where(warm, cov[:, row] / var[row], np.nan)
+
+    def realized_vol(self) -> np.ndarray:
+        """EW 분산 → 연율화 변동성 (sqrt(var x 연간 봉 수))"""
+        var = np.diag(self.covariance())
+        warm = self._warm(var)
+        return np.where(warm, np.sqrt(np.where(warm, var, 0.0) * self.periods_per_year), np.nan)
+
+    # ---------------- 체크포인트 ----------------
+
+    def save(self, path: str, extra: dict = None):
+        """extra: 같은 파일에 함께 저장할 배열 {이름: array} (호출자 상태, load()가 그대로 돌려줌)"""
+        n = len(self.symbols)
+        tmp_path = f"{path}.tmp.npz"
+        extra = {f"{EXTRA_PREFIX}{name}": value for name, value in (extra or {}).items()}
+        np.savez(
+            tmp_path, symbols=np.array(self.symbols, dtype=str), mean=self.mean[:n], cov_sums=self.cov[:n, :n] * self.scale,
+            norm=(self.norm[:n, :n] + self.norm_offset) * self.scale, count=self.count[:n], weight=self.weight[:n], weight_sq=self.weight_sq[:n], last_close=self.last_close[:n],
+            meta=np.array([self.updates, -1 if self.last_window is None else self.last_window], dtype=np.int64),
+            **extra,
+        )
+        os.replace(tmp_path, path)  # 원자적 교체
+
+    def load(self, path: str) -> dict:
+        """save() 결과 복원, save(extra=...)로 함께 저장한 배열 {이름: array} 반환 (없으면 빈 dict)"""
+        with np.load(path) as data:
+            symbols = [str(s) for s in data["symbols"]]
+            idx = self.index_of(symbols)
+            n = len(self.symbols)
+            self.scale = 1.0
+            self.norm_offset = 0.0
+            self.mean[idx] = data["mean"]
+            self.cov[:n, :n] = 0.0
+            self.norm[:n, :n] = 0.0
+            self.count[idx] = data["count"]
+            pairs = np.ix_(idx, idx)
+            if "cov_sums" in data:
+                self.cov[pairs] = data["cov_sums"]
+                self.norm[pairs] = data["norm"]
+                self.weight[idx] = data["weight"]
+                self.weight_sq[idx] = data["weight_sq"]
+            else:
+                # 이전 형식 (고정 α로 갱신한 α·T): 관측 봉 수로 가중치 합을 다시 계산, 쌍은 늦게 들어온 쪽 W - Q/W
+                decay = 1.0 - self.alpha
+                count = data["count"].astype(float)
+                weight = (1.0 - decay ** count) / self.alpha
+                weight_sq = (1.0 - decay ** (2 * count)) / (1.0 - decay * decay)
+                pair_w, pair_q = np.minimum.outer(weight, weight), np.minimum.outer(weight_sq, weight_sq)
+                self.cov[pairs] = data["cov"] / self.alpha
+                self.norm[pairs] = np.where(pair_w > 0, pair_w - pair_q / np.where(pair_w > 0, pair_w, 1.0), 0.0)
+                self.weight[idx], self.weight_sq[idx] = weight, weight_sq
+            self.last_close[idx] = data["last_close"]
+            self.updates, last_window = (int(v) for v in data["meta"])
+            self.last_window = None if last_window < 0 else last_window
+            return {name[len(EXTRA_PREFIX):]: data[name] for name in data.files if name.startswith(EXTRA_PREFIX)}
+
+
+def _json_floats(values, digits: int) -> list:
+    return [None if math.isnan(v) else round(v, digits) for v in values.tolist()]
+
+
+def encode_matrix(symbols: list, corr: np.ndarray, vol: np.ndarray, beta: np.ndarray, **meta) -> dict:
+    """
+    토픽 메시지 (JSON): 상관계수는 위쪽 삼각(대각 제외, 행 우선)만 int16(x10000) → base64
+    심볼 500개: 124,750쌍 → 약 330KB
+    """
+    upper = corr[np.triu_indices(len(symbols), k=1)]
+    packed = np.where(np.isnan(upper), CORR_MISSING, np.round(np.nan_to_num(upper) * CORR_SCALE)).astype("<i2")
+    return {
+        **meta,
+        "symbols": symbols,
+        "realized_vol": _json_floats(vol, 6),
+        "beta": _json_floats(beta, 6),
+        "corr_encoding": "int16_upper_x10000",
+        "corr": base64.b64encode(packed.tobytes()).decode("ascii"),
+    }
+
+
+def decode_matrix(message: dict):
+    """encode_matrix의 역변환 → (심볼 목록, N x N 상관계수 (NaN = 워밍업 전))"""
+    symbols = message["symbols"]
+    n = len(symbols)
+    packed = np.frombuffer(base64.b64decode(message["corr"]), dtype="<i2")
+    upper = np.where(packed == CORR_MISSING, np.nan, packed / CORR_SCALE)
+    corr = np.full((n, n), np.nan)
+    rows, cols = np.triu_indices(n, k=1)
+    corr[rows, cols] = upper
+    corr[cols, rows] = upper
+    vol = np.array([np.nan if v is None else v for v in message["realized_vol"]])
+    np.fill_diagonal(corr, np.where(np.isnan(vol), np.nan, 1.0))
+    return symbols, corr
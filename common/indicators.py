@@ -0,0 +1,178 @@
+# common/indicators.py
+"""
+증분 기술적 지표 엔진 (Python 프로세서 / Spark pandas UDF 공용, numpy만 의존).
+
+- 새 봉 1개당 지표마다 O(1) 갱신: 전체 구간을 다시 계산하지 않음
+- 심볼별 상태는 numpy 배열의 한 행 → 여러 심볼을 한 번의 호출로 벡터 갱신
+- 지표: EMA, RSI(Wilder), ATR(Wilder), rolling VWAP, realized volatility(로그수익률 제곱합)
+
+사용:
+    engine = IndicatorEngine()
+    out = engine.update(["BTCUSDT", "ETHUSDT"], high, low, close, volume)  # 같은 봉 시점의 심볼들
+    out["rsi"]  # 입력 순서대로 numpy 배열
+
+Spark에서는 이 파일을 addPyFile로 배포해서 `from indicators import IndicatorEngine`으로 사용
+"""
+import numpy as np
+
+INDICATOR_COLUMNS = ("ema", "rsi", "atr", "vwap", "realized_vol")
+
+
+class IndicatorEngine:
+    def __init__(self, ema_period=20, rsi_period=14, atr_period=14, vwap_window=20, vol_window=30, capacity=64):
+        self.ema_alpha = 2.0 / (ema_period + 1)
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.vwap_window = vwap_window
+        self.vol_window = vol_window
+        self.symbol_index = {}
+        self.free_rows = []  # drop_symbols로 비운 행 (새 심볼이 재사용)
+        self.rows_used = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int):
+        self.capacity = capacity
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.prev_close = np.zeros(capacity)
+        self.ema = np.zeros(capacity)
+        self.avg_gain = np.zeros(capacity)
+        self.avg_loss = np.zeros(capacity)
+        self.atr = np.zeros(capacity)
+        # rolling 구간은 링 버퍼 + 합계 (나가는 값만 빼고 들어오는 값만 더함)
+        self.pv_ring = np.zeros((capacity, self.vwap_window))
+        self.v_ring = np.zeros((capacity, self.vwap_window))
+        self.pv_sum = np.zeros(capacity)
+        self.v_sum = np.zeros(capacity)
+        self.r2_ring = np.zeros((capacity, self.vol_window))
+        self.r2_sum = np.zeros(capacity)
+
+    def _grow(self, capacity: int):
+        old = {name: getattr(self, name) for name in self._state_names()}
+        size = self.capacity
+        self._alloc(capacity)
+        for name, values in old.items():
+            getattr(self, name)[:size] = values
+
+    @staticmethod
+    def _state_names():
+        return ("count", "prev_close", "ema", "avg_gain", "avg_loss", "atr",
+                "pv_ring", "v_ring", "pv_sum", "v_sum", "r2_ring", "r2_sum")
+
+    def index_of(self, symbols) -> np.ndarray:
+        """심볼 → 상태 행 번호 (처음 보는 심볼은 새 행 할당, 부족하면 2배로 확장)"""
+        idx = np.empty(len(symbols), dtype=np.int64)
+        for i, symbol in enumerate(symbols):
+            row = self.symbol_index.get(symbol)
+            if row is None:
+                if self.free_rows:
+                    row = self.free_rows.pop()
+                else:
+                    row = self.rows_used
+                    self.rows_used += 1
+                self.symbol_index[symbol] = row
+            idx[i] = row
+        if self.rows_used > self.capacity:
+            self._grow(max(self.capacity * 2, self.rows_used))
+        return idx
+
+    def drop_symbols(self, symbols):
+        """심볼 상태 삭제 (파티션 회수/장기 미거래), 행은 0으로 초기화 후 재사용"""
+        for symbol in symbols:
+            row = self.symbol_index.pop(symbol, None)
+            if row is None:
+                continue
+            for name in self._state_names():
+                getattr(self, name)[row] = 0
+            self.free_rows.append(row)
+
+    def update(self, symbols, high, low, close, volume) -> dict:
+        """
+        같은 봉 시점의 심볼들(중복 없음)을 한 번에 갱신하고 지표 반환.
+        워밍업 전(RSI/ATR 기간 미만) 값은 NaN
+        """
+        idx = self.index_of(symbols)
+        h = np.asarray(high, dtype=float)
+        l = np.asarray(low, dtype=float)
+        c = np.asarray(close, dtype=float)
+        v = np.asarray(volume, dtype=float)
+
+        n = self.count[idx]  # 이번 봉 이전까지 본 봉 수
+        first = n == 0
+        pc = np.where(first, c, self.prev_close[idx])
+
+        # EMA (첫 봉은 종가로 시작)
+        ema = np.where(first, c, self.ema[idx] + self.ema_alpha * (c - self.ema[idx]))
+
+        # RSI: Wilder 평활. 처음 period개 변화량은 단순평균(k = 지금까지 변화량 수), 이후 1/period
+        diff = c - pc
+        k = np.maximum(np.minimum(n, self.rsi_period), 1)
+        has_diff = ~first
+        avg_gain = self.avg_gain[idx] + has_diff * (np.maximum(diff, 0.0) - self.avg_gain[idx]) / k
+        avg_loss = self.avg_loss[idx] + has_diff * (np.maximum(-diff, 0.0) - self.avg_loss[idx]) / k
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(avg_loss > 0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss),
+                           np.where(avg_gain > 0, 100.0, 50.0))
+        rsi = np.where(n >= self.rsi_period, rsi, np.nan)
+
+        # ATR: True Range의 Wilder 평활 (첫 봉 TR = 고가-저가)
+        tr = np.where(first, h - l, np.maximum.reduce([h - l, np.abs(h - pc), np.abs(l - pc)]))
+        k_atr = np.minimum(n + 1, self.atr_period)
+        atr = self.atr[idx] + (tr - self.atr[idx]) / k_atr
+        atr_out = np.where(n + 1 >= self.atr_period, atr, np.nan)
+
+        # rolling VWAP (typical price 기준, 최근 vwap_window개 봉)
+        pos = n % self.vwap_window
+        pv = (h + l + c) / 3.0 * v
+        self.pv_sum[idx] += pv - self.pv_ring[idx, pos]
+        self.v_sum[idx] += v - self.v_ring[idx, pos]
+        self.pv_ring[idx, pos] = pv
+        self.v_ring[idx, pos] = v
+
+        # realized volatility: 최근 vol_window개 로그수익률 제곱합의 제곱근 (연율화 안 함)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.where(first | (pc <= 0), 0.0, np.log(c / pc))
+        pos_v = n % self.vol_window
+        r2 = r * r
+        self.r2_sum[idx] += r2 - self.r2_ring[idx, pos_v]
+        self.r2_ring[idx, pos_v] = r2
+
+        # 링 한 바퀴마다 합계를 다시 더해서 부동소수점 누적 오차 제거 (해당 심볼만, 가끔)
+        resync = idx[(n + 1) % self.vwap_window == 0]
+        if resync.size:
+            self.pv_sum[resync] = self.pv_ring[resync].sum(axis=1)
+            self.v_sum[resync] = self.v_ring[resync].sum(axis=1)
+        resync = idx[(n + 1) % self.vol_window == 0]
+        if resync.size:
+            self.r2_sum[resync] = self.r2_ring[resync].sum(axis=1)
+
+        self.ema[idx] = ema
+        self.avg_gain[idx] = avg_gain
+        self.avg_loss[idx] = avg_loss
+        self.atr[idx] = atr
+        self.prev_close[idx] = c
+        self.count[idx] = n + 1
+
+        v_sum = self.v_sum[idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwap = np.where(v_sum > 0, self.pv_sum[idx] / v_sum, c)
+        return {
+            "ema": ema,
+            "rsi": rsi,
+            "atr": atr_out,
+            "vwap": vwap,
+            "realized_vol": np.sqrt(np.maximum(self.r2_sum[idx], 0.0)),
+        }
+
+    def export_symbol(self, symbol: str) -> list:
+        """심볼 1개 상태 → JSON 직렬화 가능한 리스트 (프로세서 체크포인트용)"""
+        row = self.symbol_index.get(symbol)
+        if row is None:
+            return None
+        return [getattr(self, name)[row].tolist() for name in self._state_names()]
+
+    def import_symbol(self, symbol: str, data: list):
+        if data is None:
+            return
+        row = self.index_of([symbol])[0]
+        for name, value in zip(self._state_names(), data):
+            getattr(self, name)[row] = value
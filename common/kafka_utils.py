@@ -23,8 +23,8 @@ class KafkaProducerWrapper:
             logger.info(f"Kafka Producer 생성: {bootstrap_servers}")
         return cls._instance
 
-    def send(self, topic: str, value: dict, key: str = None):
-        return self.producer.send(topic=topic, value=value, key=key)
+    def send(self, topic: str, value: dict, key: str = None, headers: list = None):
+        return self.producer.send(topic=topic, value=value, key=key, headers=headers)
 
     def flush(self):
         self.producer.flush()
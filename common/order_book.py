@@ -0,0 +1,168 @@
+"""
+심볼별 호가창 (depth diff 적용) + 압축(compacted) 스냅샷 토픽 읽기.
+
+depth diff 스트림만으로는 현재 호가창을 알 수 없음 (어디서부터 replay해야 하는지 모름)
+→ 수집기(collectors/book_snapshots.py)가 심볼별 전체 호가창을 주기적으로 binance-depth-snapshot
+  (cleanup.policy=compact, key=symbol)에 발행. 스냅샷에는 last_update_id와 diff 토픽 위치(diff_partition/diff_offset)
+→ 새 소비자는 스냅샷 토픽만 읽어서 호가창을 채우고 (심볼 수만큼, 긴 replay 없음)
+  diff 토픽은 diff_offset + 1부터 읽으면서 u <= last_update_id인 diff는 건너뜀
+
+diff 연속성 (Binance futures depthUpdate: U=첫 update id, u=마지막, pu=직전 이벤트의 u)
+- u <= last_update_id: 이미 반영된 이벤트 → 무시
+- pu == last_update_id 이거나 U <= last_update_id + 1 (REST 스냅샷 직후 첫 이벤트 / spot은 pu 없음) → 적용
+- 그 외: 빠진 이벤트 있음 (gap) → 스냅샷부터 다시 동기화 필요
+"""
+import heapq
+import json
+import time
+
+from kafka import KafkaConsumer, TopicPartition
+
+from common.config import Config
+
+
+def _levels(pairs) -> dict:
+    return {float(p): float(q) for p, q in pairs if float(q) > 0}
+
+
+class OrderBook:
+    __slots__ = ("symbol", "bids", "asks", "last_update_id", "event_time")
+
+    def __init__(self, symbol: str, last_update_id: int = 0, bids=(), asks=(), event_time: int = 0):
+        self.symbol = symbol
+        self.last_update_id = last_update_id
+        self.bids = _levels(bids)  # price → qty
+        self.asks = _levels(asks)
+        self.event_time = event_time
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict):
+        """스냅샷 토픽 메시지(또는 snapshot()/체크포인트 결과) → OrderBook"""
+        return cls(snapshot["symbol"], int(snapshot["last_update_id"]),
+                   snapshot["bids"], snapshot["asks"], int(snapshot.get("event_time") or 0))
+
+    def apply_diff(self, payload: dict) -> bool:
+        """depthUpdate 적용. 이미 반영된 이벤트면 무시하고 True, 연속성이 깨졌으면(gap) False"""
+        final_id = int(payload["u"])
+        if final_id <= self.last_update_id:
+            return True
+        prev_final_id = payload.get("pu")
+        if prev_final_id != self.last_update_id and int(payload["U"]) > self.last_update_id + 1:
+            return False
+        for side, changes in ((self.bids, payload["b"]), (self.asks, payload["a"])):
+            for p, q in changes:
+                price, qty = float(p), float(q)
+                if qty > 0:
+                    side[price] = qty
+                else:
+                    side.pop(price, None)
+        self.last_update_id = final_id
+        self.event_time = int(payload.get("E") or self.event_time)
+        return True
+
+    def best_bid(self):
+        return max(self.bids) if self.bids else None
+
+    def best_ask(self):
+        return min(self.asks) if self.asks else None
+
+    def snapshot(self, depth: int = None) -> dict:
+        """가격순 상위 depth개 레벨 (None이면 전체)"""
+        depth = depth or max(len(self.bids), len(self.asks), 1)
+        bids = heapq.nlargest(depth, self.bids.items())
+        asks = heapq.nsmallest(depth, self.asks.items())
+        return {
+            "symbol": self.symbol,
+            "last_update_id": self.last_update_id,
+            "event_time": self.event_time,
+            "bids": [[p, q] for p, q in bids],
+            "asks": [[p, q] for p, q in asks],
+        }
+
+
+class BookSnapshotTail:
+    """
+    스냅샷 토픽을 따라 읽는 소비자 (consumer group 없이 assign만, 오프셋 커밋 안 함).
+    load(): 처음부터 현재 끝까지 1회 (timeout_sec으로 제한) → 이후 poll_nowait()로 새로 발행된 스냅샷만 받음
+    심볼별 최신 원본(bytes)만 들고 있고 파싱은 꺼낼 때 (스냅샷 1건이 수십 KB라 안 쓰는 심볼은 파싱 안 함)
+    같은 키는 나중 오프셋이 최신 (심볼당 수집기 1개가 순서대로 발행)
+    """
+
+    def __init__(self, symbols=None, topic: str = None):
+        self.topic = topic or Config.BOOK_SNAPSHOT_TOPIC
+        self.wanted = {s.upper() for s in symbols} if symbols else None
+        self.latest = {}  # symbol → 스냅샷 원본 JSON (bytes)
+        self.consumer = KafkaConsumer(
+            bootstrap_servers=[Config.KAFKA_BOOTSTRAP_SERVERS],
+            enable_auto_commit=False,
+            value_deserializer=lambda raw: raw,
+        )
+        partitions = self.consumer.partitions_for_topic(self.topic) or set()
+        self.tps = [TopicPartition(self.topic, p) for p in partitions]
+        if self.tps:
+            self.consumer.assign(self.tps)
+            self.consumer.seek_to_beginning(*self.tps)
+
+    def _apply(self, batch: dict) -> set:
+        updated = set()
+        for records in batch.values():
+            for record in records:
+                symbol = record.key.decode() if record.key else None
+                if symbol is None or (self.wanted and symbol not in self.wanted):
+                    continue
+                if record.value is None:
+                    self.latest.pop(symbol, None)  # tombstone
+                    continue
+                self.latest[symbol] = record.value
+                updated.add(symbol)
+        return updated
+
+    def load(self, timeout_sec: float = 10.0) -> dict:
+        """현재 end offset까지 읽고 {symbol: 스냅샷 dict} (제한 시간 넘으면 읽은 데까지)"""
+        if self.tps:
+            end_offsets = self.consumer.end_offsets(self.tps)
+            remaining = {tp for tp in self.tps if end_offsets[tp] > self.consumer.position(tp)}
+            deadline = time.time() + timeout_sec
+            while remaining and time.time() < deadline:
+                self._apply(self.consumer.poll(timeout_ms=200, max_records=1000))
+                remaining = {tp for tp in remaining if self.consumer.position(tp) < end_offsets[tp]}
+            if remaining:
+                print(f"⚠️ 스냅샷 토픽을 {timeout_sec}초 안에 끝까지 못 읽음: {sorted(tp.partition for tp in remaining)}")
+        return {symbol: self.get(symbol) for symbol in self.latest}
+
+    def poll_nowait(self, max_records: int = 500) -> set:
+        """기다리지 않고 이미 도착한 새 스냅샷만 반영 (poll 루프 안에서 호출해도 안 막힘), 갱신된 심볼 반환"""
+        if not self.tps:
+            return set()
+        return self._apply(self.consumer.poll(timeout_ms=0, max_records=max_records))
+
+    def get(self, symbol: str):
+        raw = self.latest.get(symbol)
+        return json.loads(raw) if raw is not None else None
+
+    def close(self):
+        self.consumer.close()
+
+
+def load_book_snapshots(symbols=None, topic: str = None, timeout_sec: float = 10.0) -> dict:
+    """
+    스냅샷 토픽을 처음부터 끝(현재 end offset)까지 1회 읽어서 심볼별 최신 스냅샷 {symbol: dict}
+    계속 따라 읽어야 하면 BookSnapshotTail 사용
+    """
+    tail = BookSnapshotTail(symbols=symbols, topic=topic)
+    try:
+        return tail.load(timeout_sec)
+    finally:
+        tail.close()
+
+
+def diff_start_offsets(snapshots) -> dict:
+    """스냅샷들 → diff 토픽 파티션별 시작 오프셋 {partition: offset} (파티션 안 스냅샷 중 가장 이른 위치)"""
+    offsets = {}
+    for snapshot in snapshots:
+        partition, offset = snapshot.get("diff_partition"), snapshot.get("diff_offset")
+        if partition is None or offset is None:
+            continue
+        if partition not in offsets or offset + 1 < offsets[partition]:
+            offsets[partition] = offset + 1
+    return offsets
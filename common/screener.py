@@ -0,0 +1,193 @@
+# common/screener.py
+"""
+전체 시장 miniTicker(!miniTicker@arr) 스크리너: 심볼별 최신 상태를 열(column) 단위 numpy 배열로 두고 프레임마다 제자리 갱신.
+
+- 프레임 1개 = 지난 1초 동안 바뀐 심볼들의 24hrMiniTicker 배열 → 심볼 행 번호로 모아서 한 번에 대입 (심볼별 dict/객체 없음)
+- 매 프레임 전체 심볼에 대해 벡터 연산으로
+    24h 등락률 (c - o) / o,  단기 등락률 (move_window초 전 가격 대비, 프레임별 가격 링버퍼)
+    거래대금 급증 = 24h 거래대금 증가분의 빠른 EW 속도 / 느린 EW 속도 (24h 롤링 값이라 증가분 = 새 거래대금 - 24시간 전 빠진 거래대금, 음수는 0)
+    순위 = argsort 역인덱스, 상위 k개 = argpartition 후 k개만 정렬
+- stale_sec 동안 갱신 없는 심볼(상장폐지/거래 중단)과 24h 거래대금 min_quote_volume 미만 심볼은 순위에서 제외
+
+사용:
+    screener = TickerScreener(top_k=10)
+    screener.update(payload)          # !miniTicker@arr 프레임의 data (list)
+    snapshot = screener.snapshot()    # 압축 순위 스냅샷 (dict, JSON 직렬화 가능)
+"""
+import math
+from operator import itemgetter
+
+import numpy as np
+
+FRAME_INTERVAL_SEC = 1.0   # !miniTicker@arr 전송 주기 (첫 프레임 dt 기본값)
+FIELDS = itemgetter("c", "o", "h", "l", "v", "q")  # 24hrMiniTicker 숫자 필드 (문자열)
+
+
+class TickerScreener:
+    def __init__(self, top_k: int = 10, move_window_sec: float = 300.0, fast_halflife_sec: float = 60.0,
+                 slow_halflife_sec: float = 3600.0, min_quote_volume: float = 1_000_000.0,
+                 stale_sec: float = 3600.0, capacity: int = 512):
+        self.top_k = top_k
+        self.move_window_sec = move_window_sec
+        self.window_frames = max(1, int(round(move_window_sec / FRAME_INTERVAL_SEC)))
+        self.fast_tau = fast_halflife_sec / math.log(2)
+        self.slow_tau = slow_halflife_sec / math.log(2)
+        self.min_quote_volume = min_quote_volume
+        self.stale_ms = int(stale_sec * 1000)
+        self.symbol_index = {}
+        self.symbols = []
+        self.frames = 0
+        self.event_time = 0     # 마지막 프레임의 최대 E (ms)
+        self.elapsed_sec = 0.0  # 첫 프레임 이후 경과 (느린 EW 워밍업 판단)
+        self.ring_pos = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int):
+        self.capacity = capacity
+        self.last = np.full(capacity, np.nan)
+        self.open = np.full(capacity, np.nan)
+        self.high = np.full(capacity, np.nan)
+        self.low = np.full(capacity, np.nan)
+        self.volume = np.zeros(capacity)          # 24h 기준 자산 거래량 (v)
+        self.quote_volume = np.zeros(capacity)    # 24h 거래대금 (q)
+        self.updated = np.zeros(capacity, dtype=np.int64)  # 심볼별 마지막 E (ms)
+        self.fast_rate = np.zeros(capacity)       # 거래대금 증가 속도 (quote/초) 빠른 EW
+        self.slow_rate = np.zeros(capacity)       # 느린 EW (기준선)
+        self.price_ring = np.full((self.window_frames, capacity), np.nan)  # 프레임 x 심볼 가격 (단기 등락률)
+
+    def _grow(self, capacity: int):
+        size = self.capacity
+        old = {name: getattr(self, name) for name in (
+            "last", "open", "high", "low", "volume", "quote_volume", "updated", "fast_rate", "slow_rate")}
+        ring = self.price_ring
+        self._alloc(capacity)
+        for name, values in old.items():
+            getattr(self, name)[:size] = values
+        self.price_ring[:, :size] = ring
+
+    def index_of(self, symbols) -> np.ndarray:
+        """심볼 → 행 번호 (처음 보는 심볼은 새 행, 부족하면 2배로 확장)"""
+        idx = np.empty(len(symbols), dtype=np.int64)
+        for i, symbol in enumerate(symbols):
+            row = self.symbol_index.get(symbol)
+            if row is None:
+                row = self.symbol_index[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            idx[i] = row
+        if len(self.symbols) > self.capacity:
+            self._grow(max(self.capacity * 2, len(self.symbols)))
+        return idx
+
+    def update(self, tickers: list):
+        """!miniTicker@arr 프레임 1개 반영 (바뀐 심볼만 들어옴, 나머지는 이전 값 유지)"""
+        if not tickers:
+            return
+        idx = self.index_of([t["s"] for t in tickers])
+        # 문자열 필드 6개를 (심볼 x 6) 행렬로 한 번에 float 변환 (심볼별 float() 호출 없음)
+        values = np.array(list(map(FIELDS, tickers)), dtype=np.float64)
+        close, quote = values[:, 0], values[:, 5]
+        event = np.array([t["E"] for t in tickers], dtype=np.int64)
+
+        frame_time = int(event.max())
+        dt = (frame_time - self.event_time) / 1000 if self.event_time else FRAME_INTERVAL_SEC
+        dt = min(max(dt, 0.001), 60.0)  # 재연결 공백은 60초로 제한 (EW가 통째로 0이 되지 않게)
+
+        # 24h 거래대금 증가분 → 초당 속도, 이번 프레임에 없는 심볼은 0
+        prev_quote = self.quote_volume[idx]
+        delta = np.zeros(len(self.symbols))
+        seen = self.updated[idx] > 0
+        delta[idx[seen]] = np.maximum(quote[seen] - prev_quote[seen], 0.0)
+        n = len(self.symbols)
+        rate = delta / dt
+        fast_decay = math.exp(-dt / self.fast_tau)
+        slow_decay = math.exp(-dt / self.slow_tau)
+        self.fast_rate[:n] = fast_decay * self.fast_rate[:n] + (1.0 - fast_decay) * rate
+        self.slow_rate[:n] = slow_decay * self.slow_rate[:n] + (1.0 - slow_decay) * rate
+
+        self.last[idx] = close
+        self.open[idx] = values[:, 1]
+        self.high[idx] = values[:, 2]
+        self.low[idx] = values[:, 3]
+        self.volume[idx] = values[:, 4]
+        self.quote_volume[idx] = quote
+        self.updated[idx] = event
+
+        # 링버퍼 한 행 = 이번 프레임 시점의 전체 심볼 가격 (갱신 없던 심볼은 직전 가격 그대로, 연속 메모리 쓰기)
+        self.price_ring[self.ring_pos, :n] = self.last[:n]
+        self.ring_pos = (self.ring_pos + 1) % self.window_frames
+        if self.event_time:
+            self.elapsed_sec += dt
+        self.event_time = frame_time
+        self.frames += 1
+
+    def metrics(self) -> dict:
+        """전체 심볼 지표 열 (길이 = 심볼 수, 순위 제외 심볼은 eligible=False)"""
+        n = len(self.symbols)
+        last, open_ = self.last[:n], self.open[:n]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.where(open_ > 0, (last - open_) / open_ * 100.0, np.nan)
+            # ring_pos 행 = 가장 오래된 프레임 (window_frames 프레임 전), 아직 안 찼으면 NaN
+            past = self.price_ring[self.ring_pos, :n]
+            move = np.where(past > 0, (last - past) / past * 100.0, np.nan)
+            warm = self.elapsed_sec >= self.slow_tau * math.log(2)  # 느린 EW 반감기 1회 이상
+            spike = np.where(warm & (self.slow_rate[:n] > 0), self.fast_rate[:n] / self.slow_rate[:n], np.nan)
+        eligible = ((self.event_time - self.updated[:n]) <= self.stale_ms) & \
+                   (self.quote_volume[:n] >= self.min_quote_volume) & ~np.isnan(change)
+        return {"change_pct": change, "move_pct": move, "volume_spike": spike, "eligible": eligible}
+
+    @staticmethod
+    def rank(values: np.ndarray, eligible: np.ndarray) -> np.ndarray:
+        """내림차순 순위 (1부터), 제외/NaN 심볼은 0"""
+        keyed = np.where(eligible & ~np.isnan(values), values, -np.inf)
+        order = np.argsort(-keyed, kind="stable")
+        ranks = np.empty(len(values), dtype=np.int64)
+        ranks[order] = np.arange(1, len(values) + 1)
+        return np.where(keyed > -np.inf, ranks, 0)
+
+    @staticmethod
+    def top(values: np.ndarray, eligible: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+        """상위(또는 하위) k개 행 번호, 전체 정렬 대신 argpartition 후 k개만 정렬"""
+        candidates = np.flatnonzero(eligible & ~np.isnan(values))
+        if not len(candidates):
+            return candidates
+        keyed = -values[candidates] if largest else values[candidates]
+        k = min(k, len(candidates))
+        part = np.argpartition(keyed, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+        return candidates[part[np.argsort(keyed[part], kind="stable")]]
+
+    def snapshot(self) -> dict:
+        """압축 순위 스냅샷: 상위 목록(심볼, 값) + 전체 심볼 순위 열 (24h 거래대금 순)"""
+        m = self.metrics()
+        eligible, change, move, spike = m["eligible"], m["change_pct"], m["move_pct"], m["volume_spike"]
+        quote = self.quote_volume[:len(self.symbols)]
+        k = self.top_k
+
+        def pairs(rows, values, digits=2):
+            return [[self.symbols[i], round(float(values[i]), digits)] for i in rows]
+
+        universe = np.flatnonzero(eligible)
+        universe = universe[np.argsort(-quote[universe], kind="stable")]
+        change_rank = self.rank(change, eligible)
+        move_rank = self.rank(move, eligible)
+        spike_rank = self.rank(spike, eligible)
+        return {
+            "E": self.event_time,
+            "frames": self.frames,
+            "symbols_total": len(self.symbols),
+            "symbols_ranked": int(len(universe)),
+            "move_window_sec": self.move_window_sec,
+            "gainers": pairs(self.top(change, eligible, k), change),
+            "losers": pairs(self.top(change, eligible, k, largest=False), change),
+            "movers": pairs(self.top(np.abs(move), eligible, k), move),
+            "volume_spikes": pairs(self.top(spike, eligible, k), spike),
+            "top_volume": pairs(self.top(quote, eligible, k), quote, 0),
+            # 전체 순위 (열 형식, 순서 = 24h 거래대금 내림차순 → 인덱스 = 거래대금 순위 - 1)
+            "ranks": {
+                "symbol": [self.symbols[i] for i in universe],
+                "last": self.last[universe].tolist(),
+                "change_pct": np.round(change[universe], 2).tolist(),
+                "change_rank": change_rank[universe].tolist(),
+                "move_rank": move_rank[universe].tolist(),
+                "spike_rank": spike_rank[universe].tolist(),
+            },
+        }
@@ -0,0 +1,257 @@
+"""
+같은 호스트용 최신 상태 공유 메모리 테이블 (수집기 writer 1개 → 여러 reader 프로세스).
+
+Kafka를 거치지 않고 심볼별 최우선 호가 / 마지막 체결 / mark price를 mmap 파일에서 바로 읽음
+(역직렬화 없음, 읽기 1회 수 µs).
+
+레이아웃 (little-endian, 고정 크기)
+  header 64B : magic(8s) version(I) capacity(I) slot_size(I) count(I)
+  slot  128B : seq(Q) symbol(16s)
+               bid_price ask_price bid_qty ask_qty(d) book_time(q)
+               last_price last_qty(d) trade_time(q)
+               mark_price(d) mark_time(q)
+               updated_ns(q)  ← writer가 쓴 시각 (time.time_ns, staleness 확인용)
+
+seqlock
+- writer: seq를 홀수로 올림 → 필드 기록 → 짝수로 올림 (slot 단위, 락 없음)
+- reader: seq 읽기(홀수면 재시도) → 필드 읽기 → seq 다시 읽어서 같을 때만 채택
+- x86(TSO)에서는 store 순서가 보장되어 그대로 안전. ARM 등 약한 메모리 모델은 보장 안 됨
+
+사용 (reader):
+    from common.shm_state import ShmStateReader
+    reader = ShmStateReader()
+    state = reader.get("BTCUSDT")   # LatestState 또는 None
+    state.bid_price, state.ask_price, state.last_price, state.age_ms()
+
+writer는 수집기(collectors/base_collector.py)가 자동으로 사용 (SHM_STATE_ENABLED=0이면 끔, 경로는 SHM_STATE_PATH).
+최우선 호가는 bookTicker 이벤트, 또는 수집기가 유지하는 호가창(REST 스냅샷 + diff 적용 후,
+collectors/book_snapshots.py)에서만 기록. depth diff 원본은 바뀐 레벨뿐(수량 0 삭제 포함)이라 쓰지 않음.
+writer는 파일당 1개만: {path}.lock에 flock(LOCK_EX|LOCK_NB)을 잡고, 이미 잡혀 있으면 ShmStateLocked
+(수집기는 경고 후 공유 메모리 없이 동작 → 여러 수집기를 띄우면 경로를 다르게).
+크기/형식이 안 맞는 파일은 그 자리에서 자르지 않고 새 파일을 만들어 rename으로 교체
+(이미 mmap한 reader는 이전 파일을 계속 보므로 SIGBUS 없음, 새 파일은 reader를 다시 열어야 보임).
+"""
+import fcntl
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+
+MAGIC = b"CRSHM001"
+VERSION = 1
+HEADER = struct.Struct("<8sIIII")
+HEADER_SIZE = 64
+SLOT_SIZE = 128
+DEFAULT_CAPACITY = 1024
+
+SEQ = struct.Struct("<Q")
+SYMBOL = struct.Struct("<16s")
+BODY = struct.Struct("<16sddddqddqdqq")  # seq 다음부터 slot 전체 (symbol ~ updated_ns)
+BOOK = struct.Struct("<ddddq")
+TRADE = struct.Struct("<ddq")
+MARK = struct.Struct("<dq")
+UPDATED = struct.Struct("<q")
+
+# slot 내부 오프셋
+OFF_SYMBOL = 8
+OFF_BOOK = 24
+OFF_TRADE = 64
+OFF_MARK = 88
+OFF_UPDATED = 104
+
+_FIELDS = (
+    "symbol", "bid_price", "ask_price", "bid_qty", "ask_qty", "book_time",
+    "last_price", "last_qty", "trade_time", "mark_price", "mark_time", "updated_ns",
+)
+
+
+class ShmStateLocked(RuntimeError):
+    """같은 경로에 이미 다른 writer가 있음"""
+
+
+class LatestState(namedtuple("LatestState", _FIELDS)):
+    __slots__ = ()
+
+    def age_ms(self) -> float:
+        """writer가 마지막으로 갱신한 뒤 지난 시간(ms)"""
+        return (time.time_ns() - self.updated_ns) / 1e6
+
+
+def default_path() -> str:
+    from common.config import Config
+    return Config.SHM_STATE_PATH
+
+
+class ShmStateWriter:
+    """수집기 프로세스용. 심볼은 처음 본 순서대로 slot 할당 (재시작 시 기존 파일/slot 재사용)"""
+
+    def __init__(self, path: str = None, capacity: int = DEFAULT_CAPACITY):
+        self.path = path or default_path()
+        self.lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self.lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self.lock_fd)
+            raise ShmStateLocked(f"공유 메모리 writer가 이미 실행 중: {self.path}")
+
+        size = HEADER_SIZE + capacity * SLOT_SIZE
+        self.mm = self._open_existing(size, capacity)
+        if self.mm is None:
+            self.mm = self._create(size, capacity)
+        count = struct.unpack_from("<I", self.mm, 20)[0]
+        self.capacity = capacity
+        self.slots = {}  # symbol → slot 오프셋
+        self.seqs = {}   # slot 오프셋 → 현재 seq (writer만 쓰므로 메모리에 들고 있음)
+        for i in range(count):
+            off = HEADER_SIZE + i * SLOT_SIZE
+            symbol = SYMBOL.unpack_from(self.mm, off + OFF_SYMBOL)[0].rstrip(b"\0").decode()
+            seq = SEQ.unpack_from(self.mm, off)[0]
+            if seq & 1:
+                seq += 1  # 이전 writer가 쓰다 죽은 slot → 짝수로 복구
+                SEQ.pack_into(self.mm, off, seq)
+            self.slots[symbol] = off
+            self.seqs[off] = seq
+        self.full_warned = False
+
+    def _open_existing(self, size: int, capacity: int):
+        """같은 크기/형식의 기존 파일이면 그대로 mmap (재시작 시 slot 재사용), 아니면 None"""
+        try:
+            fd = os.open(self.path, os.O_RDWR)
+        except FileNotFoundError:
+            return None
+        try:
+            if os.fstat(fd).st_size != size:
+                return None
+            mm = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        magic, version, cap, slot_size, _ = HEADER.unpack_from(mm, 0)
+        if magic == MAGIC and version == VERSION and cap == capacity and slot_size == SLOT_SIZE:
+            return mm
+        mm.close()
+        return None
+
+    def _create(self, size: int, capacity: int):
+        """새 파일을 임시 이름으로 만들고 header를 쓴 뒤 rename (기존 파일을 mmap한 reader는 영향 없음)"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            mm = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(mm, 0, MAGIC, VERSION, capacity, SLOT_SIZE, 0)
+        os.replace(tmp_path, self.path)
+        return mm
+
+    def _slot(self, symbol: str):
+        off = self.slots.get(symbol)
+        if off is not None:
+            return off
+        count = len(self.slots)
+        if count >= self.capacity:
+            if not self.full_warned:
+                print(f"⚠️ 공유 메모리 slot 부족 (capacity={self.capacity}), 새 심볼 무시: {symbol}")
+                self.full_warned = True
+            return None
+        off = HEADER_SIZE + count * SLOT_SIZE
+        SYMBOL.pack_into(self.mm, off + OFF_SYMBOL, symbol.encode()[:16])
+        self.slots[symbol] = off
+        self.seqs[off] = 0
+        # symbol을 먼저 쓰고 count를 올림 → reader는 count 안쪽 slot만 봄
+        struct.pack_into("<I", self.mm, 20, count + 1)
+        return off
+
+    def _write(self, symbol: str, rel_off: int, packer: struct.Struct, values: tuple):
+        off = self._slot(symbol)
+        if off is None:
+            return
+        seq = self.seqs[off] + 1
+        SEQ.pack_into(self.mm, off, seq)  # 홀수: 쓰는 중
+        packer.pack_into(self.mm, off + rel_off, *values)
+        UPDATED.pack_into(self.mm, off + OFF_UPDATED, time.time_ns())
+        seq += 1
+        SEQ.pack_into(self.mm, off, seq)  # 짝수: 완료
+        self.seqs[off] = seq
+
+    def update_book(self, symbol, bid_price, bid_qty, ask_price, ask_qty, book_time):
+        self._write(symbol, OFF_BOOK, BOOK, (bid_price, ask_price, bid_qty, ask_qty, book_time))
+
+    def update_trade(self, symbol, price, qty, trade_time):
+        self._write(symbol, OFF_TRADE, TRADE, (price, qty, trade_time))
+
+    def update_mark(self, symbol, mark_price, mark_time):
+        self._write(symbol, OFF_MARK, MARK, (mark_price, mark_time))
+
+    def update_from_payload(self, payload: dict):
+        """Binance 스트림 payload(이벤트 타입 e 기준) → 해당 필드 갱신. 관심 없는 이벤트는 무시"""
+        event = payload.get("e")
+        try:
+            if event == "bookTicker":
+                self.update_book(payload["s"], float(payload["b"]), float(payload["B"]),
+                                 float(payload["a"]), float(payload["A"]), int(payload.get("T") or payload.get("E") or 0))
+            elif event in ("aggTrade", "trade"):
+                self.update_trade(payload["s"], float(payload["p"]), float(payload["q"]), int(payload["T"]))
+            elif event == "markPriceUpdate":
+                self.update_mark(payload["s"], float(payload["p"]), int(payload["E"]))
+        except (KeyError, IndexError, TypeError, ValueError):
+            pass
+
+    def close(self):
+        self.mm.flush()
+        self.mm.close()
+        os.close(self.lock_fd)  # flock 해제
+
+
+class ShmStateReader:
+    """같은 호스트의 다른 프로세스용 (읽기 전용 mmap)"""
+
+    MAX_RETRY = 100
+
+    def __init__(self, path: str = None):
+        self.path = path or default_path()
+        with open(self.path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.capacity, slot_size, _ = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION or slot_size != SLOT_SIZE:
+            raise ValueError(f"공유 메모리 형식이 다름: {self.path} (magic={magic}, version={version})")
+        self.slots = {}
+        self.known = 0
+        self.retries = 0
+
+    def _refresh(self):
+        count = struct.unpack_from("<I", self.mm, 20)[0]
+        for i in range(self.known, count):
+            off = HEADER_SIZE + i * SLOT_SIZE
+            symbol = SYMBOL.unpack_from(self.mm, off + OFF_SYMBOL)[0].rstrip(b"\0").decode()
+            self.slots[symbol] = off
+        self.known = count
+
+    def symbols(self) -> list:
+        self._refresh()
+        return list(self.slots)
+
+    def get(self, symbol: str):
+        off = self.slots.get(symbol)
+        if off is None:
+            self._refresh()
+            off = self.slots.get(symbol)
+            if off is None:
+                return None
+        mm = self.mm
+        for attempt in range(self.MAX_RETRY):
+            seq = SEQ.unpack_from(mm, off)[0]
+            if seq & 1:
+                self.retries += 1
+                if attempt >= 3:
+                    os.sched_yield()  # writer가 쓰다가 선점됨 (코어가 적을 때) → 계속 돌지 말고 양보
+                continue  # writer가 쓰는 중
+            values = BODY.unpack_from(mm, off + OFF_SYMBOL)
+            if SEQ.unpack_from(mm, off)[0] == seq:
+                return LatestState(symbol, *values[1:])
+            self.retries += 1  # 읽는 사이 갱신됨 → 다시
+        return None
+
+    def close(self):
+        self.mm.close()
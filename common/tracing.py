@@ -0,0 +1,145 @@
+"""
+메시지 단위 지연 추적 (Kafka record header).
+
+수집기가 N개 중 1개(샘플링)에만 header를 붙임 → 나머지 메시지는 비용 없음
+  trace.ex   거래소 이벤트 시각 E (ms, 거래소 시계)
+  trace.rx   WebSocket 프레임 수신 시각 (µs)
+  trace.enq  수집기 처리(파싱 + process_data) 끝나고 전송 경로에 들어온 시각 (µs)
+  trace.send KafkaProducer.send 호출 직전 (envelope/토픽 결정 끝) (µs)
+이후 구간은 소비 쪽에서 계산
+  broker     Kafka record timestamp (수집 토픽은 LogAppendTime → 브로커 적재 시각, infra/setup-kafka.sh)
+  consumer   Python 프로세서 poll 시각 / Spark 배치 시각
+
+시계: time.time()은 NTP 보정으로 뒤로 가거나 튈 수 있으므로 monotonic 기준 wall-clock 사용
+(시작 시 wall과 맞추고, 주기적으로 차이가 1ms 넘게 벌어졌을 때만 다시 맞춤)
+값은 ASCII 정수 (Spark에서 cast만으로 long 변환)
+"""
+import time
+from collections import deque
+
+from common.config import Config
+
+HEADER_EX = "trace.ex"
+HEADER_RX = "trace.rx"
+HEADER_ENQ = "trace.enq"
+HEADER_SEND = "trace.send"
+TRACE_HEADERS = (HEADER_EX, HEADER_RX, HEADER_ENQ, HEADER_SEND)
+
+
+class TraceClock:
+    """monotonic 기반 wall-clock (µs)"""
+
+    def __init__(self, resync_sec: float = 60.0, max_drift_us: int = 1000):
+        self.resync_ns = int(resync_sec * 1e9)
+        self.max_drift_us = max_drift_us
+        self._anchor()
+
+    def _anchor(self):
+        self.mono0 = time.monotonic_ns()
+        self.wall0 = time.time_ns()
+        self.next_check = self.mono0 + self.resync_ns
+
+    def now_us(self) -> int:
+        mono = time.monotonic_ns()
+        if mono >= self.next_check:
+            drift_us = (time.time_ns() - (self.wall0 + mono - self.mono0)) // 1000
+            if abs(drift_us) > self.max_drift_us:
+                self._anchor()  # wall 시계가 크게 바뀜 (NTP step 등) → 다시 맞춤
+            else:
+                self.next_check = mono + self.resync_ns
+        return (self.wall0 + mono - self.mono0) // 1000
+
+
+_clock = TraceClock()
+
+
+def now_us() -> int:
+    return _clock.now_us()
+
+
+class Tracer:
+    """수집기용: sample_every개 중 1개만 추적 (random 대신 카운터 → 호출 비용 최소)"""
+
+    def __init__(self, sample_every: int = None):
+        self.sample_every = max(1, sample_every or Config.TRACE_SAMPLE_EVERY)
+        self.counter = 0
+
+    def sample(self):
+        """추적 대상이면 수신 시각(µs), 아니면 None"""
+        self.counter += 1
+        if self.counter % self.sample_every:
+            return None
+        return now_us()
+
+    @staticmethod
+    def headers(exchange_ms, rx_us: int, enq_us: int, send_us: int) -> list:
+        return [
+            (HEADER_EX, str(int(exchange_ms or 0)).encode()),
+            (HEADER_RX, str(rx_us).encode()),
+            (HEADER_ENQ, str(enq_us).encode()),
+            (HEADER_SEND, str(send_us).encode()),
+        ]
+
+
+def parse_headers(headers) -> dict:
+    """kafka-python ConsumerRecord.headers → {header: int}. 추적 안 된 메시지는 빈 dict"""
+    if not headers:
+        return {}
+    trace = {}
+    for key, value in headers:
+        if key in TRACE_HEADERS:
+            try:
+                trace[key] = int(value)
+            except (TypeError, ValueError):
+                pass
+    return trace
+
+
+def stage_latencies_ms(trace: dict, kafka_ts_ms: int, consumed_us: int) -> dict:
+    """header + Kafka timestamp + 소비 시각 → 구간별 지연(ms)"""
+    if len(trace) < len(TRACE_HEADERS):
+        return {}
+    ex_us = trace[HEADER_EX] * 1000
+    rx, enq, send = trace[HEADER_RX], trace[HEADER_ENQ], trace[HEADER_SEND]
+    stages = {
+        "exchange→receive": (rx - ex_us) / 1000,
+        "receive→enqueue": (enq - rx) / 1000,
+        "enqueue→send": (send - enq) / 1000,
+        "send→broker": kafka_ts_ms - send / 1000,
+        "broker→consumer": consumed_us / 1000 - kafka_ts_ms,
+        "total": (consumed_us - ex_us) / 1000,
+    }
+    if not trace[HEADER_EX]:
+        del stages["exchange→receive"], stages["total"]
+    return stages
+
+
+class StageLatencyStats:
+    """구간별 최근 샘플 (메모리 고정) → p50/p99"""
+
+    def __init__(self, max_samples: int = 5000):
+        self.max_samples = max_samples
+        self.samples = {}
+        self.count = 0
+
+    def add(self, stages: dict):
+        if not stages:
+            return
+        self.count += 1
+        for stage, value in stages.items():
+            bucket = self.samples.get(stage)
+            if bucket is None:
+                bucket = self.samples[stage] = deque(maxlen=self.max_samples)
+            bucket.append(value)
+
+    def report(self) -> str:
+        parts = []
+        for stage, bucket in self.samples.items():
+            ordered = sorted(bucket)
+            last = len(ordered) - 1
+            parts.append(f"{stage} p50={ordered[last // 2]:.1f} p99={ordered[int(last * 0.99)]:.1f}")
+        return " | ".join(parts)
+
+    def reset(self):
+        self.samples.clear()
+        self.count = 0
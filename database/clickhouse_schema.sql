@@ -0,0 +1,137 @@
+-- database/clickhouse_schema.sql
+-- 최초 기동 시 docker-entrypoint-initdb.d에서 실행됨 (이미 데이터가 있으면 수동 적용):
+--   docker exec -i clickhouse clickhouse-client --multiquery < database/clickhouse_schema.sql
+
+-- =====================================================================
+-- 캔들: binance-candle(processors/candle_processor.py) → candles
+-- serving/market_data_api.py가 캐시 miss일 때 조회
+-- =====================================================================
+
+-- Kafka 엔진 테이블: 토픽을 읽는 큐 (직접 SELECT 하지 않음, 아래 MV가 소비)
+CREATE TABLE IF NOT EXISTS candles_queue
+(
+    symbol        String,
+    interval      String,
+    window_start  Int64,      -- epoch ms
+    open          Float64,
+    high          Float64,
+    low           Float64,
+    close         Float64,
+    volume        Float64,
+    quote_volume  Float64,
+    trades_count  UInt32,
+    is_closed     Bool
+)
+ENGINE = Kafka
+SETTINGS
+    kafka_broker_list = 'kafka:29092',
+    kafka_topic_list = 'binance-candle',
+    kafka_group_name = 'clickhouse-candles',
+    kafka_format = 'JSONEachRow',
+    kafka_skip_broken_messages = 100,
+    input_format_skip_unknown_fields = 1;  -- indicators, ts 등 나머지 필드 무시
+
+-- 확정 봉만 저장. 같은 봉이 다시 오면(재처리) ReplacingMergeTree가 병합 때 1건으로 (조회는 FINAL)
+CREATE TABLE IF NOT EXISTS candles
+(
+    symbol        LowCardinality(String),
+    interval      LowCardinality(String),
+    window_start  DateTime64(3, 'UTC'),
+    open          Float64,
+    high          Float64,
+    low           Float64,
+    close         Float64,
+    volume        Float64,
+    quote_volume  Float64,
+    trades_count  UInt32,
+    inserted_at   DateTime DEFAULT now()
+)
+ENGINE = ReplacingMergeTree(inserted_at)
+PARTITION BY toYYYYMM(window_start)
+ORDER BY (symbol, interval, window_start);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS candles_mv TO candles AS
+SELECT
+    symbol,
+    interval,
+    fromUnixTimestamp64Milli(window_start, 'UTC') AS window_start,
+    open, high, low, close, volume, quote_volume, trades_count
+FROM candles_queue
+WHERE is_closed;
+
+-- =====================================================================
+-- 원본 틱 (연구용): processors/clickhouse_tick_loader.py가 RowBinary로 bulk INSERT
+--   binance-trade(aggTrade) → trades / binance-depth(diff) → depth_levels / binance-bookticker → book_ticker
+--
+-- 코덱 (열마다 값 모양에 맞춤, 뒤에 ZSTD로 한 번 더)
+--   시각: DoubleDelta  ← 거의 일정한 간격으로 증가 (2차 차분이 0 근처)
+--   id  : DoubleDelta / Delta ← 단조 증가 (aggTrade id는 1씩, update id는 간격이 일정하지 않아 Delta)
+--   가격: Gorilla ← 직전 값과 비트가 대부분 같음 (XOR)
+--   수량: ZSTD만 (값 분포가 넓어 Gorilla 이득 적음)
+-- ORDER BY (symbol, 시각 …): "심볼 하나 x 시간 구간" 조회가 연속 구간 읽기 + 같은 심볼 값끼리 붙어서 압축률 ↑
+-- ReplacingMergeTree: 로더는 at-least-once (flush 후 오프셋 커밋 전에 죽으면 재시작 시 같은 틱을 다시 INSERT)
+--   → ORDER BY 키가 틱 1건을 가리키므로 병합 때 중복 행 1건으로 합쳐짐 (병합 전 정확한 집계는 FINAL)
+--   기존 MergeTree 테이블은 엔진을 바꿀 수 없으므로 새로 만든 뒤 INSERT SELECT로 옮김
+-- PARTITION BY 날짜 + ttl_only_drop_parts: 만료는 파트 통째로 삭제 (행 단위 재작성 없음)
+-- TTL 계층: 7일 지나면 cold 볼륨(HDD 등), 보관 기간 지나면 삭제
+--   storage_policy 'tiered'는 infra/clickhouse/storage.xml (docker-compose가 config.d로 마운트)
+-- 결과 확인: python3 -m benchmarks.clickhouse_ticks_report (틱당 바이트 + BTCUSDT 하루 depth 스캔 속도)
+-- =====================================================================
+
+CREATE TABLE IF NOT EXISTS trades
+(
+    symbol          LowCardinality(String),
+    trade_time      DateTime64(3, 'UTC') CODEC(DoubleDelta, ZSTD(1)),
+    event_time      DateTime64(3, 'UTC') CODEC(DoubleDelta, ZSTD(1)),
+    agg_trade_id    UInt64  CODEC(DoubleDelta, ZSTD(1)),
+    first_trade_id  UInt64  CODEC(Delta, ZSTD(1)),
+    last_trade_id   UInt64  CODEC(Delta, ZSTD(1)),
+    price           Float64 CODEC(Gorilla, ZSTD(1)),
+    quantity        Float64 CODEC(ZSTD(1)),
+    is_buyer_maker  Bool,
+    received_at     DateTime64(3, 'UTC') CODEC(DoubleDelta, ZSTD(1))  -- 수집기 수신 시각 (envelope ts)
+)
+ENGINE = ReplacingMergeTree
+PARTITION BY toDate(trade_time)
+ORDER BY (symbol, trade_time, agg_trade_id)
+TTL toDateTime(trade_time) + INTERVAL 7 DAY TO VOLUME 'cold',
+    toDateTime(trade_time) + INTERVAL 365 DAY DELETE
+SETTINGS storage_policy = 'tiered', ttl_only_drop_parts = 1;
+
+-- depth diff: 가격 레벨 변경 1건 = 1행 (quantity 0 = 레벨 삭제). 같은 이벤트 안에서는 side, price 순
+CREATE TABLE IF NOT EXISTS depth_levels
+(
+    symbol                LowCardinality(String),
+    event_time            DateTime64(3, 'UTC') CODEC(DoubleDelta, ZSTD(1)),
+    transaction_time      DateTime64(3, 'UTC') CODEC(DoubleDelta, ZSTD(1)),
+    first_update_id       UInt64 CODEC(Delta, ZSTD(1)),
+    final_update_id       UInt64 CODEC(Delta, ZSTD(1)),
+    prev_final_update_id  Int64 CODEC(Delta, ZSTD(1)),   -- futures pu (-1 가능), spot은 pu 없음 → -9223372036854775808
+    side                  Enum8('bid' = 1, 'ask' = 2),
+    price                 Float64 CODEC(Gorilla, ZSTD(1)),
+    quantity              Float64 CODEC(ZSTD(1))
+)
+ENGINE = ReplacingMergeTree
+PARTITION BY toDate(event_time)
+ORDER BY (symbol, event_time, final_update_id, side, price)
+TTL toDateTime(event_time) + INTERVAL 7 DAY TO VOLUME 'cold',
+    toDateTime(event_time) + INTERVAL 90 DAY DELETE
+SETTINGS storage_policy = 'tiered', ttl_only_drop_parts = 1;
+
+CREATE TABLE IF NOT EXISTS book_ticker
+(
+    symbol            LowCardinality(String),
+    update_id         UInt64  CODEC(Delta, ZSTD(1)),
+    event_time        DateTime64(3, 'UTC') CODEC(DoubleDelta, ZSTD(1)),
+    transaction_time  DateTime64(3, 'UTC') CODEC(DoubleDelta, ZSTD(1)),
+    bid_price         Float64 CODEC(Gorilla, ZSTD(1)),
+    bid_qty           Float64 CODEC(ZSTD(1)),
+    ask_price         Float64 CODEC(Gorilla, ZSTD(1)),
+    ask_qty           Float64 CODEC(ZSTD(1))
+)
+ENGINE = ReplacingMergeTree
+PARTITION BY toDate(event_time)
+ORDER BY (symbol, event_time, update_id)
+TTL toDateTime(event_time) + INTERVAL 7 DAY TO VOLUME 'cold',
+    toDateTime(event_time) + INTERVAL 90 DAY DELETE
+SETTINGS storage_policy = 'tiered', ttl_only_drop_parts = 1;
@@ -119,17 +119,73 @@ create_topic() {
     fi
 }
 
+# 압축(compacted) 토픽: 키별 마지막 값만 남음 (심볼별 최신 스냅샷)
+# segment.ms를 짧게 → active segment에 묶이지 않고 compaction 대상이 빨리 됨
+# 파티션 수는 diff 토픽과 같게 (같은 키 → 같은 파티션 번호)
+create_compacted_topic() {
+    local topic=$1
+
+    echo "📝 압축 토픽 생성: $topic"
+    if docker exec "$KAFKA_CONTAINER_NAME" kafka-topics --create \
+        --if-not-exists \
+        --bootstrap-server $BOOTSTRAP_SERVER \
+        --topic "$topic" \
+        --partitions $PARTITIONS \
+        --replication-factor $REPLICATION_FACTOR \
+        --config cleanup.policy=compact \
+        --config segment.ms=600000 \
+        --config min.cleanable.dirty.ratio=0.1 \
+        --config delete.retention.ms=60000 \
+        --config max.message.bytes=4194304 2>&1; then
+        echo "✅ 토픽 생성 성공: $topic"
+    else
+        echo "⚠️  토픽 생성 실패 또는 이미 존재: $topic"
+    fi
+}
+
 echo ""
 echo "=========================================="
-echo "  Kafka 토픽 생성 (depth, kline, trade)"
+echo "  Kafka 토픽 생성 (depth, kline, trade, candle, liquidation)"
 echo "=========================================="
 
 create_topic "binance-depth" 604800000
 create_topic "binance-kline" 604800000
 create_topic "binance-trade" 604800000
+create_topic "binance-bookticker" 604800000    # bookTicker (최우선 호가, ClickHouse book_ticker 적재)
+create_topic "binance-candle" 604800000   # processors/candle_processor 출력
+create_topic "binance-liquidation" 604800000        # collectors/liquidation (!forceOrder@arr)
+create_topic "binance-liquidation-alert" 604800000  # processors/liquidation_detector 알림
+create_topic "binance-trade-gaps" 604800000         # spark_jobs/trade_integrity 누락 aggTrade id 구간
+create_topic "binance-openinterest" 604800000       # collectors/rest_poller (REST 전용 지표)
+create_topic "binance-fundingrate" 604800000
+create_topic "binance-takerlongshort" 604800000
+create_topic "binance-ticker" 604800000             # collectors/mini_ticker (!miniTicker@arr 배열 프레임)
+create_topic "binance-other" 604800000              # Config.TOPIC_MAP에 없는 스트림 (parquet_archiver가 원본 보관)
+create_compacted_topic "binance-depth-snapshot"     # 수집기 심볼별 호가창 스냅샷 (새 소비자 bootstrap)
+create_compacted_topic "binance-correlation"        # processors/correlation_processor 최신 행렬 (key=interval)
+create_compacted_topic "binance-screener"           # collectors/mini_ticker 최신 순위 스냅샷 (key=all)
 # TODO
 ## 스트림 데이터 
 
+# 수집기 토픽은 record timestamp를 브로커 적재 시각으로 (LogAppendTime)
+# → trace header(common/tracing.py)의 send→broker / broker→consumer 구간 분리용
+#   (CreateTime이면 producer가 찍은 시각이라 브로커 구간이 안 보임). 이미 있는 토픽에도 적용
+set_log_append_time() {
+    local topic=$1
+    if docker exec "$KAFKA_CONTAINER_NAME" kafka-configs --alter \
+        --bootstrap-server $BOOTSTRAP_SERVER \
+        --entity-type topics --entity-name "$topic" \
+        --add-config message.timestamp.type=LogAppendTime > /dev/null 2>&1; then
+        echo "🕒 LogAppendTime 설정: $topic"
+    else
+        echo "⚠️  LogAppendTime 설정 실패: $topic"
+    fi
+}
+
+for topic in binance-depth binance-kline binance-trade binance-bookticker binance-liquidation; do
+    set_log_append_time "$topic"
+done
+
 # 리더 선출 대기
 echo ""
 echo "⏳ 리더 선출 완료 대기 중... (15초)"
@@ -0,0 +1,367 @@
+"""
+Binance 공개 덤프(data.binance.vision) 일별/월별 zip CSV → OHLCV (1m + 상위 interval) bulk 적재.
+
+입력 (로컬 디스크, 파일 이름으로 종류 판별):
+  BTCUSDT-aggTrades-2024-01-01.zip  → 체결로 1분봉 집계 (agg_trade_to_1m_ohlcv와 같은 기준)
+  BTCUSDT-1m-2024-01-01.zip         → kline 그대로 사용 (1m 이상 interval 파일도 가능, 그보다 큰 interval만 생성)
+
+- 파일 1개 = 작업 1개, ProcessPoolExecutor로 파일 단위 병렬 (--workers, 기본 코어 수)
+- zip 안 CSV를 CHUNK_ROWS행씩 읽어서 NumPy로 파싱/집계 → 메모리는 워커당 청크 1개 + 그 파일의 봉
+  (청크 경계에 걸친 마지막 1분은 다음 청크로 넘겨서 이어 집계)
+- 1분봉 기준 (스트리밍/배치 1분봉과 동일):
+  open/close = (체결시각 T, aggTrade id)가 가장 작은/큰 체결 가격, high/low = max/min, volume = sum(qty),
+  trades_count = aggTrade 건수, (symbol, aggTrade id) 중복 제거
+  kline 파일의 trades_count는 Binance 원본 체결 건수 (aggTrade 건수와 다름)
+- 상위 interval(5m/15m/1h/4h/1d)은 1분봉을 다시 묶어서 계산 (UTC 기준 정렬)
+- 출력
+  clickhouse: candles 테이블 (RowBinary, BULK_INSERT_ROWS행씩), ReplacingMergeTree라 다시 적재해도 병합 후 1건
+  parquet:    {ARCHIVE_ROOT}/candles_{interval}/symbol=/date=/hour=/part-archive.parquet (backfill.py와 같은 배치)
+              → hour 파티션 통째로 교체 (backfill.py가 쓴 part-*.parquet도 지움), 다시 적재해도 결과 동일 (멱등), pyarrow 필요
+
+실행:
+  python3 -m loaders.binance_archive_loader ~/binance/futures/um/daily/aggTrades/BTCUSDT --sink clickhouse,parquet
+  python3 -m loaders.binance_archive_loader 'data/dumps/*-1m-*.zip' --intervals 1m,1h,1d --workers 8
+"""
+import argparse
+import glob
+import io
+import os
+import re
+import resource
+import time
+import urllib.parse
+import urllib.request
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+import numpy as np
+
+from common.config import Config
+
+ARCHIVE_ROOT = os.getenv("ARCHIVE_ROOT", "data/archive")
+CHUNK_ROWS = 500_000
+BULK_INSERT_ROWS = 500_000
+MINUTE_MS = 60_000
+
+INTERVALS_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000, "12h": 43_200_000,
+    "1d": 86_400_000,
+}
+DEFAULT_INTERVALS = "1m,5m,15m,1h,4h,1d"
+
+# candles 테이블 RowBinary 열 순서와 같음 (symbol, interval 앞에 붙여서 그대로 tobytes)
+BAR_DTYPE = np.dtype([
+    ("window_start", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+    ("volume", "<f8"), ("quote_volume", "<f8"), ("trades_count", "<u4"),
+])
+CANDLE_COLUMNS = "symbol, interval, window_start, open, high, low, close, volume, quote_volume, trades_count"
+
+FILE_PATTERN = re.compile(r"^(?P<symbol>[A-Z0-9]+)-(?P<kind>aggTrades|\d+[mhd])-\d{4}-\d{2}(-\d{2})?\.zip$")
+
+AGG_TRADE_COLUMNS = (0, 1, 2, 5)            # agg_trade_id, price, quantity, transact_time
+KLINE_COLUMNS = (0, 1, 2, 3, 4, 5, 7, 8)    # open_time, o, h, l, c, volume, quote_volume, count
+
+
+def parse_file_name(path: str):
+    """(symbol, 'aggTrades' 또는 kline interval) / 모르는 이름이면 None"""
+    m = FILE_PATTERN.match(os.path.basename(path))
+    return (m.group("symbol"), m.group("kind")) if m else None
+
+
+def iter_csv_chunks(path: str, usecols: tuple, chunk_rows: int = CHUNK_ROWS):
+    """zip 안 CSV를 chunk_rows행씩 float64 2차원 배열로 (헤더 있으면 건너뜀)"""
+    with zipfile.ZipFile(path) as zf:
+        with zf.open(zf.namelist()[0]) as raw:
+            lines = io.TextIOWrapper(raw, encoding="ascii")
+            first = True
+            while True:
+                chunk = list(islice(lines, chunk_rows))
+                if first and chunk and not chunk[0][:1].isdigit():
+                    chunk = chunk[1:]  # 2022년 이후 덤프는 헤더 있음
+                first = False
+                if not chunk:
+                    return
+                yield np.loadtxt(chunk, delimiter=",", usecols=usecols, dtype=np.float64, ndmin=2)
+
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    """정렬된 keys에서 값이 바뀌는 위치 (그룹 시작 인덱스)"""
+    return np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+
+
+def _trades_to_bars(window, price, qty) -> np.ndarray:
+    """(window_start, 체결 순 정렬) 체결 배열 → 1분봉"""
+    starts = _group_starts(window)
+    ends = np.append(starts[1:], len(window))
+    bars = np.empty(len(starts), dtype=BAR_DTYPE)
+    bars["window_start"] = window[starts]
+    bars["open"] = price[starts]
+    bars["close"] = price[ends - 1]
+    bars["high"] = np.maximum.reduceat(price, starts)
+    bars["low"] = np.minimum.reduceat(price, starts)
+    bars["volume"] = np.add.reduceat(qty, starts)
+    bars["quote_volume"] = np.add.reduceat(price * qty, starts)
+    bars["trades_count"] = ends - starts
+    return bars
+
+
+def agg_trades_to_1m(path: str, chunk_rows: int = CHUNK_ROWS):
+    """aggTrades zip → (1분봉 배열, 읽은 행 수, 중복 제거 수)"""
+    bars, rows, duplicates = [], 0, 0
+    last_id = -1.0
+    carry = None  # 이전 청크의 마지막 1분 (id, time, price, qty) — 다음 청크와 이어서 집계
+    for chunk in iter_csv_chunks(path, AGG_TRADE_COLUMNS, chunk_rows):
+        rows += len(chunk)
+        ids, price, qty, times = chunk[:, 0], chunk[:, 1], chunk[:, 2], chunk[:, 3]
+        if times[0] > 1e14:
+            times = np.floor_divide(times, 1000)  # 2025년 이후 spot 덤프는 µs
+
+        # (symbol, aggTrade id) 중복 제거: 덤프는 id 순이므로 보통 그대로 통과
+        if not np.all(ids[1:] > ids[:-1]):
+            _, first = np.unique(ids, return_index=True)
+            ids, price, qty, times = ids[first], price[first], qty[first], times[first]
+        keep = ids > last_id  # 이전 청크에서 이미 본 id
+        if not keep.all():
+            ids, price, qty, times = ids[keep], price[keep], qty[keep], times[keep]
+        duplicates += len(chunk) - len(ids)
+        if not len(ids):
+            continue
+        last_id = ids[-1]
+
+        # (T, id) 순 정렬: 덤프는 이미 정렬돼 있어서 보통 건너뜀
+        if not np.all(times[1:] >= times[:-1]):
+            order = np.lexsort((ids, times))
+            ids, price, qty, times = ids[order], price[order], qty[order], times[order]
+
+        if carry is not None:
+            ids, times, price, qty = (np.concatenate((c, a)) for c, a in zip(carry, (ids, times, price, qty)))
+        window = (times // MINUTE_MS * MINUTE_MS).astype(np.int64)
+        tail = np.searchsorted(window, window[-1])  # 마지막 1분은 다음 청크에 이어질 수 있음
+        carry = (ids[tail:], times[tail:], price[tail:], qty[tail:])
+        if tail:
+            bars.append(_trades_to_bars(window[:tail], price[:tail], qty[:tail]))
+
+    if carry is not None and len(carry[0]):
+        _, times, price, qty = carry
+        bars.append(_trades_to_bars((times // MINUTE_MS * MINUTE_MS).astype(np.int64), price, qty))
+    return (np.concatenate(bars) if bars else np.empty(0, dtype=BAR_DTYPE)), rows, duplicates
+
+
+def klines_to_bars(path: str, chunk_rows: int = CHUNK_ROWS):
+    """kline zip → (봉 배열, 읽은 행 수, 0)"""
+    bars, rows = [], 0
+    for chunk in iter_csv_chunks(path, KLINE_COLUMNS, chunk_rows):
+        rows += len(chunk)
+        part = np.empty(len(chunk), dtype=BAR_DTYPE)
+        open_time = chunk[:, 0]
+        if open_time[0] > 1e14:
+            open_time = np.floor_divide(open_time, 1000)
+        part["window_start"] = open_time.astype(np.int64)
+        for i, name in enumerate(("open", "high", "low", "close", "volume", "quote_volume", "trades_count"), start=1):
+            part[name] = chunk[:, i]
+        bars.append(part)
+    return (np.concatenate(bars) if bars else np.empty(0, dtype=BAR_DTYPE)), rows, 0
+
+
+def rollup(bars: np.ndarray, interval_ms: int) -> np.ndarray:
+    """시간순 봉 → 더 큰 interval 봉 (open=첫 봉 open, close=마지막 봉 close, 나머지 max/min/sum)"""
+    window = bars["window_start"] // interval_ms * interval_ms
+    starts = _group_starts(window)
+    ends = np.append(starts[1:], len(bars))
+    out = np.empty(len(starts), dtype=BAR_DTYPE)
+    out["window_start"] = window[starts]
+    out["open"] = bars["open"][starts]
+    out["close"] = bars["close"][ends - 1]
+    out["high"] = np.maximum.reduceat(bars["high"], starts)
+    out["low"] = np.minimum.reduceat(bars["low"], starts)
+    for name in ("volume", "quote_volume", "trades_count"):
+        out[name] = np.add.reduceat(bars[name], starts)
+    return out
+
+
+def rowbinary_candles(symbol: str, interval: str, bars: np.ndarray) -> bytes:
+    """candles RowBinary: 행마다 symbol/interval String(길이 1바이트 + bytes) + 봉 필드 (한 번에 tobytes)"""
+    prefix = b"".join(bytes([len(s)]) + s.encode() for s in (symbol, interval))
+    rows = np.empty(len(bars), dtype=np.dtype([("prefix", f"S{len(prefix)}")] + BAR_DTYPE.descr))
+    rows["prefix"] = prefix
+    for name in BAR_DTYPE.names:
+        rows[name] = bars[name]
+    return rows.tobytes()
+
+
+def write_parquet(symbol: str, interval: str, bars: np.ndarray, root: str = ARCHIVE_ROOT):
+    """
+    backfill.py와 같은 symbol=/date=/hour= 배치, 시간(hour) 파티션마다 파일 1개로 교체.
+    backfill.py가 같은 hour에 쓴 part-*.parquet이 남아 있으면 같은 봉이 두 번 읽히므로
+    dynamic partition overwrite처럼 hour 디렉터리의 다른 *.parquet은 지움 (임시 파일에 다 쓴 뒤 교체)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    hours = bars["window_start"] // 3_600_000
+    starts = _group_starts(hours)
+    ends = np.append(starts[1:], len(bars))
+    for start, end in zip(starts, ends):
+        part = bars[start:end]
+        hour_ts = int(hours[start]) * 3600
+        directory = os.path.join(
+            root, f"candles_{interval}", f"symbol={symbol}",
+            f"date={time.strftime('%Y-%m-%d', time.gmtime(hour_ts))}", f"hour={time.gmtime(hour_ts).tm_hour}",
+        )
+        os.makedirs(directory, exist_ok=True)
+        table = pa.table({
+            "window_start": pa.array(part["window_start"], pa.timestamp("ms", tz="UTC")),
+            **{name: pa.array(part[name]) for name in ("open", "high", "low", "close", "volume")},
+            "trades_count": pa.array(part["trades_count"].astype(np.int64)),
+        })
+        target = os.path.join(directory, "part-archive.parquet")
+        tmp_path = os.path.join(directory, f".part-archive.{os.getpid()}.tmp")  # '.'으로 시작 → Spark/pyarrow가 무시
+        pq.write_table(table, tmp_path, compression="zstd")
+        for stale in glob.glob(os.path.join(directory, "*.parquet")):
+            if stale != target:
+                os.remove(stale)
+        os.replace(tmp_path, target)
+
+
+def load_file(path: str, intervals: list, sinks: list, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """워커: 파일 1개 → interval별 봉 (clickhouse 싱크면 RowBinary로 반환, parquet은 여기서 바로 씀)"""
+    started = time.time()
+    symbol, kind = parse_file_name(path)
+    if kind == "aggTrades":
+        base_ms = MINUTE_MS
+        bars, rows, duplicates = agg_trades_to_1m(path, chunk_rows)
+    else:
+        base_ms = INTERVALS_MS[kind]
+        bars, rows, duplicates = klines_to_bars(path, chunk_rows)
+
+    payloads, bar_count = [], 0
+    for interval in intervals:
+        interval_ms = INTERVALS_MS[interval]
+        if interval_ms < base_ms or interval_ms % base_ms or not len(bars):
+            continue  # 원본보다 작은 interval은 못 만듦
+        out = bars if interval_ms == base_ms else rollup(bars, interval_ms)
+        bar_count += len(out)
+        if "parquet" in sinks:
+            write_parquet(symbol, interval, out)
+        if "clickhouse" in sinks:
+            payloads.append((len(out), rowbinary_candles(symbol, interval, out)))
+    return {
+        "path": path, "rows": rows, "duplicates": duplicates, "bars": bar_count, "payloads": payloads,
+        "bytes": os.path.getsize(path), "seconds": time.time() - started,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+class CandleInserter:
+    """여러 파일의 RowBinary를 모아서 BULK_INSERT_ROWS행마다 INSERT 1번 (작은 part 난립 방지)"""
+
+    def __init__(self, url: str = Config.CLICKHOUSE_URL):
+        query = f"INSERT INTO candles ({CANDLE_COLUMNS}) FORMAT RowBinary"
+        self.url = f"{url}?{urllib.parse.urlencode({'query': query})}"
+        self.chunks = []
+        self.rows = 0
+        self.inserted = 0
+
+    def add(self, rows: int, payload: bytes):
+        self.chunks.append(payload)
+        self.rows += rows
+        if self.rows >= BULK_INSERT_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        request = urllib.request.Request(self.url, data=b"".join(self.chunks), method="POST")
+        with urllib.request.urlopen(request, timeout=120) as resp:
+            resp.read()
+        self.inserted += self.rows
+        self.chunks = []
+        self.rows = 0
+
+
+def find_files(inputs: list) -> list:
+    """파일 / 디렉토리(하위 전체) / glob → 이름 규칙에 맞는 zip (정렬)"""
+    found = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = glob.glob(os.path.join(item, "**", "*.zip"), recursive=True)
+        else:
+            candidates = glob.glob(item)
+        found.update(p for p in candidates if parse_file_name(p))
+    return sorted(found)
+
+
+def load_files(paths: list, intervals: list, sinks: list, workers: int = None, chunk_rows: int = CHUNK_ROWS,
+               inserter: CandleInserter = None, verbose: bool = True) -> dict:
+    """파일들을 프로세스 풀로 적재, 합계 통계 반환"""
+    if "clickhouse" in sinks and inserter is None:
+        inserter = CandleInserter()
+    totals = {"files": 0, "rows": 0, "duplicates": 0, "bars": 0, "bytes": 0, "max_rss_mb": 0.0, "failed": 0}
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(load_file, path, intervals, sinks, chunk_rows): path for path in paths}
+        for future in as_completed(futures):
+            # 끝난 Future는 dict에서 빼서 payload(인코딩된 행)가 파일 수만큼 쌓이지 않게 (as_completed도 참조를 놓음)
+            path = futures.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                totals["failed"] += 1
+                print(f"\n❌ {os.path.basename(path)} 적재 실패: {e}")
+                continue
+            for rows, payload in result["payloads"]:
+                inserter.add(rows, payload)
+            totals["files"] += 1
+            for key in ("rows", "duplicates", "bars", "bytes"):
+                totals[key] += result[key]
+            totals["max_rss_mb"] = max(totals["max_rss_mb"], result["max_rss_mb"])
+            if verbose:
+                elapsed = time.time() - started
+                print(f"📦 [{totals['files']}/{len(paths)}] {os.path.basename(result['path'])} "
+                      f"{result['rows']:,}행 → 봉 {result['bars']:,} ({result['seconds']:.1f}초) | "
+                      f"누적 {totals['rows'] / max(elapsed, 1e-9) / 1e6:.1f}M rows/s", end="\r")
+    if inserter is not None:
+        inserter.flush()
+    totals["seconds"] = time.time() - started
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binance 덤프 zip(aggTrades/klines) → OHLCV bulk 적재")
+    parser.add_argument("inputs", nargs="+", help="zip 파일 / 디렉토리 / glob")
+    parser.add_argument("--intervals", default=DEFAULT_INTERVALS, help=f"쉼표 구분 (기본 {DEFAULT_INTERVALS})")
+    parser.add_argument("--sink", default="clickhouse", help="clickhouse, parquet 또는 둘 다 (쉼표), none = 집계만")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: 코어 수)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    intervals = [s.strip() for s in args.intervals.split(",") if s.strip()]
+    unknown = [i for i in intervals if i not in INTERVALS_MS]
+    if unknown:
+        parser.error(f"알 수 없는 interval: {unknown} (사용 가능: {list(INTERVALS_MS)})")
+    sinks = [s.strip() for s in args.sink.split(",") if s.strip() and s.strip() != "none"]
+    if set(sinks) - {"clickhouse", "parquet"}:
+        parser.error("--sink는 clickhouse, parquet, none 중에서")
+    if "parquet" in sinks:
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            parser.error("parquet 출력에는 pyarrow 필요 (pip install pyarrow)")
+
+    paths = find_files(args.inputs)
+    if not paths:
+        print("❌ 적재할 파일 없음 (이름 형식: SYMBOL-aggTrades-YYYY-MM-DD.zip / SYMBOL-1m-YYYY-MM-DD.zip)")
+        return
+    print(f"🚀 {len(paths)}개 파일 적재 시작 | interval {intervals} | 출력 {sinks or ['없음']} | "
+          f"워커 {args.workers or os.cpu_count()}개")
+    totals = load_files(paths, intervals, sinks, args.workers, args.chunk_rows)
+    print(f"\n✅ 완료: 파일 {totals['files']}개 (실패 {totals['failed']}) | {totals['rows']:,}행 "
+          f"(중복 {totals['duplicates']:,}) → 봉 {totals['bars']:,} | {totals['seconds']:.1f}초 "
+          f"({totals['rows'] / max(totals['seconds'], 1e-9) / 1e6:.1f}M rows/s, "
+          f"zip {totals['bytes'] / max(totals['seconds'], 1e-9) / 1e6:.0f} MB/s) | 워커 최대 RSS {totals['max_rss_mb']:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
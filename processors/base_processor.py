@@ -0,0 +1,235 @@
+# processors/base_processor.py
+"""
+Spark 없이 돌아가는 경량 스트림 처리 런타임 (Kafka Consumer Group 기반).
+
+- poll()로 배치 단위 수신 → process_batch()에서 증분 상태 갱신 → 즉시 결과 전송
+- 상태는 파티션(TopicPartition)별로 보관: 키(symbol) 기준으로 파티션이 나뉘므로
+  같은 그룹의 프로세스를 여러 개 띄우면 파티션 단위로 자동 scale-out
+- 주기적으로 (오프셋 + 상태)를 파티션별 파일에 체크포인트, 재할당/재시작 시 복원
+- fetch_max_wait_ms를 짧게 잡아서 Spark 1분 트리거 대비 sub-second 지연
+"""
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+
+from kafka import KafkaConsumer, ConsumerRebalanceListener
+
+from common.config import Config
+from common.tracing import StageLatencyStats, now_us, parse_headers, stage_latencies_ms
+
+TRACE_REPORT_SEC = 10.0
+
+
+class _CheckpointRebalanceListener(ConsumerRebalanceListener):
+    """파티션 재할당 시 체크포인트 저장/복원 (poll() 내부에서 호출됨)"""
+
+    def __init__(self, processor):
+        self.processor = processor
+
+    def on_partitions_revoked(self, revoked):
+        self.processor._on_revoked(revoked)
+
+    def on_partitions_assigned(self, assigned):
+        self.processor._on_assigned(assigned)
+
+
+class BaseStreamProcessor(ABC):
+    def __init__(
+        self,
+        group_id: str,
+        topics: list,
+        auto_offset_reset: str = "latest",
+        max_poll_records: int = 500,
+        poll_timeout_ms: int = 50,
+        checkpoint_interval_sec: float = 5.0,
+        checkpoint_dir: str = None,
+    ):
+        self.group_id = group_id
+        self.topics = topics
+        self.max_poll_records = max_poll_records
+        self.poll_timeout_ms = poll_timeout_ms
+        self.checkpoint_interval_sec = checkpoint_interval_sec
+        self.checkpoint_dir = os.path.join(checkpoint_dir or Config.PROCESSOR_CHECKPOINT_DIR, group_id)
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+        # 파티션별 상태: {TopicPartition: {key: state}} / 처리 완료 위치: {TopicPartition: next_offset}
+        self.states = {}
+        self.positions = {}
+
+        # 메트릭 관리
+        self.total_count = 0
+        self.batch_count = 0
+        self.start_time = None
+        self.last_checkpoint_time = None
+        self.running = True
+        # 수집기가 샘플링해서 붙인 trace header → 구간별 지연 (수집 → 브로커 → 이 프로세서)
+        self.trace_stats = StageLatencyStats()
+        self.last_trace_report = time.time()
+
+        self.consumer = KafkaConsumer(
+            bootstrap_servers=[Config.KAFKA_BOOTSTRAP_SERVERS],
+            group_id=group_id,
+            enable_auto_commit=False,  # 체크포인트와 함께 커밋 (상태와 오프셋이 어긋나지 않게)
+            auto_offset_reset=auto_offset_reset,
+            fetch_max_wait_ms=10,  # 기본 500ms → 10ms (데이터 오면 바로 반환)
+            max_poll_records=max_poll_records,
+            value_deserializer=self._deserialize,
+        )
+        self.consumer.subscribe(topics, listener=_CheckpointRebalanceListener(self))
+
+    @staticmethod
+    def _deserialize(raw: bytes):
+        try:
+            return json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+
+    @abstractmethod
+    def process_batch(self, tp, records: list):
+        """하위 클래스에서 한 파티션의 레코드 묶음으로 상태 갱신 + 결과 전송"""
+        pass
+
+    @abstractmethod
+    def encode_state(self, key: str, state) -> list:
+        """상태 객체 → JSON 직렬화 가능한 값 (체크포인트용, key는 상태 dict의 키)"""
+        pass
+
+    @abstractmethod
+    def decode_state(self, key: str, data: list):
+        """encode_state의 역변환"""
+        pass
+
+    def after_batch(self):
+        """poll 1회 처리 후 호출 (예: 변경된 결과 한번에 flush). 필요 시 오버라이드"""
+        pass
+
+    def bootstrap_partitions(self, tps: list) -> dict:
+        """
+        체크포인트 없는 파티션의 초기 상태 {tp: (state dict, 시작 offset)} (없으면 auto_offset_reset 기준)
+        예: 호가창 processor는 압축 스냅샷 토픽에서 채우고 diff 토픽은 스냅샷 위치부터. 필요 시 오버라이드
+        """
+        return {}
+
+    def partition_state(self, tp) -> dict:
+        return self.states.setdefault(tp, {})
+
+    # ---------------- 체크포인트 ----------------
+
+    def _checkpoint_path(self, tp) -> str:
+        return os.path.join(self.checkpoint_dir, f"{tp.topic}-{tp.partition}.json")
+
+    def _save_checkpoint(self, tps):
+        for tp in tps:
+            if tp not in self.positions:
+                continue  # 아직 처리한 레코드 없음
+            snapshot = {
+                "offset": self.positions[tp],
+                "state": {key: self.encode_state(key, s) for key, s in self.states.get(tp, {}).items()},
+                "saved_at": int(time.time() * 1000),
+            }
+            path = self._checkpoint_path(tp)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, path)  # 원자적 교체 (쓰다 죽어도 이전 체크포인트 유지)
+
+    def checkpoint(self):
+        """모든 담당 파티션 상태 저장 후 Kafka 오프셋 커밋"""
+        self._save_checkpoint(list(self.positions.keys()))
+        try:
+            self.consumer.commit()
+        except Exception as e:
+            print(f"\n⚠️ 오프셋 커밋 실패: {e}")
+        self.last_checkpoint_time = time.time()
+
+    def _on_revoked(self, revoked):
+        self._save_checkpoint(revoked)
+        for tp in revoked:
+            self.states.pop(tp, None)
+            self.positions.pop(tp, None)
+
+    def _on_assigned(self, assigned):
+        missing = []
+        for tp in assigned:
+            path = self._checkpoint_path(tp)
+            if not os.path.exists(path):
+                missing.append(tp)
+                continue
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+                state = {key: self.decode_state(key, v) for key, v in snapshot["state"].items()}
+                offset = snapshot["offset"]
+            except (OSError, KeyError, TypeError, ValueError) as e:  # JSONDecodeError ⊂ ValueError
+                # 체크포인트 없는 파티션과 같은 부트스트랩 (빈 상태로 커밋 오프셋부터 이어가지 않음)
+                print(f"\n⚠️ 체크포인트 로드 실패 ({tp.topic}-{tp.partition}): {e} → 부트스트랩")
+                missing.append(tp)
+                continue
+            self.states[tp] = state
+            self.positions[tp] = offset
+            # 커밋된 오프셋보다 체크포인트가 기준 (상태와 같은 시점에서 재개)
+            self.consumer.seek(tp, snapshot["offset"])
+        if missing:
+            for tp, (state, offset) in self.bootstrap_partitions(missing).items():
+                self.states[tp] = state
+                self.positions[tp] = offset
+                self.consumer.seek(tp, offset)
+        print(f"\n🔀 파티션 할당: {sorted(f'{tp.topic}-{tp.partition}' for tp in assigned)}")
+
+    # ---------------- 메인 루프 ----------------
+
+    def run(self):
+        self.start_time = time.time()
+        self.last_checkpoint_time = self.start_time
+        print(f"🚀 {self.__class__.__name__} 시작 | 그룹: {self.group_id} | 구독: {self.topics}")
+
+        try:
+            while self.running:
+                batch = self.consumer.poll(timeout_ms=self.poll_timeout_ms, max_records=self.max_poll_records)
+                consumed_us = now_us()
+                for tp, records in batch.items():
+                    self._collect_traces(records, consumed_us)
+                    self.process_batch(tp, records)
+                    self.positions[tp] = records[-1].offset + 1
+                    self.total_count += len(records)
+                if batch:
+                    self.batch_count += 1
+                    self.after_batch()
+
+                if time.time() - self.last_checkpoint_time >= self.checkpoint_interval_sec:
+                    self.checkpoint()
+                self._report_traces()
+        except KeyboardInterrupt:
+            print("\n🛑 중단 요청 수신")
+        finally:
+            self.running = False
+            self.checkpoint()
+            self.consumer.close()
+            self._final_report()
+
+    def _collect_traces(self, records: list, consumed_us: int):
+        for record in records:
+            if record.headers:
+                trace = parse_headers(record.headers)
+                self.trace_stats.add(stage_latencies_ms(trace, record.timestamp, consumed_us))
+
+    def _report_traces(self):
+        now = time.time()
+        if now - self.last_trace_report < TRACE_REPORT_SEC:
+            return
+        self.last_trace_report = now
+        if self.trace_stats.count:
+            print(f"\n🔎 구간별 지연(ms, 샘플 {self.trace_stats.count}) | {self.trace_stats.report()}")
+            self.trace_stats.reset()
+
+    def _final_report(self):
+        if self.start_time:
+            duration = time.time() - self.start_time
+            avg_rate = self.total_count / duration if duration > 0 else 0
+            print(
+                f"\n📊 종료 리포트 | 평균 처리량: {avg_rate:.2f} msgs/sec | "
+                f"총 메시지: {self.total_count:,} | 배치: {self.batch_count:,}"
+            )
+        if self.trace_stats.count:
+            print(f"🔎 구간별 지연(ms, 마지막 구간 샘플 {self.trace_stats.count}) | {self.trace_stats.report()}")
@@ -0,0 +1,272 @@
+"""
+aggTrade → 실시간 캔들(OHLCV) 증분 집계 (Spark stream_preprocess의 저지연 버전).
+
+- binance-trade 구독 → 심볼별 현재 봉 상태를 체결마다 O(1) 갱신
+- poll 1회가 끝날 때마다 바뀐 심볼의 봉만 binance-candle 토픽으로 전송 (sub-second)
+- 봉 구간이 넘어가면 이전 봉을 is_closed=True로 한 번 더 보내고 새 봉 시작
+- 체결이 뜸한 심볼도 파티션 워터마크(가장 늦은 체결 시각)가 봉 끝 + CLOSE_GRACE_MS를 지나면 확정
+  (다음 체결을 기다리지 않음), EVICT_IDLE_MS 넘게 체결 없는 심볼과 회수된 파티션의 심볼은 상태 삭제
+- 집계 의미는 agg_trade_to_1m_ohlcv와 동일 (T 기준 구간, open=첫 체결, close=마지막 체결)
+- 확정 봉에는 기술적 지표(EMA/RSI/ATR/VWAP/realized vol)를 붙여서 전송
+  (common/indicators.py, Spark indicator_job.py와 같은 엔진 → 두 경로 값 일치)
+
+실행: python3 -m processors.candle_processor [--interval 1m]
+scale-out: 같은 명령을 여러 개 띄우면 파티션을 나눠 가짐 (같은 group_id)
+"""
+import argparse
+import math
+import time
+
+from common.config import Config
+from common.indicators import INDICATOR_COLUMNS, IndicatorEngine
+from common.kafka_utils import KafkaProducerWrapper
+from processors.base_processor import BaseStreamProcessor
+
+INTERVALS_MS = {"1s": 1_000, "5s": 5_000, "15s": 15_000, "1m": 60_000, "5m": 300_000}
+CLOSE_GRACE_MS = 5_000          # 봉 끝 이후 이만큼 워터마크가 지나면 체결 없어도 확정
+EVICT_IDLE_MS = 6 * 3_600_000   # 이 시간 넘게 체결 없는 심볼은 봉/지표 상태 삭제 (상장폐지 등)
+
+
+class CandleState:
+    """심볼 1개의 진행 중인 봉 (__slots__로 심볼 수천 개여도 메모리 작게)"""
+
+    __slots__ = (
+        "window_start", "open", "high", "low", "close",
+        "volume", "quote_volume", "trades_count", "last_trade_time", "last_ingest_ts", "is_closed",
+    )
+
+    def __init__(self, window_start: int, price: float):
+        self.window_start = window_start
+        self.open = self.high = self.low = self.close = price
+        self.volume = 0.0
+        self.quote_volume = 0.0  # sum(price * qty) → vwap = quote_volume / volume
+        self.trades_count = 0
+        self.last_trade_time = 0
+        self.last_ingest_ts = 0
+        self.is_closed = False  # 워터마크로 먼저 확정됨 (같은 구간 지연 체결은 버림)
+
+    def update(self, price: float, qty: float, trade_time: int, ingest_ts: int):
+        if price > self.high:
+            self.high = price
+        if price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += qty
+        self.quote_volume += price * qty
+        self.trades_count += 1
+        self.last_trade_time = trade_time
+        self.last_ingest_ts = ingest_ts
+
+    def to_list(self) -> list:
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_list(cls, values: list):
+        state = cls.__new__(cls)
+        state.is_closed = False  # is_closed 추가 전 체크포인트 호환
+        for name, value in zip(cls.__slots__, values):
+            setattr(state, name, value)
+        return state
+
+
+class CandleProcessor(BaseStreamProcessor):
+    def __init__(self, interval: str = "1m", with_indicators: bool = True, **kwargs):
+        self.interval = interval
+        self.interval_ms = INTERVALS_MS[interval]
+        super().__init__(group_id=f"candle-processor-{interval}", topics=["binance-trade"], **kwargs)
+        self.kafka = KafkaProducerWrapper(Config.KAFKA_BOOTSTRAP_SERVERS)
+        self.indicators = IndicatorEngine() if with_indicators else None
+        self.dirty = {}  # 이번 poll에서 바뀐 심볼 → 상태 (배치 끝에 한 번만 전송)
+        self.closed = []  # 이번 poll에서 확정된 (심볼, 봉) → 배치 끝에 지표를 심볼 벡터로 한 번에 계산
+        self.late_count = 0
+        self.emit_count = 0
+        self.latest_trade_time = 0
+        self.watermarks = {}  # 파티션 → 가장 늦은 체결 시각 (ms)
+        self.timer_closed = 0
+        self.evicted = 0
+        self.last_report_time = time.time()
+
+    def encode_state(self, key: str, state: CandleState) -> list:
+        indicator_state = self.indicators.export_symbol(key) if self.indicators else None
+        return [state.to_list(), indicator_state]
+
+    def decode_state(self, key: str, data: list) -> CandleState:
+        if not isinstance(data[0], list):
+            return CandleState.from_list(data)  # 지표 추가 전 체크포인트 (봉 상태만)
+        if self.indicators:
+            self.indicators.import_symbol(key, data[1])
+        return CandleState.from_list(data[0])
+
+    def process_batch(self, tp, records: list):
+        states = self.partition_state(tp)
+        for record in records:
+            msg = record.value
+            if not msg:
+                continue
+            data = msg.get("data", {})
+            if data.get("e") != "aggTrade":
+                continue
+            try:
+                symbol = msg["symbol"]
+                price = float(data["p"])
+                qty = float(data["q"])
+                trade_time = int(data["T"])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            window_start = trade_time - trade_time % self.interval_ms
+            state = states.get(symbol)
+            if state is None or window_start > state.window_start:
+                if state is not None and not state.is_closed:
+                    self.closed.append((symbol, state))  # 이전 봉 확정
+                state = CandleState(window_start, price)
+                states[symbol] = state
+            elif window_start < state.window_start or state.is_closed:
+                self.late_count += 1  # 이미 닫은 봉의 지연 체결 (파티션 내 순서 보장이라 거의 없음)
+                continue
+
+            state.update(price, qty, trade_time, msg.get("ts", 0))
+            self.dirty[symbol] = state
+            if trade_time > self.latest_trade_time:
+                self.latest_trade_time = trade_time
+            if trade_time > self.watermarks.get(tp, 0):
+                self.watermarks[tp] = trade_time
+
+    def _close_idle(self):
+        """파티션 워터마크가 봉 끝 + grace를 지난 열린 봉은 확정, 오래 체결 없는 심볼은 상태 삭제"""
+        evict = []
+        for tp, watermark in self.watermarks.items():
+            states = self.partition_state(tp)
+            for symbol, state in states.items():
+                if state.is_closed:
+                    if watermark - state.window_start >= EVICT_IDLE_MS:
+                        evict.append((states, symbol))
+                elif watermark >= state.window_start + self.interval_ms + CLOSE_GRACE_MS:
+                    state.is_closed = True
+                    self.closed.append((symbol, state))
+                    self.dirty.pop(symbol, None)  # 진행 중 봉으로 다시 보내지 않음
+                    self.timer_closed += 1
+        for states, symbol in evict:
+            del states[symbol]
+        if evict:
+            if self.indicators:
+                self.indicators.drop_symbols([symbol for _, symbol in evict])
+            self.evicted += len(evict)
+
+    def _on_revoked(self, revoked):
+        # 체크포인트(지표 포함) 저장 후 이 파티션 심볼의 봉/지표 상태 삭제 (다른 프로세스가 이어받음)
+        symbols = [symbol for tp in revoked for symbol in self.states.get(tp, {})]
+        super()._on_revoked(revoked)
+        for tp in revoked:
+            self.watermarks.pop(tp, None)
+        for symbol in symbols:
+            self.dirty.pop(symbol, None)
+        if self.indicators:
+            self.indicators.drop_symbols(symbols)
+
+    def after_batch(self):
+        self._close_idle()
+        if self.closed:
+            self._emit_closed()  # 진행 중인 봉보다 먼저 전송 (심볼별 순서 유지)
+        for symbol, state in self.dirty.items():
+            self._emit(symbol, state, is_closed=False)
+        self.dirty.clear()
+        self._report_metrics()
+
+    def _emit_closed(self):
+        # 1s 봉처럼 한 poll에서 같은 심볼이 여러 번 닫히면 닫힌 순서대로 다음 라운드에서 갱신
+        rounds = []
+        seen = {}
+        for symbol, state in self.closed:
+            r = seen.get(symbol, 0)
+            seen[symbol] = r + 1
+            if r == len(rounds):
+                rounds.append([])
+            rounds[r].append((symbol, state))
+        self.closed.clear()
+
+        for batch in rounds:
+            values = None
+            if self.indicators:
+                values = self.indicators.update(
+                    [symbol for symbol, _ in batch],
+                    [state.high for _, state in batch],
+                    [state.low for _, state in batch],
+                    [state.close for _, state in batch],
+                    [state.volume for _, state in batch],
+                )
+            for i, (symbol, state) in enumerate(batch):
+                indicators = None
+                if values is not None:
+                    # 워밍업 전 NaN은 JSON에 못 넣으므로 None
+                    indicators = {
+                        name: None if math.isnan(values[name][i]) else float(values[name][i])
+                        for name in INDICATOR_COLUMNS
+                    }
+                self._emit(symbol, state, is_closed=True, indicators=indicators)
+
+    def _emit(self, symbol: str, state: CandleState, is_closed: bool, indicators: dict = None):
+        message = {
+            "symbol": symbol,
+            "interval": self.interval,
+            "window_start": state.window_start,
+            "open": state.open,
+            "high": state.high,
+            "low": state.low,
+            "close": state.close,
+            "volume": state.volume,
+            "quote_volume": state.quote_volume,
+            "trades_count": state.trades_count,
+            "is_closed": is_closed,
+            "last_trade_time": state.last_trade_time,
+            "last_ingest_ts": state.last_ingest_ts,
+            "ts": int(time.time() * 1000),
+        }
+        if indicators is not None:
+            message["indicators"] = indicators
+        self.kafka.send(topic=Config.CANDLE_TOPIC, value=message, key=symbol)
+        self.emit_count += 1
+        if is_closed:
+            rsi = (indicators or {}).get("rsi")
+            print(
+                f"\n🕯️ [{self.interval}] {symbol} {time.strftime('%H:%M:%S', time.gmtime(state.window_start / 1000))} | "
+                f"O:{state.open} H:{state.high} L:{state.low} C:{state.close} | "
+                f"V:{state.volume:.4f} n:{state.trades_count}"
+                + (f" | RSI:{rsi:.1f}" if rsi is not None else "")
+            )
+
+    def _report_metrics(self):
+        now = time.time()
+        if now - self.last_report_time < 1.0:
+            return
+        self.last_report_time = now
+        lag_ms = int(now * 1000) - self.latest_trade_time
+        print(
+            f"⏱️ 처리: {self.total_count:,} | 전송: {self.emit_count:,} | 지연 체결: {self.late_count} | "
+            f"워터마크 확정: {self.timer_closed:,} | 삭제: {self.evicted:,} | "
+            f"최근 체결 대비 지연: {lag_ms}ms",
+            end="\r",
+        )
+
+    def checkpoint(self):
+        self.kafka.flush()  # 전송 보장 후 오프셋 커밋
+        super().checkpoint()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="aggTrade → 실시간 캔들 (Spark 없이)")
+    parser.add_argument("--interval", default="1m", choices=sorted(INTERVALS_MS, key=INTERVALS_MS.get))
+    parser.add_argument("--from-earliest", action="store_true", help="체크포인트 없을 때 처음부터 읽기")
+    parser.add_argument("--no-indicators", action="store_true", help="확정 봉에 기술적 지표 계산 안 함")
+    args = parser.parse_args()
+
+    processor = CandleProcessor(
+        interval=args.interval,
+        with_indicators=not args.no_indicators,
+        auto_offset_reset="earliest" if args.from_earliest else "latest",
+    )
+    processor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+원본 틱 ClickHouse 적재: binance-trade / binance-depth / binance-bookticker → trades / depth_levels / book_ticker.
+
+- 레코드를 바로 RowBinary로 인코딩해서 테이블별 버퍼에 모음 (JSON/TSV 문자열 변환 없음)
+- FLUSH_ROWS행 또는 FLUSH_INTERVAL_SEC마다 테이블당 INSERT 1번 (ClickHouse는 큰 블록 소수 INSERT가 유리)
+- 체크포인트(오프셋 커밋) 직전에 flush, 실패하면 커밋 안 함 → at-least-once (재시작 시 마지막 커밋부터 다시 적재)
+- depth diff는 가격 레벨 하나당 1행으로 펼침 (depth_levels, 연구용 쿼리가 레벨 단위)
+
+실행: python3 -m processors.clickhouse_tick_loader [--from-earliest]
+스키마: database/clickhouse_schema.sql (trades, depth_levels, book_ticker)
+"""
+import argparse
+import struct
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from common.config import Config
+from processors.base_processor import BaseStreamProcessor
+
+FLUSH_ROWS = 200_000
+FLUSH_INTERVAL_SEC = 2.0
+MAX_BUFFER_BYTES = 256 * 1024 * 1024  # ClickHouse가 계속 실패하면 여기서 멈춤 (메모리 보호)
+
+TRADE_ROW = struct.Struct("<qqQQQddBq")   # trade_time, event_time, agg/first/last id, price, qty, is_buyer_maker, received_at
+DEPTH_ROW = struct.Struct("<qqQQqbdd")    # event_time, transaction_time, U, u, pu(Int64), side, price, qty
+BOOK_ROW = struct.Struct("<Qqqdddd")      # update_id, event_time, transaction_time, bid/bid_qty/ask/ask_qty
+SIDE_BID, SIDE_ASK = 1, 2                 # Enum8('bid' = 1, 'ask' = 2)
+PU_MISSING = -(1 << 63)                   # pu 없는 depthUpdate (spot) → Int64 최솟값 (실제 pu(-1 포함)와 구분)
+
+TABLE_COLUMNS = {
+    "trades": "symbol, trade_time, event_time, agg_trade_id, first_trade_id, last_trade_id, "
+              "price, quantity, is_buyer_maker, received_at",
+    "depth_levels": "symbol, event_time, transaction_time, first_update_id, final_update_id, "
+                    "prev_final_update_id, side, price, quantity",
+    "book_ticker": "symbol, update_id, event_time, transaction_time, bid_price, bid_qty, ask_price, ask_qty",
+}
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+class TableBuffer:
+    __slots__ = ("table", "chunks", "rows", "bytes")
+
+    def __init__(self, table: str):
+        self.table = table
+        self.chunks = []
+        self.rows = 0
+        self.bytes = 0
+
+    def add(self, row: bytes, count: int = 1):
+        self.chunks.append(row)
+        self.rows += count
+        self.bytes += len(row)
+
+    def clear(self):
+        self.chunks = []
+        self.rows = 0
+        self.bytes = 0
+
+
+class ClickHouseTickLoader(BaseStreamProcessor):
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_poll_records", 5000)
+        super().__init__(
+            group_id="clickhouse-tick-loader",
+            topics=["binance-trade", Config.DEPTH_TOPIC, "binance-bookticker"],
+            **kwargs,
+        )
+        self.buffers = {table: TableBuffer(table) for table in TABLE_COLUMNS}
+        self.symbol_bytes = {}  # symbol → RowBinary String (길이 varint + bytes), 심볼마다 한 번만 인코딩
+        self.inserted = {table: 0 for table in TABLE_COLUMNS}
+        self.skipped = 0
+        self.last_flush_time = time.time()
+        self.last_report_time = time.time()
+
+    def encode_state(self, key: str, state) -> list:
+        return state
+
+    def decode_state(self, key: str, data: list):
+        return data
+
+    def _symbol(self, symbol: str) -> bytes:
+        encoded = self.symbol_bytes.get(symbol)
+        if encoded is None:
+            raw = symbol.encode()
+            encoded = self.symbol_bytes[symbol] = _varint(len(raw)) + raw
+        return encoded
+
+    def process_batch(self, tp, records: list):
+        trades, depth, book = self.buffers["trades"], self.buffers["depth_levels"], self.buffers["book_ticker"]
+        for record in records:
+            msg = record.value
+            if not msg:
+                continue
+            data = msg.get("data") or {}
+            event = data.get("e")
+            try:
+                symbol = self._symbol(msg["symbol"])
+                if event == "aggTrade":
+                    trades.add(symbol + TRADE_ROW.pack(
+                        int(data["T"]), int(data["E"]), int(data["a"]), int(data["f"]), int(data["l"]),
+                        float(data["p"]), float(data["q"]), 1 if data["m"] else 0, int(msg.get("ts") or 0),
+                    ))
+                elif event == "depthUpdate":
+                    head = (int(data["E"]), int(data.get("T") or data["E"]),
+                            int(data["U"]), int(data["u"]), int(data["pu"]) if "pu" in data else PU_MISSING)
+                    levels = [symbol + DEPTH_ROW.pack(*head, SIDE_BID, float(p), float(q)) for p, q in data["b"]]
+                    levels += [symbol + DEPTH_ROW.pack(*head, SIDE_ASK, float(p), float(q)) for p, q in data["a"]]
+                    if levels:
+                        depth.add(b"".join(levels), len(levels))
+                elif event == "bookTicker":
+                    book.add(symbol + BOOK_ROW.pack(
+                        int(data["u"]), int(data.get("E") or data["T"]), int(data.get("T") or data["E"]),
+                        float(data["b"]), float(data["B"]), float(data["a"]), float(data["A"]),
+                    ))
+                else:
+                    self.skipped += 1
+            except (KeyError, TypeError, ValueError):
+                self.skipped += 1
+
+    def after_batch(self):
+        now = time.time()
+        if now - self.last_flush_time >= FLUSH_INTERVAL_SEC or any(b.rows >= FLUSH_ROWS for b in self.buffers.values()):
+            if not self.flush() and sum(b.bytes for b in self.buffers.values()) > MAX_BUFFER_BYTES:
+                raise RuntimeError("ClickHouse 적재 실패가 계속되어 버퍼 한도 초과 → 중지 (재시작 시 커밋된 오프셋부터 다시 적재)")
+        self._report_metrics()
+
+    def _insert(self, buffer: TableBuffer):
+        query = f"INSERT INTO {buffer.table} ({TABLE_COLUMNS[buffer.table]}) FORMAT RowBinary"
+        url = f"{Config.CLICKHOUSE_URL}?{urllib.parse.urlencode({'query': query})}"
+        request = urllib.request.Request(url, data=b"".join(buffer.chunks), method="POST")
+        with urllib.request.urlopen(request, timeout=30) as resp:
+            resp.read()
+
+    def flush(self) -> bool:
+        """모든 테이블 버퍼 INSERT. 하나라도 실패하면 False (버퍼 유지 → 다음 flush에서 재시도)"""
+        self.last_flush_time = time.time()
+        ok = True
+        for buffer in self.buffers.values():
+            if not buffer.rows:
+                continue
+            try:
+                self._insert(buffer)
+            except (urllib.error.URLError, OSError) as e:
+                detail = e.read().decode(errors="replace")[:200] if isinstance(e, urllib.error.HTTPError) else e
+                print(f"\n⚠️ ClickHouse {buffer.table} INSERT 실패 ({buffer.rows:,}행): {detail}")
+                ok = False
+                continue
+            self.inserted[buffer.table] += buffer.rows
+            buffer.clear()
+        return ok
+
+    def checkpoint(self):
+        # 버퍼를 다 넣은 뒤에만 오프셋 커밋 (실패하면 이번 체크포인트는 건너뜀)
+        if self.flush():
+            super().checkpoint()
+        else:
+            self.last_checkpoint_time = time.time()
+
+    def _on_revoked(self, revoked):
+        # 버퍼에는 여러 파티션 행이 섞여 있으므로 넘기기 전에 전부 적재
+        if not self.flush():
+            for tp in revoked:
+                self.positions.pop(tp, None)  # 적재 못 한 위치는 저장 안 함 → 새 담당자가 이전 체크포인트부터
+        super()._on_revoked(revoked)
+
+    def _report_metrics(self):
+        now = time.time()
+        if now - self.last_report_time < 1.0:
+            return
+        self.last_report_time = now
+        pending = sum(b.rows for b in self.buffers.values())
+        print(
+            f"⏱️ 처리: {self.total_count:,} | 적재 trades {self.inserted['trades']:,} / "
+            f"depth_levels {self.inserted['depth_levels']:,} / book_ticker {self.inserted['book_ticker']:,} | "
+            f"버퍼 {pending:,}행 | 건너뜀 {self.skipped:,}",
+            end="\r",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="원본 틱(aggTrade/depth/bookTicker) → ClickHouse 적재")
+    parser.add_argument("--from-earliest", action="store_true", help="체크포인트 없을 때 처음부터 읽기")
+    args = parser.parse_args()
+
+    loader = ClickHouseTickLoader(auto_offset_reset="earliest" if args.from_earliest else "latest")
+    loader.run()
+
+
+if __name__ == "__main__":
+    main()
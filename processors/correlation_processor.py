@@ -0,0 +1,184 @@
+"""
+심볼 간 상관/변동성 행렬: binance-candle(1m 봉) → 증분 EW 공분산 → binance-correlation(압축 토픽).
+
+- 봉 시점(window_start)마다 심볼별 마지막 종가를 모으고, 이벤트 시각이 그 봉 끝 + FINALIZE_GRACE_MS를 지나면 확정
+  → 전체 심볼 로그수익률 벡터로 EWCovariance 1회 갱신 (O(N²), common/correlation.py)
+  (체결이 뜸한 심볼은 다음 체결 전까지 봉이 안 닫히므로 is_closed를 기다리지 않고 진행 중 봉의 종가 사용)
+- 확정 후 늦게 온 봉은 버림 (다음 봉 수익률에 포함됨)
+- --publish-every 봉마다 상관계수(int16 위쪽 삼각) + BTCUSDT 대비 beta + 연율화 realized vol 발행
+  key = interval, 압축 토픽이라 새 소비자는 마지막 행렬 1건만 읽으면 됨 (common.correlation.decode_matrix)
+- 행렬 상태는 체크포인트 때 {체크포인트 디렉토리}/matrix.npz로 저장 → 재시작해도 워밍업 다시 안 함
+  확정 안 된 봉 시점(pending)과 watermark도 같은 파일에 저장 (오프셋은 그 봉들을 지나서 커밋되므로 같이 복원해야 안 빠짐)
+
+전체 심볼이 한 행렬에 들어가야 하므로 인스턴스 1개로 실행 (같은 그룹으로 여러 개 띄우면 파티션이 나뉘어 심볼이 빠짐)
+실행: python3 -m processors.correlation_processor [--halflife 60] [--benchmark BTCUSDT]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from common.config import Config
+from common.correlation import EWCovariance, encode_matrix
+from common.kafka_utils import KafkaProducerWrapper
+from processors.base_processor import BaseStreamProcessor
+
+FINALIZE_GRACE_MS = 5_000
+MAX_MESSAGE_BYTES = 1_000_000  # producer 기본 max_request_size(1MB) 안쪽 (심볼 약 800개까지)
+
+
+class CorrelationProcessor(BaseStreamProcessor):
+    def __init__(self, interval: str = "1m", halflife: float = 60.0, min_periods: int = 30,
+                 benchmark: str = "BTCUSDT", publish_every: int = 1, **kwargs):
+        super().__init__(group_id=f"correlation-processor-{interval}", topics=[Config.CANDLE_TOPIC], **kwargs)
+        self.kafka = KafkaProducerWrapper(Config.KAFKA_BOOTSTRAP_SERVERS)
+        self.interval = interval
+        self.interval_ms = self._interval_ms(interval)
+        self.benchmark = benchmark
+        self.publish_every = publish_every
+        self.cov = EWCovariance(halflife=halflife, min_periods=min_periods,
+                                periods_per_year=365 * 86_400_000 / self.interval_ms)
+        self.pending = {}  # window_start → {symbol: close}
+        self.watermark = 0  # 지금까지 본 가장 늦은 체결 시각 (ms)
+        self.matrix_path = os.path.join(self.checkpoint_dir, "matrix.npz")
+        if os.path.exists(self.matrix_path):
+            self._restore_pending(self.cov.load(self.matrix_path))
+            print(f"📂 행렬 상태 복원: 심볼 {len(self.cov.symbols)}개, 갱신 {self.cov.updates:,}회, "
+                  f"대기 봉 시점 {len(self.pending)}")
+        self.late = 0
+        self.update_ms = []
+        self.publish_ms = 0.0
+        self.publish_bytes = 0
+        self.published = 0
+        self.last_report_time = time.time()
+
+    @staticmethod
+    def _interval_ms(interval: str) -> int:
+        units = {"s": 1_000, "m": 60_000, "h": 3_600_000, "d": 86_400_000}
+        return int(interval[:-1]) * units[interval[-1]]
+
+    def _pending_arrays(self) -> dict:
+        """pending/watermark → matrix.npz에 같이 넣을 배열 (봉 시점·심볼·종가를 평평하게)"""
+        rows = [(w, symbol, close) for w, closes in self.pending.items() for symbol, close in closes.items()]
+        return {
+            "pending_window": np.array([r[0] for r in rows], dtype=np.int64),
+            "pending_symbol": np.array([r[1] for r in rows], dtype=str),
+            "pending_close": np.array([r[2] for r in rows], dtype=np.float64),
+            "watermark": np.array([self.watermark], dtype=np.int64),
+        }
+
+    def _restore_pending(self, extra: dict):
+        if "watermark" not in extra:
+            return  # 이전 형식 (행렬만 저장)
+        self.watermark = int(extra["watermark"][0])
+        for w, symbol, close in zip(extra["pending_window"].tolist(), extra["pending_symbol"].tolist(),
+                                    extra["pending_close"].tolist()):
+            self.pending.setdefault(w, {})[symbol] = close
+
+    def encode_state(self, key: str, state) -> list:
+        return state
+
+    def decode_state(self, key: str, data: list):
+        return data
+
+    def process_batch(self, tp, records: list):
+        last_window = self.cov.last_window
+        for record in records:
+            msg = record.value
+            if not msg or msg.get("interval") != self.interval:
+                continue
+            try:
+                window_start = int(msg["window_start"])
+                close = float(msg["close"])
+                symbol = msg["symbol"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if last_window is not None and window_start <= last_window:
+                self.late += 1
+                continue
+            self.pending.setdefault(window_start, {})[symbol] = close
+            self.watermark = max(self.watermark, int(msg.get("last_trade_time") or window_start))
+
+    def after_batch(self):
+        # 봉 끝 + grace를 지난 봉 시점을 오래된 것부터 확정
+        for window_start in sorted(self.pending):
+            if self.watermark < window_start + self.interval_ms + FINALIZE_GRACE_MS:
+                break
+            closes = self.pending.pop(window_start)
+            started = time.perf_counter()
+            self.cov.update(list(closes), list(closes.values()), window_start)
+            self.update_ms.append((time.perf_counter() - started) * 1000)
+            if self.cov.updates % self.publish_every == 0:
+                self._publish(window_start)
+        self._report_metrics()
+
+    def _publish(self, window_start: int):
+        started = time.perf_counter()
+        symbols, corr = self.cov.correlation()
+        vol = self.cov.realized_vol()
+        beta = self.cov.beta(self.benchmark)
+        message = encode_matrix(
+            symbols, corr, vol, beta,
+            interval=self.interval, window_start=window_start, benchmark=self.benchmark,
+            halflife_bars=round(np.log(0.5) / np.log(1.0 - self.cov.alpha), 3), ts=int(time.time() * 1000),
+        )
+        size = len(json.dumps(message))
+        if size > MAX_MESSAGE_BYTES:
+            print(f"\n⚠️ 행렬 메시지 {size / 1e6:.1f}MB > 1MB (심볼 {len(symbols)}개) → 발행 건너뜀")
+            return
+        self.kafka.send(topic=Config.CORRELATION_TOPIC, value=message, key=self.interval)
+        self.publish_ms = (time.perf_counter() - started) * 1000
+        self.publish_bytes = size
+        self.published += 1
+
+        warm = ~np.isnan(vol)
+        if warm.any():
+            top = np.argsort(np.where(warm, vol, -1.0))[::-1][:3]
+            print(f"\n🧮 [{self.interval}] {time.strftime('%H:%M', time.gmtime(window_start / 1000))} | "
+                  f"심볼 {len(symbols)}개 (워밍업 완료 {int(warm.sum())}) | 변동성 상위: " +
+                  ", ".join(f"{symbols[i]} {vol[i]:.0%} (β {beta[i]:.2f})" for i in top))
+
+    def checkpoint(self):
+        self.kafka.flush()
+        if self.cov.updates or self.pending:
+            # 오프셋 커밋 전에 행렬 + 확정 전 봉 시점을 한 파일로 먼저 저장
+            self.cov.save(self.matrix_path, extra=self._pending_arrays())
+        super().checkpoint()
+
+    def _report_metrics(self):
+        now = time.time()
+        if now - self.last_report_time < 1.0:
+            return
+        self.last_report_time = now
+        update_p50 = float(np.median(self.update_ms)) if self.update_ms else 0.0
+        self.update_ms = self.update_ms[-1000:]
+        print(
+            f"⏱️ 처리: {self.total_count:,} | 갱신 {self.cov.updates:,}회 (p50 {update_p50:.2f}ms) | "
+            f"발행 {self.published} ({self.publish_bytes / 1024:.0f}KB, {self.publish_ms:.1f}ms) | "
+            f"대기 봉 시점 {len(self.pending)} | 지연 봉 {self.late}",
+            end="\r",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="1m 봉 → 심볼 간 EW 상관/beta/변동성 행렬")
+    parser.add_argument("--interval", default="1m", help="candle_processor --interval과 같게")
+    parser.add_argument("--halflife", type=float, default=60.0, help="EW 반감기 (봉 수)")
+    parser.add_argument("--min-periods", type=int, default=30, help="이 봉 수 전까지 NaN")
+    parser.add_argument("--benchmark", default="BTCUSDT", help="beta 기준 심볼")
+    parser.add_argument("--publish-every", type=int, default=1, help="N 봉마다 행렬 발행")
+    parser.add_argument("--from-earliest", action="store_true", help="체크포인트 없을 때 처음부터 읽기")
+    args = parser.parse_args()
+
+    processor = CorrelationProcessor(
+        interval=args.interval, halflife=args.halflife, min_periods=args.min_periods,
+        benchmark=args.benchmark, publish_every=args.publish_every,
+        auto_offset_reset="earliest" if args.from_earliest else "latest",
+    )
+    processor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+연쇄 청산(liquidation cascade) 감지: binance-liquidation(forceOrder) → binance-liquidation-alert.
+
+- 심볼 x 방향(SELL=롱 청산, BUY=숏 청산)마다 1초 버킷 60개짜리 링 버퍼
+- 1s/10s/60s 구간 합계를 따로 유지하고, 시간이 지나 빠지는 버킷만 빼줌 → 이벤트당 O(1)
+- 메모리는 심볼당 고정 (버킷 60개 x 2방향), 전체 시장 수백 심볼이어도 일정
+- 청산 이벤트를 처리하는 즉시 임계값 비교 → 배치 끝까지 안 기다리고 바로 알림 전송
+
+실행: python3 -m processors.liquidation_detector [--thresholds 250000,1000000,3000000]
+"""
+import argparse
+import time
+from array import array
+
+from common.config import Config
+from common.kafka_utils import KafkaProducerWrapper
+from processors.base_processor import BaseStreamProcessor
+
+HORIZONS_SEC = (1, 10, 60)
+RING_SIZE = 60  # 가장 긴 구간(60초)만큼 1초 버킷
+DEFAULT_THRESHOLDS = (250_000.0, 1_000_000.0, 3_000_000.0)  # 구간별 청산 금액(USDT) 기준
+REALERT_GROWTH = 1.5  # 같은 구간에서 다시 알림: 직전 알림 금액의 1.5배 이상일 때만
+
+
+class RollingNotional:
+    """1초 버킷 링 버퍼 + 구간별 합계 (구간 경계에서 빠지는 버킷만 빼서 O(1) 갱신)"""
+
+    __slots__ = ("head_sec", "buckets", "sums", "alerted")
+
+    def __init__(self):
+        self.head_sec = 0
+        self.buckets = array("d", [0.0] * RING_SIZE)
+        self.sums = array("d", [0.0] * len(HORIZONS_SEC))
+        self.alerted = array("d", [0.0] * len(HORIZONS_SEC))  # 구간별 마지막 알림 금액 (재알림 억제)
+
+    def _advance(self, sec: int):
+        """head를 sec까지 이동: 각 초마다 구간 밖으로 나가는 버킷을 합계에서 뺌"""
+        if sec - self.head_sec >= RING_SIZE:
+            # 60초 이상 조용했으면 전부 만료
+            for i in range(RING_SIZE):
+                self.buckets[i] = 0.0
+            for i in range(len(HORIZONS_SEC)):
+                self.sums[i] = 0.0
+                self.alerted[i] = 0.0
+            self.head_sec = sec
+            return
+        for s in range(self.head_sec + 1, sec + 1):
+            for i, h in enumerate(HORIZONS_SEC):
+                self.sums[i] = max(0.0, self.sums[i] - self.buckets[(s - h) % RING_SIZE])
+                if self.sums[i] < self.alerted[i] / REALERT_GROWTH:
+                    self.alerted[i] = 0.0  # 충분히 식었으면 다음 급증 때 다시 알림
+            self.buckets[s % RING_SIZE] = 0.0
+        self.head_sec = sec
+
+    def add(self, sec: int, notional: float):
+        if sec > self.head_sec:
+            self._advance(sec)
+        age = self.head_sec - sec
+        if age >= RING_SIZE:
+            return  # 60초보다 늦게 도착한 이벤트는 버림
+        self.buckets[sec % RING_SIZE] += notional
+        for i, h in enumerate(HORIZONS_SEC):
+            if age < h:
+                self.sums[i] += notional
+
+    def to_list(self) -> list:
+        return [self.head_sec, list(self.buckets), list(self.sums), list(self.alerted)]
+
+    @classmethod
+    def from_list(cls, values: list):
+        state = cls()
+        state.head_sec = values[0]
+        state.buckets = array("d", values[1])
+        state.sums = array("d", values[2])
+        state.alerted = array("d", values[3])
+        return state
+
+
+class LiquidationDetector(BaseStreamProcessor):
+    def __init__(self, thresholds=DEFAULT_THRESHOLDS, **kwargs):
+        self.thresholds = thresholds
+        super().__init__(group_id="liquidation-detector", topics=["binance-liquidation"], poll_timeout_ms=10, **kwargs)
+        self.kafka = KafkaProducerWrapper(Config.KAFKA_BOOTSTRAP_SERVERS)
+        self.alert_count = 0
+        self.pending_alerts = 0
+        self.last_report_time = time.time()
+
+    def encode_state(self, key: str, state: RollingNotional) -> list:
+        return state.to_list()
+
+    def decode_state(self, key: str, data: list) -> RollingNotional:
+        return RollingNotional.from_list(data)
+
+    def process_batch(self, tp, records: list):
+        states = self.partition_state(tp)
+        for record in records:
+            msg = record.value
+            if not msg:
+                continue
+            order = msg.get("data", {}).get("o")
+            if not order:
+                continue
+            try:
+                symbol = order["s"]
+                side = order["S"]
+                price = float(order.get("ap") or order["p"])  # 평균 체결가, 없으면 주문가
+                qty = float(order.get("z") or order["q"])     # 누적 체결 수량, 없으면 주문 수량
+                event_ms = int(order.get("T") or msg["data"]["E"])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            key = f"{symbol}|{side}"  # 체크포인트 JSON 키라서 문자열
+            state = states.get(key)
+            if state is None:
+                state = states[key] = RollingNotional()
+            state.add(event_ms // 1000, price * qty)
+            self._check(symbol, side, state, event_ms)
+
+    def _check(self, symbol: str, side: str, state: RollingNotional, event_ms: int):
+        for i, h in enumerate(HORIZONS_SEC):
+            total = state.sums[i]
+            if total < self.thresholds[i] or total < state.alerted[i] * REALERT_GROWTH:
+                continue
+            state.alerted[i] = total
+            now_ms = int(time.time() * 1000)
+            alert = {
+                "symbol": symbol,
+                "side": side,
+                "liquidated": "LONG" if side == "SELL" else "SHORT",
+                "horizon_sec": h,
+                "notional": round(total, 2),
+                "threshold": self.thresholds[i],
+                "event_time": event_ms,
+                "detected_ts": now_ms,
+                "latency_ms": now_ms - event_ms,
+            }
+            self.kafka.send(topic=Config.LIQUIDATION_ALERT_TOPIC, value=alert, key=symbol)
+            self.alert_count += 1
+            self.pending_alerts += 1
+            print(
+                f"\n🚨 연쇄 청산 {symbol} {alert['liquidated']} | {h}s 합계 {total:,.0f} USDT "
+                f"(기준 {self.thresholds[i]:,.0f}) | 감지 지연 {alert['latency_ms']}ms"
+            )
+
+    def after_batch(self):
+        if self.pending_alerts:
+            self.kafka.flush()  # 알림은 linger 기다리지 않고 바로 전송
+            self.pending_alerts = 0
+        now = time.time()
+        if now - self.last_report_time >= 1.0:
+            print(f"⏱️ 청산 이벤트: {self.total_count:,} | 알림: {self.alert_count}", end="\r")
+            self.last_report_time = now
+
+    def checkpoint(self):
+        self.kafka.flush()
+        super().checkpoint()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="forceOrder 연쇄 청산 감지")
+    parser.add_argument(
+        "--thresholds",
+        default=",".join(str(int(t)) for t in DEFAULT_THRESHOLDS),
+        help=f"구간 {list(HORIZONS_SEC)}초별 청산 금액 기준 (USDT, 쉼표 구분)",
+    )
+    args = parser.parse_args()
+    thresholds = tuple(float(t) for t in args.thresholds.split(","))
+    if len(thresholds) != len(HORIZONS_SEC):
+        parser.error(f"기준값은 {len(HORIZONS_SEC)}개 필요")
+
+    LiquidationDetector(thresholds=thresholds).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+심볼별 전체 호가창 유지: binance-depth(diff) + binance-depth-snapshot(압축 스냅샷)으로 바로 시작.
+
+- 체크포인트 없는 파티션: 스냅샷 토픽에서 해당 파티션 심볼의 호가창을 채우고
+  diff 토픽은 스냅샷들의 diff_offset 중 가장 이른 위치 다음부터 읽음 → 콜드 스타트가 심볼 수에 비례 (긴 replay 없음)
+- 스냅샷보다 오래된 diff(u <= last_update_id)는 건너뜀, 연속성이 깨지면(gap) 그 심볼만 diff를 버퍼에 모으고
+  버퍼를 이어 붙일 수 있는 스냅샷이 오면 복구
+- 스냅샷 토픽은 처음 bootstrap 때 1회만 끝까지 읽고(BOOTSTRAP_TIMEOUT_SEC 제한) 그 뒤로는 같은 소비자로
+  새 스냅샷만 기다리지 않고 가져옴 (common.order_book.BookSnapshotTail) → poll 루프가 max.poll.interval.ms 넘게 안 막힘
+- 스냅샷이 없는 심볼(수집기가 아직 발행 전)도 같은 방식으로 첫 스냅샷을 기다림
+
+실행: python3 -m processors.order_book_processor
+다른 소비자에서 호가창만 필요하면 common.order_book.load_book_snapshots / diff_start_offsets 사용
+"""
+import argparse
+import time
+from collections import deque
+
+from common.config import Config
+from common.order_book import BookSnapshotTail, OrderBook, diff_start_offsets
+from processors.base_processor import BaseStreamProcessor
+
+MAX_PENDING_DIFFS = 2000
+BOOTSTRAP_TIMEOUT_SEC = 10.0  # 스냅샷 토픽 첫 읽기 제한 (리밸런스 콜백 안에서 실행됨)
+
+
+class OrderBookProcessor(BaseStreamProcessor):
+    def __init__(self, **kwargs):
+        super().__init__(group_id="order-book-processor", topics=[Config.DEPTH_TOPIC], **kwargs)
+        self.pending = {}  # symbol → (tp, diff 버퍼): 스냅샷 기다리는 심볼
+        self.snapshots = None  # BookSnapshotTail (첫 bootstrap 또는 첫 복구 때 1회 로드)
+        self.tried = {}  # symbol → 마지막으로 복구를 시도한 스냅샷 원본 (같은 스냅샷 재파싱 안 함)
+        self.gaps = 0
+        self.recovered = 0
+        self.latest_event_time = 0
+        self.last_recover_time = time.time()
+        self.last_report_time = time.time()
+
+    def encode_state(self, key: str, state: OrderBook) -> dict:
+        return state.snapshot()
+
+    def decode_state(self, key: str, data: dict) -> OrderBook:
+        return OrderBook.from_snapshot(data)
+
+    def _snapshot_tail(self) -> BookSnapshotTail:
+        """스냅샷 토픽 소비자: 처음 1회만 끝까지 읽고, 이후엔 이미 도착한 새 스냅샷만 반영"""
+        if self.snapshots is None:
+            self.snapshots = BookSnapshotTail()
+            self.snapshots.load(BOOTSTRAP_TIMEOUT_SEC)
+        else:
+            self.snapshots.poll_nowait()
+        return self.snapshots
+
+    def bootstrap_partitions(self, tps: list) -> dict:
+        started = time.time()
+        tail = self._snapshot_tail()
+        snapshots = {symbol: tail.get(symbol) for symbol in tail.latest}
+        result = {}
+        for tp in tps:
+            in_partition = [s for s in snapshots.values() if s.get("diff_partition") == tp.partition]
+            offsets = diff_start_offsets(in_partition)
+            if tp.partition not in offsets:
+                continue  # 스냅샷 없음 → auto_offset_reset 위치부터, 심볼은 첫 스냅샷 대기
+            state = {s["symbol"]: OrderBook.from_snapshot(s) for s in in_partition}
+            result[tp] = (state, offsets[tp.partition])
+        print(f"\n📗 스냅샷 bootstrap: 심볼 {sum(len(s) for s, _ in result.values())}개, "
+              f"파티션 {sorted(tp.partition for tp in result)} ({time.time() - started:.2f}초)")
+        return result
+
+    def _on_revoked(self, revoked):
+        super()._on_revoked(revoked)
+        for symbol in [s for s, (tp, _) in self.pending.items() if tp in revoked]:
+            del self.pending[symbol]
+            self.tried.pop(symbol, None)
+
+    def process_batch(self, tp, records: list):
+        books = self.partition_state(tp)
+        for record in records:
+            msg = record.value
+            if not msg:
+                continue
+            payload = msg.get("data") or {}
+            if payload.get("e") != "depthUpdate":
+                continue
+            symbol = msg.get("symbol")
+            waiting = self.pending.get(symbol)
+            if waiting is not None:
+                waiting[1].append(payload)
+                continue
+            book = books.get(symbol)
+            try:
+                if book is not None and book.apply_diff(payload):
+                    self.latest_event_time = max(self.latest_event_time, book.event_time)
+                    continue
+            except (KeyError, TypeError, ValueError):
+                continue
+            if book is not None:
+                self.gaps += 1
+                print(f"\n⚠️ [{symbol}] depth diff 연속성 깨짐 (last_update_id={book.last_update_id}, "
+                      f"U={payload.get('U')}, pu={payload.get('pu')}) → 스냅샷 대기")
+                del books[symbol]
+            self.pending[symbol] = (tp, deque([payload], maxlen=MAX_PENDING_DIFFS))
+
+    def after_batch(self):
+        now = time.time()
+        if self.pending and now - self.last_recover_time >= 1.0:
+            self.last_recover_time = now
+            self._recover()
+        self._report_metrics()
+
+    def _recover(self):
+        """새로 도착한 스냅샷 반영 → 버퍼 diff가 스냅샷에 이어지는 심볼만 복구 (토픽 전체를 다시 읽지 않음)"""
+        tail = self._snapshot_tail()
+        for symbol in list(self.pending):
+            raw = tail.latest.get(symbol)
+            if raw is None or self.tried.get(symbol) is raw:
+                continue  # 스냅샷 없음 / 이미 시도한 스냅샷 (다음 발행 대기)
+            self.tried[symbol] = raw
+            tp, buffer = self.pending[symbol]
+            book = OrderBook.from_snapshot(tail.get(symbol))
+            if all(book.apply_diff(payload) for payload in buffer):
+                self.partition_state(tp)[symbol] = book
+                del self.pending[symbol]
+                del self.tried[symbol]
+                self.recovered += 1
+                print(f"\n📗 [{symbol}] 스냅샷으로 복구 (last_update_id={book.last_update_id}, 버퍼 diff {len(buffer)}건)")
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            if self.snapshots is not None:
+                self.snapshots.close()
+
+    def _report_metrics(self):
+        now = time.time()
+        if now - self.last_report_time < 1.0:
+            return
+        self.last_report_time = now
+        synced = sum(len(books) for books in self.states.values())
+        lag_ms = int(now * 1000) - self.latest_event_time if self.latest_event_time else 0
+        print(
+            f"⏱️ 처리: {self.total_count:,} | 호가창 {synced}개 | 스냅샷 대기 {len(self.pending)} | "
+            f"gap {self.gaps} / 복구 {self.recovered} | 최근 이벤트 대비 지연: {lag_ms}ms",
+            end="\r",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="depth diff + 압축 스냅샷 → 심볼별 전체 호가창")
+    parser.add_argument("--from-earliest", action="store_true", help="스냅샷/체크포인트 없는 파티션을 처음부터 읽기")
+    args = parser.parse_args()
+
+    processor = OrderBookProcessor(auto_offset_reset="earliest" if args.from_earliest else "latest")
+    processor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -29,14 +29,24 @@ echo "✅ Spark Master 확인 완료"
 echo "  Master: http://localhost:8080"
 echo ""
 
-# Ivy 캐시 디렉토리 준비 (볼륨 마운트 = data/spark-ivy → /opt/spark/.ivy2)
-echo "📦 Ivy 캐시 디렉토리 준비 중..."
-mkdir -p data/spark-ivy/cache data/spark-ivy/jars
-chmod -R 777 data/spark-ivy 2>/dev/null || true
-# 컨테이너 내부에서도 권한 확보 (마운트된 경로)
-docker exec spark-master bash -c "mkdir -p /opt/spark/.ivy2/cache /opt/spark/.ivy2/jars && chmod -R 777 /opt/spark/.ivy2" 2>/dev/null || true
-
-# 인자로 job 선택 (기본: kafka_reader / preprocess: 1분봉 집계 / kline: Binance 1분봉)
+mkdir -p data/archive
+chmod -R 777 data/archive 2>/dev/null || true
+
+# Kafka 커넥터 jar는 이미지에 포함 (infra/spark/Dockerfile) → 의존성 해석 없이 바로 시작
+# 예전 이미지(apache/spark-py 그대로)로 떠 있으면 --packages(Ivy)로 대체
+KAFKA_JAR="/opt/spark/jars/spark-sql-kafka-0-10_2.12-3.3.1.jar"
+if docker exec spark-master test -f "$KAFKA_JAR"; then
+    DEPS_OPT=""
+    echo "📦 Kafka 커넥터: 이미지에 포함된 jar 사용"
+else
+    DEPS_OPT="--packages org.apache.spark:spark-sql-kafka-0-10_2.12:3.3.1"
+    echo "⚠️  이미지에 Kafka 커넥터 jar 없음 → --packages로 해석 (docker-compose build 권장)"
+    mkdir -p data/spark-ivy/cache data/spark-ivy/jars
+    chmod -R 777 data/spark-ivy 2>/dev/null || true
+    docker exec spark-master bash -c "mkdir -p /opt/spark/.ivy2/cache /opt/spark/.ivy2/jars && chmod -R 777 /opt/spark/.ivy2" 2>/dev/null || true
+fi
+
+# 인자로 job 선택 (기본: kafka_reader / preprocess: 1분봉 집계 / kline: Binance 1분봉 / top: 최우선 호가 저지연)
 JOB="${1:-kafka_reader}"
 case "$JOB" in
   preprocess|stream_preprocess)
@@ -47,6 +57,47 @@ case "$JOB" in
     JOB_SCRIPT="kline_console.py"
     echo "🚀 Binance 1분봉(kline_1m) 콘솔 출력 (비교용)..."
     ;;
+  top)
+    # 두 번째 인자: continuous(기본) | fast | 1s
+    JOB_SCRIPT="kafka_reader.py top ${2:-continuous}"
+    echo "🚀 최우선 호가 저지연 Job 시작 (모드: ${2:-continuous}, 지연 리포트는 executor stdout)..."
+    ;;
+  archive)
+    JOB_SCRIPT="parquet_archiver.py"
+    echo "🚀 Parquet 아카이브 Job 시작 (전체 토픽 → data/archive)..."
+    ;;
+  backfill)
+    # 나머지 인자는 그대로 전달 (JSON 오프셋 등 따옴표 포함 인자도 안전하게 escape)
+    JOB_SCRIPT="backfill.py$(printf ' %q' "${@:2}")"
+    echo "🚀 1분봉 backfill 배치 Job 시작 (${*:2})..."
+    ;;
+  indicators)
+    JOB_SCRIPT="indicator_job.py$(printf ' %q' "${@:2}")"
+    echo "🚀 기술적 지표 배치 Job 시작 (1분봉 → EMA/RSI/ATR/VWAP/변동성, ${*:2})..."
+    ;;
+  whale)
+    JOB_SCRIPT="whale_detector.py"
+    echo "🚀 고래 체결 감지 Job 시작 (aggTrade → 콘솔)..."
+    ;;
+  integrity)
+    JOB_SCRIPT="trade_integrity.py"
+    echo "🚀 aggTrade 중복/누락 감시 Job 시작 (gap → binance-trade-gaps)..."
+    ;;
+  trace)
+    # 두 번째 인자: 토픽들 (쉼표 구분, 없으면 depth/trade/kline)
+    JOB_SCRIPT="trace_latency.py ${2:-}"
+    echo "🚀 구간별 지연 리포트 Job 시작 (수집기 trace header → 토픽별 p50/p99)..."
+    ;;
+  host)
+    # 나머지 인자: 실행할 파이프라인 이름 (없으면 전체)
+    JOB_SCRIPT="pipeline_host.py ${*:2}"
+    PIPELINE_NAMES="${*:2}"
+    echo "🚀 Pipeline Host 시작 (한 Spark 앱에서 여러 파이프라인: ${PIPELINE_NAMES:-전체})..."
+    ;;
+  archive-compact)
+    JOB_SCRIPT="parquet_archiver.py compact"
+    echo "🚀 Parquet 아카이브 compaction 1회 실행..."
+    ;;
   *)
     JOB_SCRIPT="kafka_reader.py"
     echo "🚀 Kafka Reader Job 시작 (depth → 콘솔)..."
@@ -56,4 +107,5 @@ echo "  (Ctrl+C로 중지)"
 echo ""
 
 # Spark Job 실행 (log4j 설정으로 불필요한 INFO 로그 제거)
-docker exec -it spark-master bash -c "cd /opt/spark/work-dir && /opt/spark/bin/spark-submit --master spark://spark-master:7077 --packages org.apache.spark:spark-sql-kafka-0-10_2.12:3.3.1 --conf 'spark.driver.extraJavaOptions=-Dlog4j.configuration=file:/opt/spark/work-dir/log4j.properties' --conf 'spark.executor.extraJavaOptions=-Dlog4j.configuration=file:/opt/spark/work-dir/log4j.properties' $JOB_SCRIPT"
\ No newline at end of file
+# JOB_LAUNCH_TS: job이 "시작→첫 배치" 시간을 이 시점 기준으로 출력 (시작 지연 회귀 확인용)
+docker exec -it -e JOB_LAUNCH_TS="$(date +%s.%N)" spark-master bash -c "cd /opt/spark/work-dir && /opt/spark/bin/spark-submit --master spark://spark-master:7077 $DEPS_OPT --conf 'spark.driver.extraJavaOptions=-Dlog4j.configuration=file:/opt/spark/work-dir/log4j.properties' --conf 'spark.executor.extraJavaOptions=-Dlog4j.configuration=file:/opt/spark/work-dir/log4j.properties' $JOB_SCRIPT"
\ No newline at end of file
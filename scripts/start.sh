@@ -44,6 +44,9 @@ if [ "$CLEAN_START" = true ]; then
         docker run --rm -v "$(pwd)/data/clickhouse:/data" alpine sh -c "rm -rf /data/*" 2>/dev/null || rm -rf data/clickhouse/* 2>/dev/null || true
         echo "  ✅ ClickHouse 데이터 삭제"
     fi
+    if [ -d "data/clickhouse-cold" ] && [ "$(ls -A data/clickhouse-cold 2>/dev/null)" ]; then
+        docker run --rm -v "$(pwd)/data/clickhouse-cold:/data" alpine sh -c "rm -rf /data/*" 2>/dev/null || rm -rf data/clickhouse-cold/* 2>/dev/null || true
+    fi
     
     # Spark Ivy 캐시 삭제 (root 소유 가능)
     if [ -d "data/spark-ivy" ] && [ "$(ls -A data/spark-ivy 2>/dev/null)" ]; then
@@ -62,14 +65,15 @@ fi
 # 1. 데이터 디렉터리 준비 (Kafka/ClickHouse/Spark 볼륨이 쓸 수 있도록)
 echo ""
 echo "📁 데이터 디렉터리 준비..."
-mkdir -p data/kafka data/clickhouse data/spark-ivy
-chmod 777 data/kafka data/clickhouse data/spark-ivy 2>/dev/null || true
+mkdir -p data/kafka data/clickhouse data/clickhouse-cold data/spark-ivy data/archive
+chmod 777 data/kafka data/clickhouse data/clickhouse-cold data/spark-ivy data/archive 2>/dev/null || true
 echo "✅ 데이터 디렉터리 준비 완료"
 
 # 2. Docker 서비스 시작
 echo ""
 echo "📦 2단계: Docker 서비스 시작..."
-docker-compose up -d
+# Spark 이미지는 처음 한 번만 빌드 (커넥터 jar 포함), 이후엔 캐시 사용
+docker-compose up -d --build
 echo "✅ Docker 서비스 시작 완료"
 
 # 클린 스타트 시 Spark 체크포인트 삭제 (Kafka 토픽 ID가 바뀌면 Spark가 예전 ID로 요청해 브로커 에러 발생 방지)
@@ -131,12 +135,7 @@ echo ""
 echo "📊 6단계: Spark 상태 확인 및 준비..."
 sleep 5
 
-# Ivy 캐시 디렉토리 준비 (볼륨 마운트로 해결됨)
-# 호스트 디렉토리 생성
-# spark-ivy란 카프카 연결 라이브러리 모음집
-mkdir -p data/spark-ivy 2>/dev/null || true
-# 컨테이너 내부에서 서브디렉토리 생성 (볼륨이 마운트된 후)
-docker exec spark-master bash -c "mkdir -p /opt/spark/.ivy2/cache /opt/spark/.ivy2/jars && chmod -R 777 /opt/spark/.ivy2" 2>/dev/null || true
+# Kafka 커넥터 jar는 Spark 이미지에 포함 (infra/spark/Dockerfile) → Ivy 캐시 준비 불필요
 
 # Spark Master 확인 (로그 기반)
 if docker-compose logs spark-master 2>&1 | grep -q "MasterWebUI.*started"; then
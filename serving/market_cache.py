@@ -0,0 +1,98 @@
+"""
+서빙 API용 in-memory hot cache: 심볼별 최근 N개 봉 + 최우선 호가.
+
+- 봉은 (심볼, interval)마다 deque(maxlen=N) → 오래된 봉은 자동으로 밀려남
+- 진행 중인 봉(is_closed=False)은 같은 window_start 자리를 덮어씀
+- 심볼 단위 LRU (OrderedDict): max_symbols를 넘으면 가장 오래 안 쓰인 심볼부터 제거,
+  idle_ttl_sec 동안 갱신/조회가 없는 심볼도 evict()에서 제거
+- 단일 asyncio 이벤트 루프에서만 접근 (락 없음)
+"""
+import time
+from collections import OrderedDict, deque
+
+CANDLE_FIELDS = (
+    "window_start", "open", "high", "low", "close", "volume", "quote_volume",
+    "trades_count", "is_closed", "indicators", "ts",
+)
+
+
+class SymbolCache:
+    __slots__ = ("bars", "book", "last_access")
+
+    def __init__(self):
+        self.bars = {}  # interval → deque[dict]
+        self.book = None
+        self.last_access = time.monotonic()
+
+
+class MarketDataCache:
+    def __init__(self, max_bars: int = 500, max_symbols: int = 2000, idle_ttl_sec: float = 3600.0):
+        self.max_bars = max_bars
+        self.max_symbols = max_symbols
+        self.idle_ttl_sec = idle_ttl_sec
+        self.symbols = OrderedDict()  # symbol → SymbolCache (LRU 순서)
+        self.evicted = 0
+
+    def _entry(self, symbol: str, create: bool):
+        entry = self.symbols.get(symbol)
+        if entry is None:
+            if not create:
+                return None
+            entry = self.symbols[symbol] = SymbolCache()
+            if len(self.symbols) > self.max_symbols:
+                self.symbols.popitem(last=False)
+                self.evicted += 1
+        else:
+            self.symbols.move_to_end(symbol)
+        entry.last_access = time.monotonic()
+        return entry
+
+    def update_candle(self, candle: dict) -> dict:
+        """candle_processor 메시지 → 캐시 반영. 저장한 봉(dict) 반환"""
+        entry = self._entry(candle["symbol"], create=True)
+        bars = entry.bars.get(candle["interval"])
+        if bars is None:
+            bars = entry.bars[candle["interval"]] = deque(maxlen=self.max_bars)
+        bar = {name: candle.get(name) for name in CANDLE_FIELDS}
+        window_start = bar["window_start"]
+        if not bars or window_start > bars[-1]["window_start"]:
+            bars.append(bar)
+        else:
+            # 같은 봉 갱신(대부분 마지막 봉) 또는 늦게 온 확정 봉 → 뒤에서부터 찾아 교체
+            for i in range(len(bars) - 1, -1, -1):
+                if bars[i]["window_start"] == window_start:
+                    bars[i] = bar
+                    break
+                if bars[i]["window_start"] < window_start:
+                    break  # 캐시에 없는 과거 봉 (이미 밀려남) → 무시
+        return bar
+
+    def update_book(self, symbol: str, book: dict):
+        self._entry(symbol, create=True).book = book
+
+    def get_bars(self, symbol: str, interval: str, limit: int):
+        """최근 limit개 봉 (오래된 → 최신). 캐시에 limit개가 없으면 None (ClickHouse fallback)"""
+        entry = self._entry(symbol, create=False)
+        if entry is None:
+            return None
+        bars = entry.bars.get(interval)
+        if bars is None or len(bars) < limit:
+            return None
+        return list(bars)[-limit:]
+
+    def get_book(self, symbol: str):
+        entry = self._entry(symbol, create=False)
+        return entry.book if entry else None
+
+    def evict(self) -> int:
+        """idle_ttl_sec 동안 안 쓰인 심볼 제거 (LRU 앞쪽부터 보다가 최근 것을 만나면 중단)"""
+        deadline = time.monotonic() - self.idle_ttl_sec
+        removed = 0
+        while self.symbols:
+            symbol, entry = next(iter(self.symbols.items()))
+            if entry.last_access >= deadline:
+                break
+            del self.symbols[symbol]
+            removed += 1
+        self.evicted += removed
+        return removed
@@ -0,0 +1,353 @@
+"""
+시장 데이터 서빙 API (asyncio + aiohttp): Kafka → in-memory hot cache → REST / WebSocket.
+
+- binance-candle(candle_processor 출력) / binance-bookticker 구독 → 심볼별 최근 N개 봉 + 최우선 호가 캐시
+  (depth diff는 바뀐 레벨만 담고 있어서 최우선 호가로 쓰지 않음)
+- REST
+    GET /candles/{symbol}?interval=1m&limit=100   최근 봉 (캐시에 부족하면 ClickHouse candles 테이블 조회)
+    GET /book/{symbol}                            최우선 호가
+    GET /symbols, GET /health
+- WebSocket /ws
+    → {"op": "subscribe", "channels": ["candle:BTCUSDT:1m", "book:BTCUSDT"]}  (unsubscribe 동일)
+    ← 구독 직후 현재 값 1건 + 이후 갱신마다 push
+- fan-out: 갱신 1건을 JSON → WebSocket 텍스트 프레임(bytes)까지 한 번만 만들고, 구독자 transport에 같은 bytes를 write
+  (구독자마다 직렬화/프레이밍/코루틴 전환 없음, 이벤트 루프 안에서 동기 write라 프레임이 섞이지 않음)
+  구독자가 없는 채널은 직렬화 자체를 건너뜀
+- 느린 구독자: 소켓 송신 버퍼가 MAX_WRITE_BUFFER를 넘으면 그 구독자에게만 메시지를 버림 (다른 구독자/Kafka 소비는 안 막힘)
+- Kafka 소비는 별도 스레드(kafka-python)에서 poll + JSON 파싱 → poll 단위로 이벤트 루프에 넘김
+
+- scale-out: --workers N → 같은 포트(SO_REUSEPORT)로 프로세스 N개, 커널이 연결을 나눠 줌
+  (프로세스마다 Kafka 전체를 읽고 자기 캐시를 가짐 → 구독자 fan-out write가 코어 수만큼 분산)
+
+실행: python3 -m serving.market_data_api [--port 8000] [--max-bars 500] [--workers 4]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import re
+import threading
+import struct
+import time
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, WSMsgType, web
+from kafka import KafkaConsumer
+
+from common.config import Config
+from serving.market_cache import MarketDataCache
+
+INTERVALS = ("1s", "5s", "15s", "1m", "5m")  # processors/candle_processor.py INTERVALS_MS와 동일
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9]{2,30}$")
+MAX_LIMIT = 1000
+MAX_WRITE_BUFFER = 1 << 20  # 구독자별 미전송 바이트 한도 (넘으면 drop)
+EVICT_INTERVAL_SEC = 60.0
+
+
+def text_frame(value) -> bytes:
+    """JSON 직렬화 + 서버→클라이언트 WebSocket 텍스트 프레임 (FIN, 마스크/압축 없음, RFC 6455)"""
+    payload = json.dumps(value, separators=(",", ":")).encode()
+    size = len(payload)
+    if size < 126:
+        header = struct.pack("!BB", 0x81, size)
+    elif size < 65536:
+        header = struct.pack("!BBH", 0x81, 126, size)
+    else:
+        header = struct.pack("!BBQ", 0x81, 127, size)
+    return header + payload
+
+
+class Subscriber:
+    """WebSocket 클라이언트 1개: 미리 만든 프레임을 transport에 바로 write"""
+
+    __slots__ = ("ws", "transport", "channels", "dropped")
+
+    def __init__(self, ws: web.WebSocketResponse, transport):
+        self.ws = ws
+        self.transport = transport
+        self.channels = set()
+        self.dropped = 0
+
+    def send(self, frame: bytes) -> bool:
+        transport = self.transport
+        if transport is None or transport.is_closing():
+            return False
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.dropped += 1  # 못 따라오는 구독자 → 이 메시지는 건너뜀
+            return False
+        transport.write(frame)
+        return True
+
+
+class MarketDataServer:
+    def __init__(self, max_bars: int = 500, max_symbols: int = 2000, consume_kafka: bool = True):
+        self.cache = MarketDataCache(max_bars=max_bars, max_symbols=max_symbols)
+        self.consume_kafka = consume_kafka
+        self.channels = {}  # channel → set[Subscriber]
+        self.subscribers = set()
+        self.published = 0
+        self.delivered = 0
+        self.fallback_count = 0
+        self.running = True
+        self.loop = None
+        self.http = None
+        self.evict_task = None
+
+    # ------------------------------------------------------------------ app
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/candles/{symbol}", self.handle_candles)
+        app.router.add_get("/book/{symbol}", self.handle_book)
+        app.router.add_get("/symbols", self.handle_symbols)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/ws", self.handle_ws)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app):
+        self.loop = asyncio.get_running_loop()
+        self.http = ClientSession(timeout=ClientTimeout(total=2))
+        if self.consume_kafka:
+            threading.Thread(target=self._consume, name="kafka-consumer", daemon=True).start()
+        self.evict_task = asyncio.create_task(self._evict_loop())
+
+    async def _on_cleanup(self, app):
+        self.running = False
+        self.evict_task.cancel()
+        for sub in list(self.subscribers):
+            await sub.ws.close()
+        await self.http.close()
+
+    async def _evict_loop(self):
+        while True:
+            await asyncio.sleep(EVICT_INTERVAL_SEC)
+            removed = self.cache.evict()
+            if removed:
+                print(f"🧹 캐시 정리: idle 심볼 {removed}개 제거 (남은 심볼 {len(self.cache.symbols)})")
+
+    # ---------------------------------------------------------------- Kafka
+    def _consume(self):
+        """별도 스레드: poll + JSON 파싱까지 하고 poll 단위로 이벤트 루프에 넘김"""
+        consumer = KafkaConsumer(
+            Config.CANDLE_TOPIC, Config.BOOK_TICKER_TOPIC,
+            bootstrap_servers=Config.KAFKA_BOOTSTRAP_SERVERS,
+            group_id=None,  # 인스턴스마다 전체 파티션을 읽음 (캐시는 인스턴스별)
+            auto_offset_reset="latest",
+            enable_auto_commit=False,
+            fetch_max_wait_ms=10,
+        )
+        print(f"📥 Kafka 구독: {Config.CANDLE_TOPIC}, {Config.BOOK_TICKER_TOPIC}")
+        while self.running:
+            polled = consumer.poll(timeout_ms=100, max_records=2000)
+            batch = []
+            for records in polled.values():
+                for record in records:
+                    try:
+                        batch.append((record.topic, json.loads(record.value)))
+                    except (TypeError, ValueError):
+                        continue
+            if batch:
+                self.loop.call_soon_threadsafe(self.apply_batch, batch)
+        consumer.close()
+
+    def apply_batch(self, batch: list):
+        for topic, value in batch:
+            if topic == Config.CANDLE_TOPIC:
+                self.on_candle(value)
+            else:
+                self.on_book_ticker(value)
+
+    def on_candle(self, candle: dict):
+        symbol = candle.get("symbol")
+        interval = candle.get("interval")
+        if not symbol or not interval or "window_start" not in candle:
+            return
+        bar = self.cache.update_candle(candle)
+        self.publish(f"candle:{symbol}:{interval}", lambda: {"type": "candle", "symbol": symbol, "interval": interval, **bar})
+
+    def on_book_ticker(self, msg: dict):
+        """bookTicker 메시지 → 최우선 호가 (거래소가 계산한 실제 best bid/ask)"""
+        symbol = msg.get("symbol")
+        data = msg.get("data") or {}
+        if not symbol or data.get("e") != "bookTicker":
+            return
+        try:
+            book = {
+                "symbol": symbol,
+                "bid_price": float(data["b"]), "bid_qty": float(data["B"]),
+                "ask_price": float(data["a"]), "ask_qty": float(data["A"]),
+                "event_time": data.get("E"),
+                "ts": msg.get("ts"),
+            }
+        except (KeyError, IndexError, TypeError, ValueError):
+            return
+        self.cache.update_book(symbol, book)
+        self.publish(f"book:{symbol}", lambda: {"type": "book", **book})
+
+    # -------------------------------------------------------------- fan-out
+    def publish(self, channel: str, build):
+        """구독자가 있을 때만 메시지를 만들고, 한 번 만든 프레임을 모든 구독자에게 그대로 write"""
+        subs = self.channels.get(channel)
+        if not subs:
+            return
+        frame = text_frame(build())
+        delivered = 0
+        for sub in subs:
+            delivered += sub.send(frame)
+        self.published += 1
+        self.delivered += delivered
+
+    def _subscribe(self, sub: Subscriber, channel: str):
+        self.channels.setdefault(channel, set()).add(sub)
+        sub.channels.add(channel)
+        snapshot = self._snapshot(channel)
+        if snapshot is not None:
+            sub.send(text_frame(snapshot))
+
+    def _unsubscribe(self, sub: Subscriber, channel: str):
+        subs = self.channels.get(channel)
+        if subs:
+            subs.discard(sub)
+            if not subs:
+                del self.channels[channel]
+        sub.channels.discard(channel)
+
+    def _snapshot(self, channel: str):
+        parts = channel.split(":")
+        if parts[0] == "book" and len(parts) == 2:
+            book = self.cache.get_book(parts[1])
+            return {"type": "book", **book} if book else None
+        if parts[0] == "candle" and len(parts) == 3:
+            bars = self.cache.get_bars(parts[1], parts[2], 1)
+            return {"type": "candle", "symbol": parts[1], "interval": parts[2], **bars[0]} if bars else None
+        return None
+
+    async def handle_ws(self, request):
+        ws = web.WebSocketResponse(heartbeat=30, compress=False)  # 압축하면 미리 만든 프레임을 못 씀
+        await ws.prepare(request)
+        sub = Subscriber(ws, request.transport)
+        self.subscribers.add(sub)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    req = json.loads(msg.data)
+                    op = req["op"]
+                    channels = [str(c) for c in req.get("channels", [])]
+                except (ValueError, KeyError, TypeError):
+                    sub.send(text_frame({"type": "error", "message": "invalid request"}))
+                    continue
+                for channel in channels:
+                    if op == "subscribe":
+                        self._subscribe(sub, channel)
+                    elif op == "unsubscribe":
+                        self._unsubscribe(sub, channel)
+        finally:
+            for channel in list(sub.channels):
+                self._unsubscribe(sub, channel)
+            self.subscribers.discard(sub)
+        return ws
+
+    # ----------------------------------------------------------------- REST
+    async def handle_candles(self, request):
+        symbol = request.match_info["symbol"].upper()
+        interval = request.query.get("interval", "1m")
+        try:
+            limit = min(int(request.query.get("limit", 100)), MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if not SYMBOL_PATTERN.match(symbol) or interval not in INTERVALS or limit <= 0:
+            raise web.HTTPBadRequest(text="invalid symbol / interval / limit")
+
+        bars = self.cache.get_bars(symbol, interval, limit)
+        source = "cache"
+        if bars is None:
+            bars = await self._candles_from_clickhouse(symbol, interval, limit)
+            source = "clickhouse"
+            if bars is None:
+                raise web.HTTPServiceUnavailable(text="cache miss and ClickHouse unavailable")
+        return web.json_response({"symbol": symbol, "interval": interval, "source": source, "bars": bars})
+
+    async def _candles_from_clickhouse(self, symbol: str, interval: str, limit: int):
+        """캐시 miss → ClickHouse candles 테이블 (database/clickhouse_schema.sql, 파라미터 바인딩)"""
+        self.fallback_count += 1
+        query = (
+            "SELECT toUnixTimestamp64Milli(window_start) AS window_start, open, high, low, close, volume, quote_volume, trades_count "
+            "FROM candles FINAL WHERE symbol = {symbol:String} AND interval = {interval:String} "
+            "ORDER BY window_start DESC LIMIT {limit:UInt32} FORMAT JSONEachRow"
+        )
+        params = {"query": query, "param_symbol": symbol, "param_interval": interval, "param_limit": str(limit),
+                  "output_format_json_quote_64bit_integers": "0"}
+        try:
+            async with self.http.get(Config.CLICKHOUSE_URL, params=params) as resp:
+                if resp.status != 200:
+                    print(f"⚠️ ClickHouse 조회 실패 ({resp.status}): {(await resp.text())[:200]}")
+                    return None
+                text = await resp.text()
+        except (ClientError, asyncio.TimeoutError) as e:
+            print(f"⚠️ ClickHouse 연결 실패: {e}")
+            return None
+        rows = [json.loads(line) for line in text.splitlines() if line]
+        for row in rows:
+            row["is_closed"] = True
+        rows.reverse()  # 오래된 → 최신 (캐시 응답과 같은 순서)
+        return rows
+
+    async def handle_book(self, request):
+        book = self.cache.get_book(request.match_info["symbol"].upper())
+        if book is None:
+            raise web.HTTPNotFound(text="no book for symbol")
+        return web.json_response(book)
+
+    async def handle_symbols(self, request):
+        return web.json_response(sorted(self.cache.symbols))
+
+    async def handle_health(self, request):
+        return web.json_response({
+            "symbols": len(self.cache.symbols),
+            "evicted": self.cache.evicted,
+            "subscribers": len(self.subscribers),
+            "channels": len(self.channels),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": sum(sub.dropped for sub in self.subscribers),
+            "clickhouse_fallbacks": self.fallback_count,
+            "ts": int(time.time() * 1000),
+        })
+
+
+def serve(host: str, port: int, max_bars: int, max_symbols: int, reuse_port: bool = False):
+    server = MarketDataServer(max_bars=max_bars, max_symbols=max_symbols)
+    web.run_app(server.build_app(), host=host, port=port, reuse_port=reuse_port, print=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시장 데이터 서빙 API (REST + WebSocket)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-bars", type=int, default=500, help="심볼/interval당 캐시할 봉 수")
+    parser.add_argument("--max-symbols", type=int, default=2000, help="캐시할 최대 심볼 수 (LRU)")
+    parser.add_argument("--workers", type=int, default=1, help="같은 포트를 공유하는 프로세스 수 (SO_REUSEPORT)")
+    args = parser.parse_args()
+
+    print(f"🚀 서빙 API 시작: http://{args.host}:{args.port} (ws: /ws, workers={args.workers})")
+    if args.workers == 1:
+        serve(args.host, args.port, args.max_bars, args.max_symbols)
+        return
+    workers = [
+        mp.Process(target=serve, args=(args.host, args.port, args.max_bars, args.max_symbols, True))
+        for _ in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+
+if __name__ == "__main__":
+    main()
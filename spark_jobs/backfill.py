@@ -0,0 +1,165 @@
+"""
+1분봉 배치 backfill: 스트리밍 job과 같은 parse_trade_data / agg_trade_to_1m_ohlcv를
+유한 구간(오프셋 / 시간 / Parquet 아카이브)에 배치로 돌려서 다시 만든다.
+
+버그 수정 후 startingOffsets=earliest 스트리밍(트리거당 1,000개)으로 재생하던 것을
+클러스터 전체 코어로 한 번에 처리 → 하루치 aggTrade를 몇 분 안에 재계산.
+
+- 입력
+  --source kafka   --start/--end (시간) 또는 --start-offsets/--end-offsets (JSON)
+  --source archive --start/--end  (parquet_archiver.py가 쌓은 topic=binance-trade)
+  (오프셋 구간은 시간 경계와 안 맞으므로 Kafka 파티션별 처음/마지막 체결이 속한 hour는 버리고
+   그 사이의 꽉 찬 hour만 사용 → 이미 저장된 양 끝 hour 봉을 일부 봉으로 덮어쓰지 않음.
+   파티션별 체결 시각 범위를 구하느라 Kafka 구간을 두 번 읽음)
+- 출력: {ARCHIVE_ROOT}/candles_1m/symbol=/date=/hour= 에 dynamic partition overwrite
+  → 처리 구간을 시간(hour) 단위로 맞추므로 같은 구간을 몇 번 돌려도 결과 동일 (멱등)
+
+실행 예:
+  ./scripts/start-spark-job.sh backfill --source kafka --start 2026-02-11T00:00 --end 2026-02-12T00:00
+  ./scripts/start-spark-job.sh backfill --source archive --start 2026-02-01 --end 2026-02-08 --symbols BTCUSDT,ETHUSDT
+  ./scripts/start-spark-job.sh backfill --source kafka --start-offsets '{"binance-trade":{"0":0,"1":0,"2":0}}' --end-offsets latest
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+from pyspark.sql.functions import col, date_format, get_json_object, hour, lit, max as spark_max, min as spark_min
+from kafka_reader import KAFKA_BOOTSTRAP, create_spark_session, parse_trade_data
+from stream_preprocess import agg_trade_to_1m_ohlcv
+
+ARCHIVE_ROOT = os.getenv("ARCHIVE_ROOT", "/data/archive")
+CANDLE_TABLE_PATH = f"{ARCHIVE_ROOT}/candles_1m"
+TRADE_TOPIC = "binance-trade"
+HOUR_MS = 60 * 60 * 1000
+KAFKA_SLACK_MS = 60 * 1000  # Kafka timestamp(수집 시각)는 체결 시각보다 늦으므로 앞뒤로 여유 있게 읽고 체결 시각으로 자름
+
+
+def parse_time_ms(value: str) -> int:
+    """'2026-02-11', '2026-02-11T03:00' (UTC) 또는 epoch ms"""
+    if value.isdigit():
+        return int(value)
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def read_trades_from_kafka(spark, args, start_ms, end_ms):
+    """Kafka 배치 읽기. minPartitions로 오프셋 구간을 쪼개서 코어 수보다 많은 task로 병렬 처리"""
+    reader = spark.read \
+        .format("kafka") \
+        .option("kafka.bootstrap.servers", KAFKA_BOOTSTRAP) \
+        .option("subscribe", TRADE_TOPIC) \
+        .option("minPartitions", str(spark.sparkContext.defaultParallelism * 4)) \
+        .option("failOnDataLoss", "false")
+    if args.start_offsets:
+        reader = reader.option("startingOffsets", args.start_offsets) \
+            .option("endingOffsets", args.end_offsets or "latest")
+        return parse_trade_data(clip_to_full_hours(reader.load()))
+    reader = reader.option("startingTimestamp", str(start_ms - KAFKA_SLACK_MS)) \
+        .option("endingTimestamp", str(end_ms + KAFKA_SLACK_MS))
+    return parse_trade_data(reader.load())
+
+
+def clip_to_full_hours(raw_df):
+    """
+    오프셋 구간 Kafka 레코드 → 파티션별 [첫 체결 hour 다음 정각, 마지막 체결 hour 정각) 안의 체결만.
+    심볼 key라 한 심볼은 한 파티션에만 있으므로 남은 hour는 그 심볼의 체결이 전부 들어 있음
+    """
+    trade_ms = get_json_object(col("value").cast("string"), "$.data.T").cast("long")
+    with_time = raw_df.withColumn("trade_ms", trade_ms)
+    bounds = with_time.groupBy("partition").agg(spark_min("trade_ms").alias("lo"), spark_max("trade_ms").alias("hi"))
+    condition = lit(False)
+    for row in bounds.collect():
+        if row.lo is None:
+            continue
+        first_hour = -(-row.lo // HOUR_MS) * HOUR_MS
+        last_hour = row.hi // HOUR_MS * HOUR_MS
+        if first_hour >= last_hour:
+            print(f"⚠️ 파티션 {row.partition}: 꽉 찬 hour 없음 (체결 {row.lo} ~ {row.hi}) → 건너뜀")
+            continue
+        print(f"   파티션 {row.partition}: {time.strftime('%Y-%m-%d %H:00', time.gmtime(first_hour / 1000))} ~ "
+              f"{time.strftime('%Y-%m-%d %H:00', time.gmtime(last_hour / 1000))} UTC")
+        condition = condition | ((col("partition") == row.partition) &
+                                 (col("trade_ms") >= first_hour) & (col("trade_ms") < last_hour))
+    return with_time.where(condition)
+
+
+def read_trades_from_archive(spark, start_ms, end_ms):
+    """Parquet 아카이브: date 파티션 pruning + 필요한 컬럼만 읽음"""
+    start_date = time.strftime("%Y-%m-%d", time.gmtime(start_ms / 1000))
+    end_date = time.strftime("%Y-%m-%d", time.gmtime(end_ms / 1000))
+    return spark.read.parquet(f"{ARCHIVE_ROOT}/topic={TRADE_TOPIC}") \
+        .where((col("date") >= start_date) & (col("date") <= end_date)) \
+        .select("symbol", "price", "quantity", "event_time_sec", "is_buyer_maker", "agg_trade_id")
+
+
+def write_candles(ohlcv_df, sink: str):
+    """시간(hour) 파티션 단위 overwrite → 재실행해도 중복 없음"""
+    with_parts = ohlcv_df \
+        .withColumn("date", date_format(col("window_start"), "yyyy-MM-dd")) \
+        .withColumn("hour", hour(col("window_start")))
+    if sink == "console":
+        with_parts.orderBy("symbol", "window_start").show(100, truncate=False)
+        return
+    with_parts.repartition("symbol", "date", "hour") \
+        .sortWithinPartitions("window_start") \
+        .write \
+        .mode("overwrite") \
+        .option("partitionOverwriteMode", "dynamic") \
+        .option("compression", "zstd") \
+        .partitionBy("symbol", "date", "hour") \
+        .parquet(CANDLE_TABLE_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="aggTrade → 1분봉 배치 backfill")
+    parser.add_argument("--source", choices=["kafka", "archive"], default="kafka")
+    parser.add_argument("--start", help="시작 시각 (UTC ISO 또는 epoch ms, 시간 단위로 내림)")
+    parser.add_argument("--end", help="끝 시각 (UTC ISO 또는 epoch ms, 시간 단위로 올림, 미포함)")
+    parser.add_argument("--start-offsets", help="Kafka startingOffsets JSON (시간 대신 오프셋 구간)")
+    parser.add_argument("--end-offsets", help="Kafka endingOffsets JSON 또는 latest")
+    parser.add_argument("--symbols", help="쉼표 구분 심볼 (기본: 전체)")
+    parser.add_argument("--sink", choices=["parquet", "console"], default="parquet")
+    args = parser.parse_args()
+
+    if args.start_offsets and args.source != "kafka":
+        parser.error("--start-offsets는 --source kafka에서만 사용")
+    if not args.start_offsets and not (args.start and args.end):
+        parser.error("--start/--end 또는 --start-offsets 필요")
+
+    spark = create_spark_session("Backfill-1mOHLCV")
+    spark.conf.set("spark.sql.session.timeZone", "UTC")
+    # 스트리밍 기본값(200) 대신 클러스터 코어 수에 맞춘 셔플 파티션
+    spark.conf.set("spark.sql.shuffle.partitions", str(spark.sparkContext.defaultParallelism * 2))
+
+    started = time.time()
+    if args.start_offsets:
+        start_ms = end_ms = None
+        trades = read_trades_from_kafka(spark, args, None, None)
+    else:
+        # 시간 단위로 맞춰야 hour 파티션 overwrite가 구간 밖 봉을 지우지 않음
+        start_ms = parse_time_ms(args.start) // HOUR_MS * HOUR_MS
+        end_ms = -(-parse_time_ms(args.end) // HOUR_MS) * HOUR_MS
+        if args.source == "kafka":
+            trades = read_trades_from_kafka(spark, args, start_ms, end_ms)
+        else:
+            trades = read_trades_from_archive(spark, start_ms, end_ms)
+        trades = trades.where(
+            (col("event_time_sec") >= start_ms / 1000) & (col("event_time_sec") < end_ms / 1000)
+        )
+
+    if args.symbols:
+        trades = trades.where(col("symbol").isin([s.strip().upper() for s in args.symbols.split(",")]))
+
+    # 배치라 watermark 없이 정확히 중복 제거 (스트리밍 1분봉과 같은 기준)
+    ohlcv_1m = agg_trade_to_1m_ohlcv(trades.dropDuplicates(["symbol", "agg_trade_id"]))
+    print(f"🚀 backfill 시작 | source={args.source} | "
+          f"구간={args.start_offsets or f'{args.start} ~ {args.end}'} | sink={args.sink}")
+    write_candles(ohlcv_1m, args.sink)
+    print(f"✅ backfill 완료 ({time.time() - started:.1f}초) → {CANDLE_TABLE_PATH if args.sink == 'parquet' else 'console'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+1분봉 → 기술적 지표(EMA/RSI/ATR/rolling VWAP/realized vol) 배치 계산.
+
+- 입력: agg_trade_to_1m_ohlcv 결과
+  --source candles  backfill.py가 쌓은 {ARCHIVE_ROOT}/candles_1m (기본)
+  --source archive  Parquet 아카이브 aggTrade → agg_trade_to_1m_ohlcv 바로 계산
+- 계산: mapInPandas (Arrow 배치 단위 pandas UDF) 안에서 common/indicators.py의 IndicatorEngine 사용
+  → Python candle_processor와 같은 엔진이라 두 경로 지표 값이 같음
+  심볼로 repartition + 시간순 정렬 → 파티션 안에서 같은 분(minute)의 심볼들을 한 번에 벡터 갱신 (봉당 O(1))
+- 출력: {ARCHIVE_ROOT}/indicators_1m/symbol=/date=/hour= 에 dynamic partition overwrite (멱등)
+- 지표는 과거 봉이 필요하므로 --warmup-hours 만큼 앞에서부터 계산하고 결과에서는 잘라냄
+
+실행 예:
+  ./scripts/start-spark-job.sh indicators --start 2026-02-11 --end 2026-02-12
+  ./scripts/start-spark-job.sh indicators --source archive --start 2026-02-01 --end 2026-02-08 --symbols BTCUSDT,ETHUSDT
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+from pyspark.sql.functions import col, date_format, hour
+from pyspark.sql.types import DoubleType, StructField
+from kafka_reader import create_spark_session
+from backfill import ARCHIVE_ROOT, CANDLE_TABLE_PATH, HOUR_MS, parse_time_ms, read_trades_from_archive
+from stream_preprocess import agg_trade_to_1m_ohlcv
+
+# common/은 spark-master에 /opt/spark/common으로 마운트 (docker-compose.yml)
+# executor에는 addPyFile로 indicators.py만 배포 → driver/executor 모두 `indicators` 모듈로 import
+COMMON_DIR = os.getenv("COMMON_DIR", "/opt/spark/common")
+sys.path.insert(0, COMMON_DIR)
+from indicators import INDICATOR_COLUMNS, IndicatorEngine  # noqa: E402
+
+INDICATOR_TABLE_PATH = f"{ARCHIVE_ROOT}/indicators_1m"
+CANDLE_COLUMNS = ["window_start", "symbol", "open", "high", "low", "close", "volume", "trades_count"]
+
+
+def compute_indicators(batches):
+    """
+    mapInPandas 함수: 파티션(심볼 묶음, 시간순 정렬)의 Arrow 배치를 차례로 받아 지표 컬럼 추가.
+    엔진 상태는 파티션 전체에서 유지 → 배치 경계에서 끊기지 않음
+    """
+    engine = IndicatorEngine()
+    for pdf in batches:
+        if pdf.empty:
+            continue
+        parts = []
+        for _, minute in pdf.groupby("window_start", sort=True):
+            values = engine.update(
+                minute["symbol"].to_numpy(),
+                minute["high"].to_numpy(),
+                minute["low"].to_numpy(),
+                minute["close"].to_numpy(),
+                minute["volume"].to_numpy(),
+            )
+            parts.append(minute.assign(**values))
+        yield pd.concat(parts, ignore_index=True)
+
+
+def with_indicators(ohlcv_df):
+    """agg_trade_to_1m_ohlcv 결과 DataFrame → 지표 컬럼이 붙은 DataFrame (배치 전용)"""
+    schema = ohlcv_df.select(*CANDLE_COLUMNS).schema
+    for name in INDICATOR_COLUMNS:
+        schema = schema.add(StructField(name, DoubleType(), True))
+    return ohlcv_df.select(*CANDLE_COLUMNS) \
+        .repartition("symbol") \
+        .sortWithinPartitions("window_start") \
+        .mapInPandas(compute_indicators, schema)
+
+
+def read_candles(spark, args, start_ms, end_ms):
+    if args.source == "archive":
+        trades = read_trades_from_archive(spark, start_ms, end_ms).where(
+            (col("event_time_sec") >= start_ms / 1000) & (col("event_time_sec") < end_ms / 1000)
+        )
+        if args.symbols:
+            trades = trades.where(col("symbol").isin(args.symbols))
+        return agg_trade_to_1m_ohlcv(trades)
+
+    start_date = time.strftime("%Y-%m-%d", time.gmtime(start_ms / 1000))
+    end_date = time.strftime("%Y-%m-%d", time.gmtime(end_ms / 1000))
+    candles = spark.read.parquet(CANDLE_TABLE_PATH) \
+        .where((col("date") >= start_date) & (col("date") <= end_date))
+    if args.symbols:
+        candles = candles.where(col("symbol").isin(args.symbols))
+    return candles.where(
+        (col("window_start").cast("long") >= start_ms // 1000) & (col("window_start").cast("long") < end_ms // 1000)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="1분봉 → 기술적 지표 배치 계산")
+    parser.add_argument("--source", choices=["candles", "archive"], default="candles")
+    parser.add_argument("--start", required=True, help="시작 시각 (UTC ISO 또는 epoch ms, 시간 단위로 내림)")
+    parser.add_argument("--end", required=True, help="끝 시각 (UTC ISO 또는 epoch ms, 시간 단위로 올림, 미포함)")
+    parser.add_argument("--warmup-hours", type=int, default=6, help="지표 워밍업용으로 앞에서 더 읽을 시간")
+    parser.add_argument("--symbols", help="쉼표 구분 심볼 (기본: 전체)")
+    parser.add_argument("--sink", choices=["parquet", "console"], default="parquet")
+    args = parser.parse_args()
+    if args.symbols:
+        args.symbols = [s.strip().upper() for s in args.symbols.split(",")]
+
+    spark = create_spark_session("Indicators-1m", extra_conf={
+        "spark.sql.session.timeZone": "UTC",
+        "spark.sql.execution.arrow.pyspark.enabled": "true",
+    })
+    spark.conf.set("spark.sql.shuffle.partitions", str(spark.sparkContext.defaultParallelism * 2))
+    spark.sparkContext.addPyFile(os.path.join(COMMON_DIR, "indicators.py"))
+
+    start_ms = parse_time_ms(args.start) // HOUR_MS * HOUR_MS
+    end_ms = -(-parse_time_ms(args.end) // HOUR_MS) * HOUR_MS
+    read_start_ms = start_ms - args.warmup_hours * HOUR_MS
+
+    started = time.time()
+    print(f"🚀 지표 계산 시작 | source={args.source} | 구간={args.start} ~ {args.end} "
+          f"(워밍업 {args.warmup_hours}h) | sink={args.sink}")
+    result = with_indicators(read_candles(spark, args, read_start_ms, end_ms)) \
+        .where(col("window_start").cast("long") >= start_ms // 1000) \
+        .withColumn("date", date_format(col("window_start"), "yyyy-MM-dd")) \
+        .withColumn("hour", hour(col("window_start")))
+
+    if args.sink == "console":
+        result.orderBy("symbol", "window_start").show(100, truncate=False)
+    else:
+        result.repartition("symbol", "date", "hour") \
+            .sortWithinPartitions("window_start") \
+            .write \
+            .mode("overwrite") \
+            .option("partitionOverwriteMode", "dynamic") \
+            .option("compression", "zstd") \
+            .partitionBy("symbol", "date", "hour") \
+            .parquet(INDICATOR_TABLE_PATH)
+    print(f"✅ 지표 계산 완료 ({time.time() - started:.1f}초) → "
+          f"{INDICATOR_TABLE_PATH if args.sink == 'parquet' else 'console'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,39 +4,53 @@
 단독으로 실행할 때는 depth 토픽을 1초마다 콘솔에 찍는 테스트/확인용
 stream_preprocess.py 같은 전처리 job이 여기서 create, read, parse등 import해서 사용
 """
+import json
+import os
+import sys
+import threading
+import time
+
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import col, get_json_object
+from pyspark.sql.functions import col, expr, get_json_object, min as min_
+from pyspark.sql.utils import AnalysisException, IllegalArgumentException
+
+KAFKA_BOOTSTRAP = "kafka:29092"
+DEPTH_SNAPSHOT_TOPIC = "binance-depth-snapshot"  # 수집기가 발행하는 심볼별 호가창 스냅샷 (압축 토픽)
+# start-spark-job.sh가 docker exec 직전 시각을 넘겨줌 (없으면 프로세스 시작 시각)
+LAUNCH_TS = float(os.getenv("JOB_LAUNCH_TS") or time.time())
 
 # 스파크 작업을 시작하기 위한 "환경 설정"
-def create_spark_session(app_name="BinanceProcessor"):
+def create_spark_session(app_name="BinanceProcessor", extra_conf=None):
     """
     Spark 세션 생성 (재사용 가능)
     appname은 토픽임
-    spark.jars.pacages: 카프카 전용 라이브러리 불러옴
+    카프카 커넥터 jar는 이미지에 미리 포함 (infra/spark/Dockerfile) → Ivy 의존성 해석 없음
     checkpointLocation: 스트리밍 중 에러 났을 때, 기록하는 것
     log4j.properties: 필요한 로그만 보려고 정리함.
+    extra_conf: job별 추가 설정 (예: pipeline_host의 FAIR 스케줄러)
     """
-    return SparkSession.builder \
+    builder = SparkSession.builder \
         .appName(app_name) \
-        .config("spark.jars.packages", 
-                "org.apache.spark:spark-sql-kafka-0-10_2.12:3.3.1") \
         .config("spark.sql.streaming.checkpointLocation", f"/tmp/checkpoint-{app_name}") \
         .config("spark.driver.extraJavaOptions", "-Dlog4j.configuration=file:/opt/spark/work-dir/log4j.properties") \
-        .config("spark.executor.extraJavaOptions", "-Dlog4j.configuration=file:/opt/spark/work-dir/log4j.properties") \
-        .getOrCreate()
+        .config("spark.executor.extraJavaOptions", "-Dlog4j.configuration=file:/opt/spark/work-dir/log4j.properties")
+    for key, value in (extra_conf or {}).items():
+        builder = builder.config(key, value)
+    return builder.getOrCreate()
 
-def read_from_kafka(spark, topic, starting_offsets="latest"):
+def read_from_kafka(spark, topic, starting_offsets="latest", max_offsets_per_trigger=1000, include_headers=False):
     """
     Kafka에서 데이터 읽기 (재사용 가능)
     kafka.bootstrap.servers: kafka29092라는 주소로 접속
     subscribe: 인자로 받은 topic 구독
     startingOffsets: latest는 지금부터, earlist는 과거 데이터부터 다 가져오겠다는 것
     failOnDataLoss: 데이터가 일부 없어도 멈추지 말고 계속 진행(안전장치)
-    maxOffsetsPerTrigger: 한번에 너무 많이 가져오면 렉 걸리니 1,000개씩으로 제한
+    maxOffsetsPerTrigger: 한번에 너무 많이 가져오면 렉 걸리니 1,000개씩으로 제한 (None이면 제한 없음)
+    include_headers: Kafka record header도 읽기 (headers 컬럼, trace_columns()로 추적 시각 추출)
     """
-    return spark.readStream \
+    reader = spark.readStream \
         .format("kafka") \
-        .option("kafka.bootstrap.servers", "kafka:29092") \
+        .option("kafka.bootstrap.servers", KAFKA_BOOTSTRAP) \
         .option("subscribe", topic) \
         .option("startingOffsets", starting_offsets) \
         .option("kafka.session.timeout.ms", "60000") \
@@ -46,46 +60,197 @@ def read_from_kafka(spark, topic, starting_offsets="latest"):
         .option("kafka.metadata.max.age.ms", "300000") \
         .option("kafka.reconnect.backoff.ms", "50") \
         .option("kafka.reconnect.backoff.max.ms", "1000") \
+        .option("failOnDataLoss", "false")
+    if max_offsets_per_trigger:
+        reader = reader.option("maxOffsetsPerTrigger", str(max_offsets_per_trigger))
+    if include_headers:
+        reader = reader.option("includeHeaders", "true")
+    return reader.load()
+
+def wait_for_kafka(spark, topics, timeout_sec=60):
+    """
+    고정 sleep 대신 토픽/파티션 준비 상태를 직접 확인 (기존: coordinator 대비 5초 sleep)
+    커넥터 jar에 포함된 kafka-clients AdminClient를 JVM(py4j)으로 호출
+    모든 파티션에 리더가 있으면 준비 완료, timeout 넘으면 TimeoutError
+    """
+    jvm = spark._jvm
+    props = jvm.java.util.Properties()
+    props.put("bootstrap.servers", KAFKA_BOOTSTRAP)
+    props.put("request.timeout.ms", "5000")
+    admin = jvm.org.apache.kafka.clients.admin.AdminClient.create(props)
+    names = jvm.java.util.ArrayList()
+    for topic in topics:
+        names.add(topic)
+
+    started = time.time()
+    last_error = None
+    try:
+        while time.time() - started < timeout_sec:
+            try:
+                described = admin.describeTopics(names).all().get(5, jvm.java.util.concurrent.TimeUnit.SECONDS)
+                partitions = [p for t in topics for p in described.get(t).partitions()]
+                if all(p.leader() is not None for p in partitions):
+                    print(f"✅ Kafka 준비 완료: {topics} ({len(partitions)}개 파티션, {time.time() - started:.2f}초)")
+                    return
+                last_error = "리더 없는 파티션 있음"
+            except Exception as e:  # 토픽 미생성/브로커 미기동 (Py4JJavaError)
+                last_error = str(e).splitlines()[0]
+            time.sleep(0.5)
+    finally:
+        admin.close()
+    raise TimeoutError(f"Kafka 토픽 {topics}이 {timeout_sec}초 안에 준비되지 않음: {last_error}")
+
+
+def _admin_partitions(spark, topic):
+    """토픽 파티션 번호 목록 (wait_for_kafka와 같은 AdminClient 사용)"""
+    jvm = spark._jvm
+    props = jvm.java.util.Properties()
+    props.put("bootstrap.servers", KAFKA_BOOTSTRAP)
+    admin = jvm.org.apache.kafka.clients.admin.AdminClient.create(props)
+    names = jvm.java.util.ArrayList()
+    names.add(topic)
+    try:
+        described = admin.describeTopics(names).all().get(10, jvm.java.util.concurrent.TimeUnit.SECONDS)
+        return sorted(p.partition() for p in described.get(topic).partitions())
+    finally:
+        admin.close()
+
+
+def depth_starting_offsets(spark, diff_topic="binance-depth", snapshot_topic=DEPTH_SNAPSHOT_TOPIC):
+    """
+    호가창 스냅샷 토픽 → diff 토픽의 startingOffsets JSON (read_from_kafka(starting_offsets=...)에 그대로 전달)
+    심볼별 최신 스냅샷(last_update_id 최대)의 diff_offset 중 파티션별 가장 이른 위치 다음부터
+    → 스냅샷 + 그 이후 diff만 읽으면 호가창 복원 (diff의 u <= last_update_id는 건너뛸 것, common/order_book.py 참고)
+    스냅샷이 없는 파티션은 earliest(-2). 새 체크포인트로 시작할 때만 적용됨 (Spark 규칙)
+    """
+    v = col("value").cast("string")
+    snapshots = spark.read \
+        .format("kafka") \
+        .option("kafka.bootstrap.servers", KAFKA_BOOTSTRAP) \
+        .option("subscribe", snapshot_topic) \
+        .option("startingOffsets", "earliest") \
+        .option("endingOffsets", "latest") \
         .option("failOnDataLoss", "false") \
-        .option("maxOffsetsPerTrigger", "1000") \
-        .load()
+        .load() \
+        .select(
+            col("key").cast("string").alias("symbol"),
+            get_json_object(v, "$.last_update_id").cast("long").alias("last_update_id"),
+            get_json_object(v, "$.diff_partition").cast("int").alias("diff_partition"),
+            get_json_object(v, "$.diff_offset").cast("long").alias("diff_offset"),
+        )
+    latest = snapshots.groupBy("symbol").agg(
+        expr("max_by(struct(diff_partition, diff_offset), last_update_id)").alias("position")
+    )
+    rows = latest.groupBy(col("position.diff_partition").alias("partition")) \
+        .agg(min_(col("position.diff_offset")).alias("offset")) \
+        .collect()
+    found = {row["partition"]: row["offset"] + 1 for row in rows if row["partition"] is not None}
+    offsets = {str(p): found.get(p, -2) for p in _admin_partitions(spark, diff_topic)}
+    print(f"📗 호가창 스냅샷 기준 시작 오프셋 ({diff_topic}): {offsets}")
+    return json.dumps({diff_topic: offsets})
+
+
+def report_time_to_first_batch(query, label):
+    """
+    쿼리 첫 배치(progress) 완료 시점을 백그라운드에서 감시해서 시작→첫 배치 시간 출력
+    시작 시간이 느려지면 바로 보이도록 모든 job에서 호출
+    """
+    def watch():
+        while query.isActive:
+            if query.lastProgress:
+                print(f"⏱️ [{label}] 시작→첫 배치: {time.time() - LAUNCH_TS:.1f}초 (launcher 기준)")
+                return
+            time.sleep(0.2)
+
+    threading.Thread(target=watch, daemon=True).start()
+
+def trace_columns(df, with_kafka_ts=True):
+    """
+    수집기 trace header(common/tracing.py) → 컬럼 (추적 안 된 메시지는 null)
+    read_from_kafka(include_headers=True)로 읽은 df에서만 의미 있음, headers 컬럼이 없으면 빈 목록
+    trace_ex_ms(거래소 E), trace_rx_us(수신), trace_enq_us(전송 경로 진입), trace_send_us(producer.send 직전), kafka_ts_ms
+    with_kafka_ts=False: kafka_ts_ms를 이미 따로 뽑는 parser용 (컬럼 이름 중복 방지)
+    """
+    if "headers" not in df.columns:
+        return []
+
+    def header(key, alias):
+        return expr(f"filter(headers, h -> h.key = '{key}')[0].value").cast("string").cast("long").alias(alias)
+
+    columns = [
+        header("trace.ex", "trace_ex_ms"),
+        header("trace.rx", "trace_rx_us"),
+        header("trace.enq", "trace_enq_us"),
+        header("trace.send", "trace_send_us"),
+    ]
+    if with_kafka_ts:
+        columns.append((col("timestamp").cast("double") * 1000).cast("long").alias("kafka_ts_ms"))
+    return columns
 
 ###### 카프카에서 온 데이터는 value라는 컬럼 안에 모든 내용이 JSON 문자열로 있음 (파싱해야함) ####
-def parse_depth_data(df):
+def parse_depth_data(df, include_trace=False):
     """
     Depth 데이터 파싱 (재사용 가능)
     바이낸스의 Depth 데이터에서 매수/매도 1호가 가격(bid_price, ask_price)만 가져옴
     $data,b[0][0] JSON 구조 안에서 위치를 찾아감감
+    include_trace=True: trace_columns(df)도 붙임 (read_from_kafka(include_headers=True)로 읽은 df일 때)
     """
+    trace = trace_columns(df) if include_trace else []
     return df.select(
         get_json_object(col("value").cast("string"), "$.symbol").alias("symbol"),
         get_json_object(col("value").cast("string"), "$.data.b[0][0]").cast("double").alias("bid_price"),
         get_json_object(col("value").cast("string"), "$.data.a[0][0]").cast("double").alias("ask_price"),
-        col("timestamp").alias("kafka_timestamp")
+        col("timestamp").alias("kafka_timestamp"),
+        *trace,
+    )
+
+
+def parse_top_of_book(df, include_trace=False):
+    """
+    최우선 호가 projection만 (stateless → continuous processing 가능)
+    집계/current_timestamp 없이 select만 해야 continuous 트리거가 허용됨
+    kafka_ts_ms: Kafka 메시지 timestamp(ms). sink에서 지연 계산용
+    include_trace=True: trace_*도 붙임 (kafka_ts_ms는 위 컬럼 그대로)
+    """
+    v = col("value").cast("string")
+    trace = trace_columns(df, with_kafka_ts=False) if include_trace else []
+    return df.select(
+        get_json_object(v, "$.symbol").alias("symbol"),
+        get_json_object(v, "$.data.b[0][0]").cast("double").alias("bid_price"),
+        get_json_object(v, "$.data.b[0][1]").cast("double").alias("bid_qty"),
+        get_json_object(v, "$.data.a[0][0]").cast("double").alias("ask_price"),
+        get_json_object(v, "$.data.a[0][1]").cast("double").alias("ask_qty"),
+        (col("timestamp").cast("double") * 1000).cast("long").alias("kafka_ts_ms"),
+        *trace,
     )
 
 
-def parse_trade_data(df):
+def parse_trade_data(df, include_trace=False):
     """
     aggTrade 데이터 파싱 (재사용 가능). 체결가/수량/시각 추출.
     실시간 체결 내역(agggTrade)처리
     바이낸스에서는 시간을 밀리초(ms)로 줌. 윈도우 집계를 위해 1,000우로 나눠처 초로 변경
     .catst(string) 카프카는 데이터를 효율적으로 보관하기 위해 이진수 형태로 저장(binary -> string으로 변경)
     alias는 별칭
+    include_trace=True: trace_columns(df)도 붙임 (집계 후 구간별 지연 측정용, agg_trade_to_1m_ohlcv 참고)
     """
     v = col("value").cast("string")
+    trace = trace_columns(df) if include_trace else []
     return df.select(
         get_json_object(v, "$.symbol").alias("symbol"),
         (get_json_object(v, "$.data.p").cast("double")).alias("price"),
         (get_json_object(v, "$.data.q").cast("double")).alias("quantity"),
         (get_json_object(v, "$.data.T").cast("long") / 1000).alias("event_time_sec"),  # 초 단위로 윈도우용
         get_json_object(v, "$.data.m").cast("boolean").alias("is_buyer_maker"),
+        get_json_object(v, "$.data.a").cast("long").alias("agg_trade_id"),  # 같은 ms 체결 순서 구분용
+        *trace,
     )
 
 
-def parse_kline_data(df):
-    """Kline(1분봉) 데이터 파싱. Binance가 이미 1분 집계한 값."""
+def parse_kline_data(df, include_trace=False):
+    """Kline(1분봉) 데이터 파싱. Binance가 이미 1분 집계한 값. include_trace=True면 trace_columns(df)도 붙임"""
     v = col("value").cast("string")
+    trace = trace_columns(df) if include_trace else []
     return df.select(
         get_json_object(v, "$.symbol").alias("symbol"),
         (get_json_object(v, "$.data.k.t").cast("long") / 1000).alias("window_start_sec"),
@@ -96,16 +261,60 @@ def parse_kline_data(df):
         get_json_object(v, "$.data.k.v").cast("double").alias("volume"),
         get_json_object(v, "$.data.k.n").cast("long").alias("trades"),
         get_json_object(v, "$.data.k.x").cast("boolean").alias("is_candle_closed"),
+        *trace,
     )
 
+def run_top_of_book(trigger_mode="continuous"):
+    """
+    최우선 호가 저지연 모드 (./scripts/start-spark-job.sh top [continuous|fast|1s])
+    - continuous: Continuous Processing (epoch 1초, 레코드 단위 처리). 불가하면 fast로 대체
+    - fast: 트리거 간격 없는 micro-batch (이전 배치 끝나면 바로 다음 배치)
+    - 1s: 기존 main()과 같은 1초 트리거 (지연 비교 기준선)
+    sink는 TopOfBookWriter: 심볼별 최신값만 유지 + Kafka timestamp→출력 지연 p50/p95/p99 리포트
+    """
+    from top_of_book_sink import TopOfBookWriter
+
+    spark = create_spark_session("BinanceTopOfBook")
+    # foreach sink 모듈을 executor에도 배포 (work-dir는 driver 쪽 경로)
+    spark.sparkContext.addPyFile(os.path.join(os.path.dirname(os.path.abspath(__file__)), "top_of_book_sink.py"))
+
+    # 지연 측정이 목적이라 과거 데이터(earliest)는 읽지 않음, 배치 크기 제한도 없음
+    wait_for_kafka(spark, ["binance-depth"])
+    kafka_df = read_from_kafka(spark, "binance-depth", starting_offsets="latest", max_offsets_per_trigger=None)
+    top_df = parse_top_of_book(kafka_df)
+
+    def start(mode):
+        writer = top_df.writeStream \
+            .foreach(TopOfBookWriter(label=mode)) \
+            .option("checkpointLocation", f"/tmp/checkpoint-top-of-book-{mode}")
+        if mode == "continuous":
+            # 파티션 수(3)만큼 코어를 계속 점유함 (worker 코어 4개)
+            writer = writer.trigger(continuous="1 second")
+        elif mode == "1s":
+            writer = writer.trigger(processingTime="1 second")
+        else:
+            writer = writer.trigger(processingTime="0 seconds")
+        return writer.start()
+
+    try:
+        query = start(trigger_mode)
+    except (AnalysisException, IllegalArgumentException) as e:
+        if trigger_mode != "continuous":
+            raise
+        print(f"⚠️ continuous 모드 불가 → fast micro-batch로 대체: {e}")
+        trigger_mode = "fast"
+        query = start(trigger_mode)
+
+    print(f"🚀 top-of-book 스트리밍 시작 (모드: {trigger_mode}) | 지연 리포트는 executor stdout")
+    report_time_to_first_batch(query, "top-of-book")
+    query.awaitTermination()
+
+
 def main():
-    import time
-    
     spark = create_spark_session("BinanceDepthReader")
     
-    # Kafka는 이미 실행 중. Consumer 연결 전 짧은 대기 (coordinator 대비)
-    print("⏳ Kafka 연결 전 대기 (5초)...")
-    time.sleep(5)
+    # Kafka 토픽/파티션 준비 확인 (고정 대기 없음)
+    wait_for_kafka(spark, ["binance-depth"])
     
     # Kafka 읽기 (earliest로 변경하여 기존 데이터도 읽기)
     print("📥 Kafka에서 데이터 읽기 시작...")
@@ -121,8 +330,12 @@ def main():
         .format("console") \
         .trigger(processingTime='1 second') \
         .start()
+    report_time_to_first_batch(query, "depth-reader")
     
     query.awaitTermination()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "top":
+        run_top_of_book(sys.argv[2] if len(sys.argv) > 2 else "continuous")
+    else:
+        main()
\ No newline at end of file
@@ -4,16 +4,16 @@ Binance kline_1m 토픽 구독 → 파싱 후 콘솔 출력.
 
 실행: ./scripts/start-spark-job.sh kline
 """
-import time
 from pyspark.sql.functions import from_unixtime, col
-from kafka_reader import create_spark_session, read_from_kafka, parse_kline_data
+from kafka_reader import (
+    create_spark_session, read_from_kafka, parse_kline_data, wait_for_kafka, report_time_to_first_batch,
+)
 
 
 def main():
     spark = create_spark_session("BinanceKlineConsole")
 
-    print("⏳ Kafka 연결 전 대기 (5초)...")
-    time.sleep(5)
+    wait_for_kafka(spark, ["binance-kline"])
 
     print("📥 binance-kline(Binance 1분봉) 구독 중...")
     kafka_df = read_from_kafka(spark, "binance-kline", starting_offsets="latest")
@@ -35,6 +35,7 @@ def main():
         .option("checkpointLocation", "/tmp/checkpoint-kline-console") \
         .trigger(processingTime="1 minute") \
         .start()
+    report_time_to_first_batch(query, "kline-console")
 
     query.awaitTermination()
 
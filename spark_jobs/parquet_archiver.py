@@ -0,0 +1,395 @@
+"""
+Kafka 원본 토픽 → Parquet 장기 보관 (topic/symbol/date/hour 파티션).
+
+Kafka retention이 유일한 히스토리라서, 연구/백필 job이 JSON 재생 대신
+디스크 속도 + 컬럼 pruning으로 몇 달치 틱을 읽을 수 있게 컬럼형으로 적재.
+
+- 한 쿼리로 모든 토픽을 한 번에 읽고 foreachBatch에서 토픽별 타입 스키마로 파싱해 append
+  전용 스키마가 없는 토픽(청산, bookTicker, miniTicker, REST 지표 등)은 공통 envelope 컬럼 + data 원본 JSON 문자열
+  압축 토픽(스냅샷/행렬/순위, 최신 상태만 의미 있음)은 보관하지 않음 (시작 시 출력)
+- 경로: {ARCHIVE_ROOT}/topic=binance-trade/symbol=BTCUSDT/date=2026-02-11/hour=2/part-*.parquet
+- micro-batch마다 작은 파일이 생기므로, 닫힌 시간(hour) 파티션은 주기적으로 compaction
+  (kafka_partition, kafka_offset 기준 중복 제거 → 재시도로 같은 배치가 두 번 써져도 정리됨)
+  - 적재와 compaction은 {ARCHIVE_ROOT}/.archive.lock (flock)으로 상호 배제 (다른 프로세스의 compact 1회 실행 포함)
+  - 닫힌 hour 기준 = 스트리밍 쿼리가 커밋한 진행 위치(처리한 Kafka record timestamp 최대값) - COMPACT_GRACE_HOURS
+    (earliest부터 재생 중이면 아직 쓰는 중인 과거 hour를 건드리지 않음), 단독 실행은 현재 시각 기준
+  - 교체 직전에 파일 목록을 다시 확인해서 바뀌었으면 그 파티션은 건너뜀
+
+실행:
+  ./scripts/start-spark-job.sh archive           # 스트리밍 적재 (+ 1시간마다 compaction)
+  ./scripts/start-spark-job.sh archive-compact   # compaction만 1회 실행
+읽기 예: spark.read.parquet("/data/archive/topic=binance-trade").where("symbol='BTCUSDT' AND date='2026-02-11'")
+"""
+import fcntl
+import math
+import os
+import shutil
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from pyspark.sql.functions import (
+    col, coalesce, date_format, from_json, from_unixtime, get_json_object, hour, lit, max as spark_max, struct,
+    transform,
+)
+from pyspark.sql.types import (
+    ArrayType, BooleanType, DoubleType, LongType, StringType, StructField, StructType,
+)
+from kafka_reader import create_spark_session, read_from_kafka, wait_for_kafka, report_time_to_first_batch
+
+ARCHIVE_ROOT = os.getenv("ARCHIVE_ROOT", "/data/archive")
+TARGET_FILE_BYTES = 128 * 1024 * 1024  # compaction 후 파일 1개 목표 크기
+ROW_GROUP_BYTES = 64 * 1024 * 1024     # parquet.block.size (row group)
+COMPACT_GRACE_HOURS = 2                # 지금으로부터 이 시간 이전 hour만 compaction (늦게 오는 데이터 대비)
+COMPACT_EVERY_SEC = 60 * 60
+LOCK_PATH = os.path.join(ARCHIVE_ROOT, ".archive.lock")
+
+# 스트리밍 쿼리가 끝까지 쓴 배치의 Kafka record timestamp 최대값 (ms) → compaction cutoff
+_progress = {"committed_ms": None}
+
+# 수집기 envelope: {"symbol", "stream", "data": {...}, "ts"}
+def _envelope(data_schema):
+    return StructType([
+        StructField("symbol", StringType()),
+        StructField("stream", StringType()),
+        StructField("data", data_schema),
+        StructField("ts", LongType()),
+    ])
+
+
+AGG_TRADE_SCHEMA = _envelope(StructType([
+    StructField("e", StringType()),
+    StructField("E", LongType()),
+    StructField("a", LongType()),   # aggTrade id
+    StructField("t", LongType()),   # trade id (trade 스트림)
+    StructField("p", StringType()),
+    StructField("q", StringType()),
+    StructField("f", LongType()),
+    StructField("l", LongType()),
+    StructField("T", LongType()),
+    StructField("m", BooleanType()),
+]))
+
+DEPTH_SCHEMA = _envelope(StructType([
+    StructField("e", StringType()),
+    StructField("E", LongType()),
+    StructField("T", LongType()),
+    StructField("U", LongType()),
+    StructField("u", LongType()),
+    StructField("pu", LongType()),
+    StructField("b", ArrayType(ArrayType(StringType()))),
+    StructField("a", ArrayType(ArrayType(StringType()))),
+]))
+
+KLINE_SCHEMA = _envelope(StructType([
+    StructField("e", StringType()),
+    StructField("E", LongType()),
+    StructField("k", StructType([
+        StructField("t", LongType()),
+        StructField("T", LongType()),
+        StructField("i", StringType()),
+        StructField("o", StringType()),
+        StructField("h", StringType()),
+        StructField("l", StringType()),
+        StructField("c", StringType()),
+        StructField("v", StringType()),
+        StructField("q", StringType()),
+        StructField("n", LongType()),
+        StructField("V", StringType()),
+        StructField("x", BooleanType()),
+    ])),
+]))
+
+# processors/candle_processor 출력 (envelope 없이 평평한 JSON)
+CANDLE_SCHEMA = StructType([
+    StructField("symbol", StringType()),
+    StructField("interval", StringType()),
+    StructField("window_start", LongType()),
+    StructField("open", DoubleType()),
+    StructField("high", DoubleType()),
+    StructField("low", DoubleType()),
+    StructField("close", DoubleType()),
+    StructField("volume", DoubleType()),
+    StructField("quote_volume", DoubleType()),
+    StructField("trades_count", LongType()),
+    StructField("is_closed", BooleanType()),
+    StructField("last_trade_time", LongType()),
+    StructField("ts", LongType()),
+])
+
+
+def _levels(c):
+    """[["68970.00", "1.500"], ...] → array<struct<price: double, qty: double>>"""
+    return transform(c, lambda x: struct(x[0].cast("double").alias("price"), x[1].cast("double").alias("qty")))
+
+
+def archive_trade(df):
+    """parse_trade_data와 같은 컬럼명 유지 (backfill이 아카이브를 그대로 입력으로 씀)"""
+    m = df.select("*", from_json(col("value").cast("string"), AGG_TRADE_SCHEMA).alias("m"))
+    return m.select(
+        col("m.symbol").alias("symbol"),
+        col("m.data.e").alias("event_type"),
+        coalesce(col("m.data.a"), col("m.data.t")).alias("agg_trade_id"),
+        col("m.data.p").cast("double").alias("price"),
+        col("m.data.q").cast("double").alias("quantity"),
+        (col("m.data.T") / 1000).alias("event_time_sec"),
+        col("m.data.m").alias("is_buyer_maker"),
+        col("m.data.f").alias("first_trade_id"),
+        col("m.data.l").alias("last_trade_id"),
+        col("m.data.T").alias("trade_time"),
+        col("m.data.E").alias("event_time"),
+        col("m.ts").alias("ingest_ts"),
+        col("partition").alias("kafka_partition"),
+        col("offset").alias("kafka_offset"),
+    )
+
+
+def archive_depth(df):
+    m = df.select("*", from_json(col("value").cast("string"), DEPTH_SCHEMA).alias("m"))
+    return m.select(
+        col("m.symbol").alias("symbol"),
+        col("m.data.E").alias("event_time"),
+        col("m.data.T").alias("transaction_time"),
+        col("m.data.U").alias("first_update_id"),
+        col("m.data.u").alias("final_update_id"),
+        col("m.data.pu").alias("prev_final_update_id"),
+        _levels(col("m.data.b")).alias("bids"),
+        _levels(col("m.data.a")).alias("asks"),
+        col("m.ts").alias("ingest_ts"),
+        col("partition").alias("kafka_partition"),
+        col("offset").alias("kafka_offset"),
+    )
+
+
+def archive_kline(df):
+    m = df.select("*", from_json(col("value").cast("string"), KLINE_SCHEMA).alias("m"))
+    return m.select(
+        col("m.symbol").alias("symbol"),
+        col("m.data.k.i").alias("interval"),
+        (col("m.data.k.t") / 1000).alias("window_start_sec"),
+        col("m.data.k.o").cast("double").alias("open"),
+        col("m.data.k.h").cast("double").alias("high"),
+        col("m.data.k.l").cast("double").alias("low"),
+        col("m.data.k.c").cast("double").alias("close"),
+        col("m.data.k.v").cast("double").alias("volume"),
+        col("m.data.k.q").cast("double").alias("quote_volume"),
+        col("m.data.k.n").alias("trades"),
+        col("m.data.k.V").cast("double").alias("taker_buy_volume"),
+        col("m.data.k.x").alias("is_candle_closed"),
+        col("m.data.E").alias("event_time"),
+        col("m.ts").alias("ingest_ts"),
+        col("partition").alias("kafka_partition"),
+        col("offset").alias("kafka_offset"),
+    )
+
+
+def archive_candle(df):
+    m = df.select("*", from_json(col("value").cast("string"), CANDLE_SCHEMA).alias("m"))
+    return m.select(
+        "m.*",
+        col("m.last_trade_time").alias("event_time"),
+        col("partition").alias("kafka_partition"),
+        col("offset").alias("kafka_offset"),
+    ).drop("ts")
+
+
+def archive_raw(df):
+    """
+    전용 스키마 없는 토픽: envelope 공통 컬럼 + data는 JSON 문자열 그대로 (읽을 때 from_json/get_json_object)
+    envelope가 아닌 메시지(처리기 출력 등)는 value 전체를 data로, 시각은 data.E → data.T → ts → Kafka timestamp 순
+    """
+    value = col("value").cast("string")
+    field = lambda path: get_json_object(value, path)  # noqa: E731
+    kafka_ms = (col("timestamp").cast("double") * 1000).cast("long")
+    return df.select(
+        field("$.symbol").alias("symbol"),
+        field("$.stream").alias("stream"),
+        field("$.data.e").alias("event_type"),
+        coalesce(field("$.data.E").cast("long"), field("$.data.T").cast("long"),
+                 field("$.ts").cast("long"), kafka_ms).alias("event_time"),
+        field("$.ts").cast("long").alias("ingest_ts"),
+        coalesce(field("$.data"), value).alias("data"),
+        col("partition").alias("kafka_partition"),
+        col("offset").alias("kafka_offset"),
+    )
+
+
+# 토픽 → 파서 (전용 스키마가 생기면 여기서 archive_raw를 바꿈, 새 토픽은 infra/setup-kafka.sh와 같이 추가)
+ARCHIVE_TOPICS = {
+    "binance-trade": archive_trade,
+    "binance-depth": archive_depth,
+    "binance-kline": archive_kline,
+    "binance-candle": archive_candle,
+    "binance-bookticker": archive_raw,
+    "binance-liquidation": archive_raw,
+    "binance-liquidation-alert": archive_raw,
+    "binance-trade-gaps": archive_raw,
+    "binance-openinterest": archive_raw,
+    "binance-fundingrate": archive_raw,
+    "binance-takerlongshort": archive_raw,
+    "binance-ticker": archive_raw,
+    "binance-other": archive_raw,
+}
+# 압축 토픽: 키별 최신 값만 남으므로 보관 대상 아님
+SKIPPED_TOPICS = ["binance-depth-snapshot", "binance-correlation", "binance-screener"]
+
+
+def with_partition_columns(df):
+    """이벤트 시각(ms) 기준 date/hour 파티션 컬럼 (세션 타임존 UTC)"""
+    event_ts = from_unixtime(col("event_time") / 1000)
+    return df.withColumn("date", date_format(event_ts, "yyyy-MM-dd")) \
+        .withColumn("hour", hour(event_ts)) \
+        .withColumn("symbol", coalesce(col("symbol"), lit("UNKNOWN")))
+
+
+@contextmanager
+def archive_lock():
+    """적재 ↔ compaction 상호 배제 (같은 프로세스의 다른 스레드, 다른 프로세스 모두 flock으로 막힘)"""
+    os.makedirs(ARCHIVE_ROOT, exist_ok=True)
+    with open(LOCK_PATH, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def archive_topic_batch(topic, topic_df):
+    """토픽 1개의 Kafka 배치(raw 컬럼)를 타입 스키마로 파싱해서 append (pipeline_host도 사용)"""
+    with archive_lock():
+        with_partition_columns(ARCHIVE_TOPICS[topic](topic_df)) \
+            .sortWithinPartitions("symbol", "event_time") \
+            .write \
+            .mode("append") \
+            .option("compression", "zstd") \
+            .option("parquet.block.size", ROW_GROUP_BYTES) \
+            .partitionBy("symbol", "date", "hour") \
+            .parquet(f"{ARCHIVE_ROOT}/topic={topic}")
+
+
+def write_batch(batch_df, batch_id):
+    """foreachBatch: 토픽별로 나눠서 타입 스키마로 파싱 후 append"""
+    batch_df.persist()
+    try:
+        batch_max = batch_df.agg(spark_max("timestamp")).first()[0]
+        for topic in ARCHIVE_TOPICS:
+            archive_topic_batch(topic, batch_df.where(col("topic") == topic))
+        if batch_max is not None:
+            committed = int(batch_max.timestamp() * 1000)
+            _progress["committed_ms"] = max(_progress["committed_ms"] or 0, committed)
+    finally:
+        batch_df.unpersist()
+
+
+def _parquet_files(path: str) -> list:
+    return sorted(f for f in os.listdir(path) if f.endswith(".parquet"))
+
+
+def _hour_partitions(cutoff_key: str):
+    """{ARCHIVE_ROOT}/topic=*/symbol=*/date=*/hour=* 중 cutoff 이전이고 파일이 2개 이상인 경로
+    (topic= 아래만: candles_*/ 같은 다른 테이블은 kafka_offset 컬럼이 없어서 제외)"""
+    roots = sorted(d for d in os.listdir(ARCHIVE_ROOT) if d.startswith("topic=")) if os.path.isdir(ARCHIVE_ROOT) else []
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(ARCHIVE_ROOT, root)):
+            dirnames[:] = [d for d in dirnames if not d.startswith((".", "_"))]
+            base = os.path.basename(dirpath)
+            if not base.startswith("hour="):
+                continue
+            date = os.path.basename(os.path.dirname(dirpath)).split("=", 1)[1]
+            if f"{date}-{int(base.split('=', 1)[1]):02d}" >= cutoff_key:
+                continue
+            files = [f for f in filenames if f.endswith(".parquet")]
+            if len(files) > 1:
+                yield dirpath, sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+
+
+def _compact_partition(spark, path: str, total_bytes: int) -> bool:
+    """hour 파티션 1개 병합 (archive_lock 안에서 호출). 읽은 뒤 파일이 바뀌었으면 교체하지 않고 False"""
+    parent, name = os.path.split(path)
+    tmp_path = os.path.join(parent, f".{name}.compacting")
+    old_path = os.path.join(parent, f".{name}.old")
+    num_files = max(1, math.ceil(total_bytes / TARGET_FILE_BYTES))
+    files = _parquet_files(path)
+
+    spark.read.parquet(path) \
+        .dropDuplicates(["kafka_partition", "kafka_offset"]) \
+        .repartition(num_files) \
+        .sortWithinPartitions("event_time") \
+        .write \
+        .mode("overwrite") \
+        .option("compression", "zstd") \
+        .option("parquet.block.size", ROW_GROUP_BYTES) \
+        .parquet(tmp_path)
+
+    if _parquet_files(path) != files:
+        print(f"⚠️ compaction 중 파일 변경 → 건너뜀: {path}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return False
+    os.rename(path, old_path)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        os.rename(old_path, path)  # 원래 파일 되돌림 (병합본은 다음 주기에 다시 생성)
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    shutil.rmtree(old_path, ignore_errors=True)
+    return True
+
+
+def compact(spark, committed_ms: int = None):
+    """
+    닫힌 hour 파티션의 작은 파일들을 TARGET_FILE_BYTES 단위로 병합.
+    임시 경로(.으로 시작 → Spark 파티션 탐색에서 무시)에 쓴 뒤 디렉터리 교체.
+    committed_ms: 스트리밍 쿼리 진행 위치 (없으면 현재 시각), 이 시각 - COMPACT_GRACE_HOURS 이전 hour만 대상
+    """
+    base_sec = committed_ms / 1000 if committed_ms else time.time()
+    cutoff_key = time.strftime("%Y-%m-%d-%H", time.gmtime(base_sec - COMPACT_GRACE_HOURS * 3600))
+    compacted = 0
+    for path, total_bytes in list(_hour_partitions(cutoff_key)):
+        with archive_lock():
+            if len(_parquet_files(path)) > 1 and _compact_partition(spark, path, total_bytes):
+                compacted += 1
+    print(f"🗜️ compaction 완료: {compacted}개 hour 파티션 (cutoff {cutoff_key} UTC)")
+
+
+def _compaction_loop(spark):
+    while True:
+        time.sleep(COMPACT_EVERY_SEC)
+        if _progress["committed_ms"] is None:
+            continue  # 아직 끝난 배치 없음 (어디까지 썼는지 모름)
+        try:
+            compact(spark, _progress["committed_ms"])
+        except Exception as e:
+            print(f"⚠️ compaction 실패 (다음 주기에 재시도): {e}")
+
+
+def main():
+    spark = create_spark_session("ParquetArchiver")
+    spark.conf.set("spark.sql.session.timeZone", "UTC")
+
+    if len(sys.argv) > 1 and sys.argv[1] == "compact":
+        compact(spark)
+        return
+
+    print(f"📥 아카이브 대상 토픽: {list(ARCHIVE_TOPICS)} → {ARCHIVE_ROOT}")
+    print(f"⚠️ 보관하지 않는 토픽 (압축 토픽): {SKIPPED_TOPICS}")
+    wait_for_kafka(spark, list(ARCHIVE_TOPICS))
+    # 처음 실행 시 Kafka에 남은 retention 데이터부터 보관. 한 배치 크기는 넉넉히
+    kafka_df = read_from_kafka(spark, ",".join(ARCHIVE_TOPICS), starting_offsets="earliest",
+                               max_offsets_per_trigger=500000)
+
+    query = kafka_df.writeStream \
+        .foreachBatch(write_batch) \
+        .option("checkpointLocation", "/tmp/checkpoint-parquet-archiver") \
+        .trigger(processingTime="1 minute") \
+        .start()
+
+    report_time_to_first_batch(query, "parquet-archiver")
+    threading.Thread(target=_compaction_loop, args=(spark,), daemon=True).start()
+    print("🚀 Parquet 아카이브 스트리밍 시작 (1분마다 append, 1시간마다 compaction)...")
+    query.awaitTermination()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+여러 파이프라인을 Spark 애플리케이션(SparkSession) 하나에서 실행하는 호스트.
+
+job마다 spark-submit 하면 driver/executor/Kafka consumer가 따로 생기고 worker 4코어가 쪼개짐.
+여기서는 한 세션 안에 이름 붙은 쿼리들을 띄우고 FAIR 스케줄러 풀로 코어를 나눠 씀.
+
+- fan-out 파이프라인: 같은 토픽을 쓰는 것끼리 쿼리 1개로 한 번만 읽고,
+  foreachBatch에서 배치를 캐시한 뒤 각 핸들러에 넘김 (핸들러마다 자기 풀에서 실행)
+- 독립 쿼리 파이프라인: 스트리밍 상태 집계(1분봉 등)는 foreachBatch 안에서 못 돌리므로 자기 쿼리로 실행
+- 30초마다 쿼리별 progress(처리량, 배치 시간, 상태 메모리) + 핸들러별 처리 시간 출력
+
+실행: ./scripts/start-spark-job.sh host [파이프라인 이름 ...]   (기본: 전체)
+"""
+import os
+import sys
+import threading
+import time
+
+from pyspark.sql.functions import col, expr
+from kafka_reader import (
+    create_spark_session, read_from_kafka, parse_depth_data, parse_trade_data, parse_kline_data,
+    wait_for_kafka, report_time_to_first_batch,
+)
+from stream_preprocess import agg_trade_to_1m_ohlcv, with_emit_latency
+from whale_detector import detect_whale_trades
+from parquet_archiver import archive_topic_batch
+from trade_integrity import TradeSequenceTracker, dedup_trades
+
+WORK_DIR = os.path.dirname(os.path.abspath(__file__))
+FANOUT_TRIGGER = "10 seconds"
+STATUS_INTERVAL_SEC = 30
+
+
+class Pipeline:
+    """
+    topic + handle(batch_df, batch_id)  → fan-out 파이프라인 (토픽 공유 읽기)
+    topic + start(spark) → StreamingQuery → 독립 쿼리 파이프라인 (topic은 준비 확인용)
+    """
+
+    def __init__(self, name, pool, topic, handle=None, start=None):
+        self.name = name
+        self.pool = pool
+        self.topic = topic
+        self.handle = handle
+        self.start = start
+        # 핸들러 메트릭
+        self.batches = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+
+
+# ---------------- fan-out 핸들러 ----------------
+
+def show_latest_depth(batch_df, batch_id):
+    latest = parse_depth_data(batch_df).groupBy("symbol").agg(
+        expr("max_by(struct(bid_price, ask_price, kafka_timestamp), kafka_timestamp)").alias("latest")
+    ).select("symbol", "latest.*")
+    for row in latest.collect():
+        print(f"📗 [depth] {row.symbol} bid {row.bid_price} / ask {row.ask_price} ({row.kafka_timestamp})")
+
+
+def show_whales(batch_df, batch_id):
+    for row in detect_whale_trades(parse_trade_data(batch_df)).limit(50).collect():
+        print(f"🐋 [whale] {row.event_ts} {row.symbol} {row.side} {row.quantity} @ {row.price} "
+              f"(≈{row.notional:,.0f} USDT)")
+
+
+# ---------------- 독립 쿼리 ----------------
+
+def start_preprocess_1m(spark):
+    trades = read_from_kafka(spark, "binance-trade", include_headers=True)
+    ohlcv = with_emit_latency(agg_trade_to_1m_ohlcv(dedup_trades(parse_trade_data(trades, include_trace=True))))
+    return ohlcv.writeStream \
+        .queryName("preprocess-1m") \
+        .outputMode("update") \
+        .format("console") \
+        .option("truncate", False) \
+        .option("checkpointLocation", "/tmp/checkpoint-host-preprocess-1m-trace") \
+        .trigger(processingTime="1 minute") \
+        .start()
+
+
+def start_kline_console(spark):
+    kline = parse_kline_data(read_from_kafka(spark, "binance-kline")).where(col("is_candle_closed"))
+    return kline.writeStream \
+        .queryName("kline-console") \
+        .outputMode("append") \
+        .format("console") \
+        .option("truncate", False) \
+        .option("checkpointLocation", "/tmp/checkpoint-host-kline-console") \
+        .trigger(processingTime="1 minute") \
+        .start()
+
+
+PIPELINES = [
+    Pipeline("depth-top", "latency", topic="binance-depth", handle=show_latest_depth),
+    Pipeline("whale", "latency", topic="binance-trade", handle=show_whales),
+    Pipeline("trade-integrity", "latency", topic="binance-trade", handle=TradeSequenceTracker().handle),
+    Pipeline("archive-trade", "archive", topic="binance-trade",
+             handle=lambda df, _: archive_topic_batch("binance-trade", df)),
+    Pipeline("archive-depth", "archive", topic="binance-depth",
+             handle=lambda df, _: archive_topic_batch("binance-depth", df)),
+    Pipeline("archive-kline", "archive", topic="binance-kline",
+             handle=lambda df, _: archive_topic_batch("binance-kline", df)),
+    Pipeline("preprocess-1m", "aggregation", topic="binance-trade", start=start_preprocess_1m),
+    Pipeline("kline-console", "aggregation", topic="binance-kline", start=start_kline_console),
+]
+
+
+def make_fanout(spark, pipelines):
+    """
+    토픽 1개 배치를 캐시하고 핸들러들에 차례로 전달.
+    foreachBatch 콜백은 쿼리 스레드에서 실행되므로(pinned thread) 핸들러 직전에
+    scheduler.pool 로컬 속성을 바꾸면 그 핸들러의 Spark job이 해당 풀로 들어감
+    """
+    sc = spark.sparkContext
+
+    def fanout(batch_df, batch_id):
+        batch_df.persist()
+        try:
+            for p in pipelines:
+                sc.setLocalProperty("spark.scheduler.pool", p.pool)
+                started = time.time()
+                try:
+                    p.handle(batch_df, batch_id)
+                except Exception as e:
+                    p.errors += 1
+                    print(f"❌ [{p.name}] 배치 {batch_id} 처리 실패: {e}")
+                p.last_ms = (time.time() - started) * 1000
+                p.total_ms += p.last_ms
+                p.batches += 1
+        finally:
+            sc.setLocalProperty("spark.scheduler.pool", None)
+            batch_df.unpersist()
+
+    return fanout
+
+
+def report_status(spark, pipelines):
+    """쿼리별 progress + 핸들러별 처리 시간 + 실행 중 task 수"""
+    tracker = spark.sparkContext.statusTracker()
+    while True:
+        time.sleep(STATUS_INTERVAL_SEC)
+        active_tasks = sum(
+            info.numActiveTasks for info in
+            (tracker.getStageInfo(stage_id) for stage_id in tracker.getActiveStageIds()) if info
+        )
+        print(f"\n📊 pipeline host 상태 | 쿼리 {len(spark.streams.active)}개 | 실행 중 task {active_tasks}개")
+        for query in spark.streams.active:
+            p = query.lastProgress
+            if not p:
+                print(f"  - {query.name}: 첫 배치 대기 중")
+                continue
+            state_mem = sum(op.get("memoryUsedBytes", 0) for op in p.get("stateOperators", []))
+            print(
+                f"  - {query.name}: 입력 {p.get('inputRowsPerSecond', 0):.1f} rows/s | "
+                f"처리 {p.get('processedRowsPerSecond', 0):.1f} rows/s | "
+                f"배치 {p['durationMs'].get('triggerExecution', 0)}ms | 상태 메모리 {state_mem / 1024 / 1024:.1f}MB"
+            )
+        for pl in pipelines:
+            if pl.handle and pl.batches:
+                print(f"    · {pl.name} [{pl.pool}]: 배치 {pl.batches} | 최근 {pl.last_ms:.0f}ms | "
+                      f"평균 {pl.total_ms / pl.batches:.0f}ms | 에러 {pl.errors}")
+
+
+def main():
+    names = sys.argv[1:]
+    selected = [p for p in PIPELINES if not names or p.name in names]
+    unknown = set(names) - {p.name for p in PIPELINES}
+    if unknown:
+        print(f"❌ 알 수 없는 파이프라인: {sorted(unknown)} (사용 가능: {[p.name for p in PIPELINES]})")
+        sys.exit(1)
+
+    spark = create_spark_session("PipelineHost", extra_conf={
+        "spark.scheduler.mode": "FAIR",
+        "spark.scheduler.allocation.file": os.path.join(WORK_DIR, "fairscheduler.xml"),
+    })
+    spark.conf.set("spark.sql.session.timeZone", "UTC")
+    sc = spark.sparkContext
+
+    # fan-out: 토픽별로 묶기 (토픽당 Kafka 읽기 1번)
+    by_topic = {}
+    for p in selected:
+        if p.handle:
+            by_topic.setdefault(p.topic, []).append(p)
+    standalone = [p for p in selected if p.start]
+    wait_for_kafka(spark, sorted({p.topic for p in selected}))
+
+    for topic, pipelines in by_topic.items():
+        sc.setLocalProperty("spark.scheduler.pool", pipelines[0].pool)
+        query = read_from_kafka(spark, topic, max_offsets_per_trigger=100000).writeStream \
+            .queryName(f"fanout-{topic}") \
+            .foreachBatch(make_fanout(spark, pipelines)) \
+            .option("checkpointLocation", f"/tmp/checkpoint-host-fanout-{topic}") \
+            .trigger(processingTime=FANOUT_TRIGGER) \
+            .start()
+        report_time_to_first_batch(query, f"fanout-{topic}")
+        print(f"🔀 {topic} 공유 읽기 → {[p.name for p in pipelines]}")
+
+    for p in standalone:
+        # 쿼리 시작 전에 설정한 풀이 그 쿼리의 모든 배치에 적용됨
+        sc.setLocalProperty("spark.scheduler.pool", p.pool)
+        query = p.start(spark)
+        report_time_to_first_batch(query, p.name)
+        print(f"▶️ {p.name} 독립 쿼리 시작 [{p.pool}]")
+    sc.setLocalProperty("spark.scheduler.pool", None)
+
+    threading.Thread(target=report_status, args=(spark, selected), daemon=True).start()
+    print(f"🚀 pipeline host 시작: {[p.name for p in selected]}")
+    spark.streams.awaitAnyTermination()
+
+
+if __name__ == "__main__":
+    main()
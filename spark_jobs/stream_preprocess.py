@@ -2,22 +2,29 @@
 Kafka 스트림 전처리: aggTrade → 1분봉(OHLCV) 집계 후 콘솔 출력.
 
 - binance-trade(aggTrade)를 읽어서 1분 tumbling window로 집계
-- open=first(price), high=max, low=min, close=last, volume=sum(qty), count=체결건수
+- open=첫 체결가, high=max, low=min, close=마지막 체결가, volume=sum(qty), count=체결건수
+- 집계 전에 (symbol, aggTrade id) 중복 제거 (trade_integrity.dedup_trades, watermark 2분 → 상태 메모리 일정)
+- trace header도 읽어서 봉마다 마지막 추적 메시지의 구간별 시각 + 집계 출력 시각(emit_ms)을 같이 출력
+  → 수집 → 브로커 → 집계 출력까지 구간별 지연을 집계 이후 기준으로 확인 (trace_latency.py는 집계 없이 broker→spark까지)
 - 이후 ClickHouse 적재는 foreachBatch로 확장 가능
 
 실행: 스파크 마스터 컨테이너에서
   spark-submit --master spark://spark-master:7077 --packages ... stream_preprocess.py
 또는 ./scripts/start-spark-job.sh 에서 이 파일로 변경
 """
-import time
 from pyspark.sql import SparkSession
 # 데이터 처리에 필요한 도구들 (특히 window는 시간 쪼개는 도구)
 from pyspark.sql.functions import (
-    col, first, last, min as spark_min, max as spark_max, sum as spark_sum, count,
-    window, from_unixtime,
+    col, expr, min as spark_min, max as spark_max, sum as spark_sum, count,
+    window, from_unixtime, when,
 )
 # kafka_reader에서 만든 데이터 불러옴
-from kafka_reader import create_spark_session, read_from_kafka, parse_trade_data
+from kafka_reader import (
+    create_spark_session, read_from_kafka, parse_trade_data, wait_for_kafka, report_time_to_first_batch,
+)
+from trade_integrity import dedup_trades
+
+TRACE_FIELDS = ["trace_ex_ms", "trace_rx_us", "trace_enq_us", "trace_send_us", "kafka_ts_ms"]
 
 
 def agg_trade_to_1m_ohlcv(parsed_trade_df):
@@ -31,42 +38,73 @@ def agg_trade_to_1m_ohlcv(parsed_trade_df):
     with_ts: event_ts 컬럼이 추가된 새로운 데이터 프레임
     with_window 내부: Tumbling Window 기법.event_ts를 기준으로 0~59초까지를 하나의 상자로 묶음
     agg(...): 뭉쳐진 데이터들을 대상으로 수학적 계산 진행
+    open/close: first/last는 셔플 후 행 순서에 따라 결과가 달라짐 → (체결시각, aggTrade id)가
+    가장 작은/큰 체결의 가격으로 고정 (스트리밍/배치 backfill 어디서 돌려도 같은 결과)
     selectL 계산은 끝났지만 window 컬럼이 구조체 형태({start, end}) 형태라서 직렬화 함.
+    dedup_trades를 거친 df는 event_ts(watermark)가 이미 있으므로 그대로 사용 (다시 만들면 watermark가 빠짐)
+    parse_trade_data(include_trace=True) 결과면 봉마다 마지막(trace_rx_us 최대) 추적 메시지의 trace_* / kafka_ts_ms와
+    추적 메시지 수(traced_count)도 출력 (추적 메시지가 없는 봉은 null / 0)
     """
     # 초 단위 → timestamp (윈도우 함수용)
-    with_ts = parsed_trade_df.withColumn(
-        "event_ts",
-        from_unixtime(col("event_time_sec")).cast("timestamp")
-    )
+    with_ts = parsed_trade_df
+    if "event_ts" not in parsed_trade_df.columns:
+        with_ts = parsed_trade_df.withColumn(
+            "event_ts",
+            from_unixtime(col("event_time_sec")).cast("timestamp")
+        )
     with_window = with_ts.withColumn("window", window(col("event_ts"), "1 minute"))
 
+    trace_aggs, trace_out = [], []
+    if "trace_rx_us" in parsed_trade_df.columns:
+        # max_by는 순서 키가 null인 행(추적 안 된 메시지)을 건너뜀
+        trace_aggs = [
+            expr(f"max_by(struct({', '.join(TRACE_FIELDS)}), trace_rx_us)").alias("last_trace"),
+            count("trace_rx_us").alias("traced_count"),
+        ]
+        trace_out = [col(f"last_trace.{name}").alias(name) for name in TRACE_FIELDS] + [col("traced_count")]
+
     return with_window.groupBy("window", "symbol").agg(
-        first("price").alias("open"),
+        expr("min_by(price, struct(event_time_sec, agg_trade_id))").alias("open"),
         spark_max("price").alias("high"),
         spark_min("price").alias("low"),
-        last("price").alias("close"),
+        expr("max_by(price, struct(event_time_sec, agg_trade_id))").alias("close"),
         spark_sum("quantity").alias("volume"),
         count("*").alias("trades_count"),
+        *trace_aggs,
     ).select(
         col("window.start").alias("window_start"),
         col("symbol"),
         col("open"), col("high"), col("low"), col("close"),
         col("volume"), col("trades_count"),
+        *trace_out,
     )
 
 
+def with_emit_latency(ohlcv_df):
+    """
+    agg_trade_to_1m_ohlcv(trace 포함) 결과 → 집계 출력 시각(emit_ms, micro-batch 시각)과 구간별 지연(ms) 컬럼 추가
+    exchange→receive / receive→send / send→broker는 trace_latency.py와 같은 정의, broker→emit은 집계 대기(트리거 간격) 포함
+    """
+    ex_ms = when(col("trace_ex_ms") > 0, col("trace_ex_ms"))  # E 없는 이벤트는 0 → 해당 구간 null
+    emit_ms = expr("unix_millis(current_timestamp())")
+    return ohlcv_df.withColumn("emit_ms", emit_ms) \
+        .withColumn("exchange→receive", (col("trace_rx_us") - ex_ms * 1000) / 1000) \
+        .withColumn("receive→send", (col("trace_send_us") - col("trace_rx_us")) / 1000) \
+        .withColumn("send→broker", col("kafka_ts_ms") - col("trace_send_us") / 1000) \
+        .withColumn("broker→emit", col("emit_ms") - col("kafka_ts_ms"))
+
+
 def main():
     spark = create_spark_session("StreamPreprocess-1mOHLCV")
 
-    # Kafka는 이미 start.sh로 실행 중. Consumer 연결 전 짧은 대기만 (재시작 직후 coordinator 대비)
-    print("⏳ Kafka 연결 전 대기 (5초)...")
-    time.sleep(5)
+    # Kafka는 이미 start.sh로 실행 중. 토픽 파티션 리더까지 준비됐는지만 확인 (재시작 직후 대비)
+    wait_for_kafka(spark, ["binance-trade"])
 
     print("📥 binance-trade 구독 중...")
-    kafka_df = read_from_kafka(spark, "binance-trade", starting_offsets="latest")
+    kafka_df = read_from_kafka(spark, "binance-trade", starting_offsets="latest", include_headers=True)
 
-    parsed = parse_trade_data(kafka_df)
-    ohlcv_1m = agg_trade_to_1m_ohlcv(parsed)
+    parsed = dedup_trades(parse_trade_data(kafka_df, include_trace=True))
+    ohlcv_1m = with_emit_latency(agg_trade_to_1m_ohlcv(parsed))
 
     print("🚀 1분봉 집계 스트리밍 시작 (1분마다 트리거)...")
     """
@@ -84,9 +122,10 @@ def main():
         .outputMode("update") \
         .format("console") \
         .option("truncate", False) \
-        .option("checkpointLocation", "/tmp/checkpoint-preprocess-1m") \
+        .option("checkpointLocation", "/tmp/checkpoint-preprocess-1m-trace") \
         .trigger(processingTime="1 minute") \
         .start()
+    report_time_to_first_batch(query, "preprocess-1m")
 
     query.awaitTermination() # 끝날때까지 대기 (사용자가 종료 전까지 진행)글글
 
@@ -0,0 +1,83 @@
+"""
+최우선 호가(top-of-book) 저지연 모니터링용 sink.
+kafka_reader.py top 모드에서 사용 (driver가 addPyFile로 executor에 배포)
+
+- TopOfBookWriter: foreach sink. 심볼별 최신 호가 1건만 유지 (이전 값은 덮어씀)
+- Kafka timestamp → sink 도착까지 지연(ms)을 모아서 p50/p95/p99 주기적 출력
+- 상태는 모듈 전역에 둠: python worker가 재사용되므로 배치/epoch가 바뀌어도 누적됨
+  (출력은 executor stdout → docker exec spark-worker sh -c 'tail -f /tmp/spark-worker/*/*/stdout')
+"""
+import time
+from collections import deque
+
+REPORT_INTERVAL_SEC = 5.0
+
+
+class LatencyStats:
+    """최근 N개 지연 샘플로 백분위 계산 (메모리 고정)"""
+
+    def __init__(self, max_samples: int = 20000):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+
+    def add(self, latency_ms: float):
+        self.samples.append(latency_ms)
+        self.count += 1
+
+    def percentiles(self) -> dict:
+        if not self.samples:
+            return {}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {
+            "p50": ordered[int(last * 0.50)],
+            "p95": ordered[int(last * 0.95)],
+            "p99": ordered[int(last * 0.99)],
+            "max": ordered[last],
+        }
+
+    def reset(self):
+        self.samples.clear()
+        self.count = 0
+
+
+# python worker 프로세스 단위 상태
+_latest = {}  # symbol → (bid_price, bid_qty, ask_price, ask_qty, kafka_ts_ms)
+_stats = LatencyStats()
+_last_report = [time.time()]
+
+
+def report(label: str):
+    now = time.time()
+    if now - _last_report[0] < REPORT_INTERVAL_SEC or not _stats.count:
+        return
+    p = _stats.percentiles()
+    print(
+        f"⏱️ [{label}] Kafka→sink 지연 | n={_stats.count:,} | "
+        f"p50={p['p50']:.0f}ms p95={p['p95']:.0f}ms p99={p['p99']:.0f}ms max={p['max']:.0f}ms",
+        flush=True,
+    )
+    for symbol, (bid, bid_qty, ask, ask_qty, _) in sorted(_latest.items()):
+        print(f"   {symbol}: bid {bid} ({bid_qty}) / ask {ask} ({ask_qty})", flush=True)
+    _stats.reset()
+    _last_report[0] = now
+
+
+class TopOfBookWriter:
+    """foreach sink (continuous/micro-batch 둘 다 지원). 심볼별 최신값만 유지"""
+
+    def __init__(self, label: str):
+        self.label = label
+
+    def open(self, partition_id, epoch_id):
+        return True
+
+    def process(self, row):
+        now_ms = time.time() * 1000
+        _latest[row.symbol] = (row.bid_price, row.bid_qty, row.ask_price, row.ask_qty, row.kafka_ts_ms)
+        _stats.add(now_ms - row.kafka_ts_ms)
+
+    def close(self, error):
+        if error:
+            print(f"❌ TopOfBookWriter 에러: {error}", flush=True)
+        report(self.label)
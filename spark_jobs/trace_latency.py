@@ -0,0 +1,74 @@
+"""
+메시지 구간별 지연 리포트: 수집기가 샘플링해서 붙인 trace header(common/tracing.py)를 읽어
+micro-batch마다 토픽별 p50/p99(ms)를 콘솔 출력.
+
+구간
+  exchange→receive  거래소 이벤트 시각 E → 수집기 WebSocket 수신 (거래소/로컬 시계 차이 포함)
+  receive→enqueue   수신 → 파싱/process_data 끝
+  enqueue→send      전송 경로 진입 → KafkaProducer.send 직전
+  send→broker       send 직전 → 브로커 적재 (LogAppendTime, infra/setup-kafka.sh)
+  broker→spark      브로커 적재 → 이 배치 처리 시각
+  total             E → 이 배치 처리 시각
+
+단독 실행: ./scripts/start-spark-job.sh trace [토픽들(쉼표 구분)]
+"""
+import sys
+import time
+
+from pyspark.sql.functions import col, expr, lit, when
+from kafka_reader import (
+    create_spark_session, read_from_kafka, trace_columns, wait_for_kafka, report_time_to_first_batch,
+)
+
+DEFAULT_TOPICS = ["binance-depth", "binance-trade", "binance-kline"]
+STAGES = ["exchange→receive", "receive→enqueue", "enqueue→send", "send→broker", "broker→spark", "total"]
+
+
+def trace_stages(traced_df, now_ms):
+    """trace_columns 결과 → 구간별 지연(ms) 컬럼 (배치 df용, now_ms는 배치 처리 시각)"""
+    ex_ms = when(col("trace_ex_ms") > 0, col("trace_ex_ms"))  # E 없는 이벤트는 0 → 해당 구간 null
+    return traced_df.select(
+        col("topic"),
+        ((col("trace_rx_us") - ex_ms * 1000) / 1000).alias("exchange→receive"),
+        ((col("trace_enq_us") - col("trace_rx_us")) / 1000).alias("receive→enqueue"),
+        ((col("trace_send_us") - col("trace_enq_us")) / 1000).alias("enqueue→send"),
+        (col("kafka_ts_ms") - col("trace_send_us") / 1000).alias("send→broker"),
+        (lit(now_ms) - col("kafka_ts_ms")).alias("broker→spark"),
+        (lit(now_ms) - ex_ms).alias("total"),
+    )
+
+
+def report_batch(batch_df, batch_id):
+    now_ms = int(time.time() * 1000)
+    traced = batch_df.where(col("trace_rx_us").isNotNull())
+    aggs = [expr("count(*)").alias("samples")]
+    for stage in STAGES:
+        aggs.append(expr(f"percentile_approx(`{stage}`, array(0.5, 0.99))").alias(stage))
+    rows = trace_stages(traced, now_ms).groupBy("topic").agg(*aggs).collect()
+    for row in rows:
+        parts = " | ".join(f"{s} p50={row[s][0]:.1f} p99={row[s][1]:.1f}" for s in STAGES if row[s])
+        print(f"🔎 [batch {batch_id}] {row['topic']} (샘플 {row['samples']}) | {parts}")
+
+
+def main():
+    topics = sys.argv[1].split(",") if len(sys.argv) > 1 else DEFAULT_TOPICS
+    spark = create_spark_session("TraceLatency")
+    wait_for_kafka(spark, topics)
+
+    kafka_df = read_from_kafka(spark, ",".join(topics), starting_offsets="latest",
+                               max_offsets_per_trigger=None, include_headers=True)
+    traced_df = kafka_df.select(col("topic"), *trace_columns(kafka_df))
+
+    print(f"🔎 구간별 지연 리포트 시작 (토픽: {', '.join(topics)})...")
+    query = traced_df.writeStream \
+        .foreachBatch(report_batch) \
+        .option("checkpointLocation", "/tmp/checkpoint-trace-latency") \
+        .trigger(processingTime="5 seconds") \
+        .start()
+    report_time_to_first_batch(query, "trace-latency")
+
+    query.awaitTermination()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+aggTrade 무결성: (symbol, aggTrade id) 중복 제거 + 심볼별 id 누락(gap) 감지.
+
+aggTrade id(a)는 심볼별로 1씩 증가. 수집기 재연결 / producer 재시도(retries=3, idempotence 없음)로
+같은 체결이 두 번 들어오거나 빠질 수 있음 → 1분봉(stream_preprocess) 거래량/건수가 조용히 틀어짐
+
+1) dedup_trades: watermark 안에서만 (symbol, id) 상태를 들고 중복 제거 (Spark streaming dropDuplicates)
+   → 상태는 watermark 지나면 정리되므로 체결 속도가 높아도 메모리 일정. stream_preprocess 1분봉이 사용
+2) TradeSequenceTracker: 배치마다 심볼별 연속 id 구간(run)만 driver로 모아서 누락 id 구간 계산
+   - driver 상태: 심볼별 마지막 id + 아직 확정 안 된 gap 목록 (심볼 수에 비례, 체결 수와 무관)
+   - gap은 GAP_GRACE_SEC 동안 보류 (재시도로 순서가 바뀌어 늦게 오는 id가 채우면 취소)
+     지나면 binance-trade-gaps 토픽으로 전송 {symbol, from_id, to_id, missing, ...}
+   - 이미 본 id가 다시 오면 중복으로 집계 (gap 확정 후에 도착한 id도 구분할 수 없어서 중복으로 셈)
+   - driver 상태는 재시작 시 초기화 → 재시작 직전/직후 사이의 gap은 감지 안 됨
+
+단독 실행: ./scripts/start-spark-job.sh integrity
+pipeline_host.py에서는 binance-trade 공유 읽기 핸들러(trade-integrity)로 실행
+"""
+import time
+
+from pyspark.sql import Window
+from pyspark.sql.functions import col, count, from_unixtime, max as spark_max, min as spark_min, row_number, sum as spark_sum
+from pyspark.sql.types import LongType, StringType, StructField, StructType
+from kafka_reader import (
+    KAFKA_BOOTSTRAP, create_spark_session, read_from_kafka, parse_trade_data, wait_for_kafka,
+    report_time_to_first_batch,
+)
+
+GAP_TOPIC = "binance-trade-gaps"
+DEDUP_WATERMARK = "2 minutes"   # 이보다 늦게 온 체결은 dedup 상태가 없으므로 집계에서 제외
+GAP_GRACE_SEC = 30.0
+MAX_PENDING_GAPS = 100          # 심볼당 보류 gap 상한 (넘으면 오래된 것부터 바로 확정)
+
+GAP_SCHEMA = StructType([
+    StructField("symbol", StringType()),
+    StructField("from_id", LongType()),
+    StructField("to_id", LongType()),
+    StructField("missing", LongType()),
+    StructField("detected_at", LongType()),
+    StructField("reported_at", LongType()),
+])
+
+
+def dedup_trades(parsed_trade_df, delay=DEDUP_WATERMARK):
+    """
+    parse_trade_data 결과 → event_ts(watermark) 추가 + (symbol, aggTrade id) 중복 제거 (스트리밍용)
+    중복 체결은 체결 시각(T)도 같으므로 event_ts를 키에 넣어 watermark로 상태 정리
+    """
+    return parsed_trade_df \
+        .withColumn("event_ts", from_unixtime(col("event_time_sec")).cast("timestamp")) \
+        .withWatermark("event_ts", delay) \
+        .dropDuplicates(["symbol", "agg_trade_id", "event_ts"])
+
+
+class SymbolSequence:
+    __slots__ = ("last_id", "gaps")
+
+    def __init__(self, last_id: int):
+        self.last_id = last_id
+        self.gaps = []  # [from_id, to_id, detected_at] (보류 중, from_id 순)
+
+    def fill(self, lo: int, hi: int) -> int:
+        """늦게 온 id 구간 [lo, hi]가 보류 gap을 채운 개수 (gap은 잘라내거나 둘로 나눔)"""
+        filled = 0
+        remaining = []
+        for g_lo, g_hi, detected_at in self.gaps:
+            if hi < g_lo or lo > g_hi:
+                remaining.append([g_lo, g_hi, detected_at])
+                continue
+            filled += min(hi, g_hi) - max(lo, g_lo) + 1
+            if g_lo < lo:
+                remaining.append([g_lo, lo - 1, detected_at])
+            if hi < g_hi:
+                remaining.append([hi + 1, g_hi, detected_at])
+        self.gaps = remaining
+        return filled
+
+
+class TradeSequenceTracker:
+    """foreachBatch 핸들러 (배치 = Kafka 원본 df). 심볼별 id 연속성 + 중복 카운터"""
+
+    def __init__(self, grace_sec: float = GAP_GRACE_SEC):
+        self.grace_sec = grace_sec
+        self.symbols = {}
+        self.trades = 0
+        self.duplicates = 0
+        self.gaps = 0
+        self.missing = 0
+        self.late_filled = 0
+
+    @staticmethod
+    def id_runs(trades_df):
+        """심볼별 연속 id 구간 (id - row_number가 같으면 같은 구간) + 구간 안 행 수 (배치 내 중복 포함)"""
+        per_id = trades_df.where(col("agg_trade_id").isNotNull()) \
+            .groupBy("symbol", "agg_trade_id").agg(count("*").alias("n"))
+        ordered = Window.partitionBy("symbol").orderBy("agg_trade_id")
+        return per_id \
+            .withColumn("run", col("agg_trade_id") - row_number().over(ordered)) \
+            .groupBy("symbol", "run") \
+            .agg(spark_min("agg_trade_id").alias("lo"), spark_max("agg_trade_id").alias("hi"),
+                 spark_sum("n").alias("rows")) \
+            .select("symbol", "lo", "hi", "rows")
+
+    def update(self, runs, now: float) -> list:
+        """구간들 [(symbol, lo, hi, rows)] → 상태 갱신, 확정된 gap 목록 반환"""
+        for symbol, lo, hi, rows in sorted(runs):
+            self.trades += rows
+            self.duplicates += rows - (hi - lo + 1)  # 같은 배치 안 중복
+            seq = self.symbols.get(symbol)
+            if seq is None:
+                self.symbols[symbol] = SymbolSequence(hi)  # 처음 본 심볼: 이전 id는 모름
+                continue
+            last = seq.last_id
+            if lo <= last:
+                # 이미 지나간 id: 보류 gap을 채우면 늦게 온 체결, 아니면 중복
+                seen_hi = min(hi, last)
+                filled = seq.fill(lo, seen_hi)
+                self.late_filled += filled
+                self.duplicates += (seen_hi - lo + 1) - filled
+            if hi > last:
+                start = max(lo, last + 1)
+                if start > last + 1:
+                    seq.gaps.append([last + 1, start - 1, now])
+                seq.last_id = hi
+        return self._expire(now)
+
+    def _expire(self, now: float) -> list:
+        confirmed = []
+        for symbol, seq in self.symbols.items():
+            if not seq.gaps:
+                continue
+            keep = []
+            overflow = len(seq.gaps) - MAX_PENDING_GAPS
+            for i, (lo, hi, detected_at) in enumerate(seq.gaps):
+                if i < overflow or now - detected_at >= self.grace_sec:
+                    confirmed.append((symbol, lo, hi, hi - lo + 1, int(detected_at * 1000), int(now * 1000)))
+                else:
+                    keep.append([lo, hi, detected_at])
+            seq.gaps = keep
+        self.gaps += len(confirmed)
+        self.missing += sum(g[3] for g in confirmed)
+        return confirmed
+
+    def handle(self, batch_df, batch_id):
+        trades = parse_trade_data(batch_df)
+        runs = [(r.symbol, r.lo, r.hi, r.rows) for r in self.id_runs(trades).collect()]
+        confirmed = self.update(runs, time.time())
+        if confirmed:
+            batch_df.sparkSession.createDataFrame(confirmed, GAP_SCHEMA) \
+                .selectExpr("symbol AS key", "to_json(struct(*)) AS value") \
+                .write \
+                .format("kafka") \
+                .option("kafka.bootstrap.servers", KAFKA_BOOTSTRAP) \
+                .option("topic", GAP_TOPIC) \
+                .save()
+            for symbol, lo, hi, missing, _, _ in confirmed[:10]:
+                print(f"🕳️ [gap] {symbol} aggTrade id {lo}~{hi} 누락 ({missing}건)")
+        pending = sum(len(seq.gaps) for seq in self.symbols.values())
+        print(f"🧮 [integrity] 배치 {batch_id} | 누적 체결 {self.trades:,} | 중복 {self.duplicates:,} | "
+              f"gap {self.gaps:,} (누락 id {self.missing:,}) | 늦게 채워짐 {self.late_filled:,} | "
+              f"보류 gap {pending} | 심볼 {len(self.symbols)}")
+
+
+def main():
+    spark = create_spark_session("TradeIntegrity")
+    wait_for_kafka(spark, ["binance-trade"])
+
+    tracker = TradeSequenceTracker()
+    kafka_df = read_from_kafka(spark, "binance-trade", starting_offsets="latest", max_offsets_per_trigger=None)
+
+    print(f"🧮 aggTrade 중복/누락 감시 시작 (gap 확정 {GAP_GRACE_SEC:.0f}초 후 → {GAP_TOPIC})...")
+    query = kafka_df.writeStream \
+        .foreachBatch(tracker.handle) \
+        .option("checkpointLocation", "/tmp/checkpoint-trade-integrity") \
+        .trigger(processingTime="10 seconds") \
+        .start()
+    report_time_to_first_batch(query, "trade-integrity")
+
+    query.awaitTermination()
+
+
+if __name__ == "__main__":
+    main()
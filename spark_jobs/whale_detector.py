@@ -1 +1,52 @@
-# 고래 거래량량
\ No newline at end of file
+"""
+고래 거래 감지: aggTrade 중 체결 금액(price * quantity)이 기준 이상인 건만 골라 콘솔 출력.
+
+단독 실행: ./scripts/start-spark-job.sh whale
+pipeline_host.py에서는 binance-trade를 한 번만 읽고 아카이브 등과 함께 fan-out
+"""
+from pyspark.sql.functions import col, from_unixtime, when
+from kafka_reader import (
+    create_spark_session, read_from_kafka, parse_trade_data, wait_for_kafka, report_time_to_first_batch,
+)
+
+WHALE_NOTIONAL_USDT = 100_000  # 이 금액(USDT) 이상 체결을 고래로 판단
+
+
+def detect_whale_trades(parsed_trade_df, min_notional=WHALE_NOTIONAL_USDT):
+    """
+    parse_trade_data 결과 → 고래 체결만 (stateless filter라 스트리밍/배치 모두 사용 가능)
+    is_buyer_maker=True면 매수자가 maker → 시장가 매도가 체결시킨 것 (SELL)
+    """
+    return parsed_trade_df \
+        .withColumn("notional", col("price") * col("quantity")) \
+        .where(col("notional") >= min_notional) \
+        .select(
+            from_unixtime(col("event_time_sec")).cast("timestamp").alias("event_ts"),
+            col("symbol"),
+            when(col("is_buyer_maker"), "SELL").otherwise("BUY").alias("side"),
+            col("price"), col("quantity"), col("notional"),
+        )
+
+
+def main():
+    spark = create_spark_session("WhaleDetector")
+    wait_for_kafka(spark, ["binance-trade"])
+
+    kafka_df = read_from_kafka(spark, "binance-trade", starting_offsets="latest")
+    whales = detect_whale_trades(parse_trade_data(kafka_df))
+
+    print(f"🐋 고래 체결 감지 시작 (기준: {WHALE_NOTIONAL_USDT:,} USDT 이상)...")
+    query = whales.writeStream \
+        .outputMode("append") \
+        .format("console") \
+        .option("truncate", False) \
+        .option("checkpointLocation", "/tmp/checkpoint-whale-detector") \
+        .trigger(processingTime="1 second") \
+        .start()
+    report_time_to_first_batch(query, "whale-detector")
+
+    query.awaitTermination()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,4 +14,6 @@ class BinanceStreamType(Enum):
     FUNDING_RATE = "fundingRate"
     TAKER_LONG_SHORT_RATIO = "takerLongShortRatio"
     MARK_PRICE = "markPrice@1s"
-    LIQUIDATION_ORDER = "forceOrder"
\ No newline at end of file
+    LIQUIDATION_ORDER = "forceOrder"
+    ALL_MARKET_LIQUIDATION = "!forceOrder@arr"  # 전체 심볼 청산 (심볼 prefix 없이 구독)
+    ALL_MARKET_MINI_TICKER = "!miniTicker@arr"  # 전체 심볼 24h miniTicker 배열 (1초마다 바뀐 심볼만)